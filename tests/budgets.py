@@ -0,0 +1,66 @@
+import json
+import os
+
+from timing import percentile
+
+BUDGETS_FILE = ".wait_budgets.json"
+
+
+class BudgetStore:
+    """Budgets d'attente appris: p99 des attentes reussies x facteur de securite, persiste entre les runs"""
+
+    def __init__(self, path=BUDGETS_FILE, factor=3.0, floor=2.0, min_samples=20, window=500):
+        self.path = path
+        self.factor = factor
+        self.floor = floor
+        self.min_samples = min_samples
+        self.window = window
+        self.samples = self.load()
+
+    def load(self):
+        """Lire les dernieres durees d'attente par etape (vide au premier run)"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            return {step: list(values) for step, values in data.get("samples", {}).items()}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def budget(self, step, ceiling):
+        """Budget d'une etape: appris si assez d'echantillons, borne par le plafond fixe"""
+        values = self.samples.get(step, [])
+        if len(values) < self.min_samples:
+            return ceiling
+        learned = max(self.floor, percentile(values, 0.99) * self.factor)
+        return round(min(learned, ceiling), 2)
+
+    def budgets(self, ceilings):
+        """Budgets de toutes les etapes connues (plafonds fixes par defaut)"""
+        return {step: self.budget(step, ceiling) for step, ceiling in ceilings.items()}
+
+    def update(self, records):
+        """Ajouter les attentes satisfaites du run et garder une fenetre glissante par etape"""
+        for record in records:
+            if record["satisfied"]:
+                values = self.samples.setdefault(record["step"], [])
+                values.append(record["waited"])
+        for step, values in self.samples.items():
+            del values[:-self.window]
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"factor": self.factor, "window": self.window, "samples": self.samples}, f)
+        os.replace(tmp, self.path)
+
+    def summary(self, ceilings):
+        """Budget effectif, p99 observe et origine (appris / plafond) par etape"""
+        steps = {}
+        for step, ceiling in ceilings.items():
+            values = self.samples.get(step, [])
+            steps[step] = {
+                "budget": self.budget(step, ceiling),
+                "ceiling": ceiling,
+                "samples": len(values),
+                "p99": round(percentile(values, 0.99), 3) if values else None,
+                "learned": len(values) >= self.min_samples,
+            }
+        return steps
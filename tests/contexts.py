@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pool import SessionPool
+
+# Commande WebDriver de bascule de fenetre (Command.SWITCH_TO_WINDOW)
+SWITCH_TO_WINDOW = "switchToWindow"
+
+
+def cdp_command(driver, cmd, params=None):
+    """Commande DevTools: directe pour un driver Chrome, via l'extension goog/cdp de la grille sinon"""
+    if hasattr(driver, "execute_cdp_cmd"):
+        return driver.execute_cdp_cmd(cmd, params or {})
+    driver.command_executor._commands.setdefault("executeCdpCommand", ("POST", "/session/$sessionId/goog/cdp/execute"))
+    return driver.execute("executeCdpCommand", {"cmd": cmd, "params": params or {}})["value"]
+
+
+class ContextSwitcher:
+    """Partager un driver entre contextes: chaque commande part dans la fenetre du contexte du thread appelant"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.current = driver.current_window_handle
+        self.switches = 0
+        executor = driver.command_executor
+        self.execute = executor.execute
+        executor.execute = self.dispatch
+
+    def bind(self, handle, profiler=None):
+        """Rattacher le thread courant a une fenetre (et au profileur de son contexte)"""
+        self.local.handle = handle
+        self.local.profiler = profiler
+
+    def dispatch(self, command, params):
+        handle = getattr(self.local, "handle", None)
+        profiler = getattr(self.local, "profiler", None)
+        # Bascule et commande sous le meme verrou: un autre contexte ne peut pas s'intercaler
+        with self.lock:
+            if handle and handle != self.current and command != SWITCH_TO_WINDOW:
+                self.execute(SWITCH_TO_WINDOW, {"handle": handle, "sessionId": self.driver.session_id})
+                self.current = handle
+                self.switches += 1
+            start = time.monotonic()
+            response = None
+            try:
+                response = self.execute(command, params)
+                if command == SWITCH_TO_WINDOW:
+                    self.current = params.get("handle")
+                return response
+            finally:
+                if profiler is not None:
+                    profiler.record(command, params, response, time.monotonic() - start)
+
+
+class BrowserContext:
+    """Contexte isole (stockage et cookies propres) ouvert dans un onglet du navigateur partage"""
+
+    def __init__(self, index, context_id, target_id, handle):
+        self.index = index
+        self.context_id = context_id
+        self.target_id = target_id
+        self.handle = handle
+        self.tests = None
+
+
+def open_context(driver, index, url, timeout=10):
+    """Creer un contexte de navigation isole et retrouver la fenetre WebDriver de son onglet"""
+    before = set(driver.window_handles)
+    context_id = cdp_command(driver, "Target.createBrowserContext")["browserContextId"]
+    target_id = cdp_command(driver, "Target.createTarget", {"url": url, "browserContextId": context_id})["targetId"]
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        handles = set(driver.window_handles) - before
+        # chromedriver nomme ses fenetres d'apres l'id de cible DevTools
+        matching = [handle for handle in handles if target_id in handle] or list(handles)
+        if len(matching) == 1:
+            return BrowserContext(index, context_id, target_id, matching[0])
+        time.sleep(0.1)
+    cdp_command(driver, "Target.disposeBrowserContext", {"browserContextId": context_id})
+    raise RuntimeError(f"Onglet du contexte {index} introuvable parmi les fenetres WebDriver")
+
+
+def close_context(driver, context):
+    try:
+        cdp_command(driver, "Target.closeTarget", {"targetId": context.target_id})
+        cdp_command(driver, "Target.disposeBrowserContext", {"browserContextId": context.context_id})
+    except Exception as e:
+        print(f"ATTENTION: Contexte {context.index} non ferme: {str(e)}")
+
+
+class ContextPool(SessionPool):
+    """Repartir les cas sur N contextes isoles d'un seul navigateur, entrelaces par une boucle asyncio"""
+
+    def __init__(self, app_url, contexts, tests_class, **options):
+        super().__init__(app_url, contexts, tests_class, **options)
+        self.switcher = None
+        self.threads = None
+
+    def call(self, context, function, *args):
+        """Executer une etape synchrone (commandes WebDriver) dans la fenetre du contexte"""
+        self.switcher.bind(context.handle, context.tests.profiler if context.tests else None)
+        return function(*args)
+
+    def prepare(self, context):
+        """Session de test du contexte: driver partage, attentes et instrumentation propres a son onglet"""
+        tests = self.tests_class(self.app_url, worker_id=context.index, start_driver=False, **self.options)
+        tests.screenshot_prefix = tests.screenshot_prefix.replace(f"w{context.index:02d}_", f"c{context.index:02d}_")
+        tests.result_stream = self.result_stream
+        context.tests = tests
+        tests.use_driver(self.switcher.driver, profile=False)
+        if tests.network is not None:
+            # Journal performance commun a la session: chaque contexte lit les evenements de son onglet
+            tests.network.webview = context.target_id
+        tests.waits.wait_for_page_ready("page_prete")
+        return tests
+
+    async def context_worker(self, context, cases):
+        """Prendre les cas un a un; les attentes d'un contexte laissent passer les commandes des autres"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.threads, self.call, context, self.prepare, context)
+            print(f"SUCCES: Contexte {context.index} pret ({context.handle})")
+            while True:
+                # Boucle asyncio mono-thread: l'iterateur partage n'a pas besoin de verrou
+                item = next(cases, None)
+                if item is None:
+                    break
+                await loop.run_in_executor(self.threads, self.call, context, self.run_case, context.index, context.tests, *item)
+        except Exception as e:
+            print(f"ERREUR: Contexte {context.index} en echec: {str(e)}")
+        finally:
+            if context.tests is not None:
+                self.collect(context.index, context.tests)
+                # Le driver est partage: seul le rapport le ferme
+                context.tests.driver = None
+                context.tests.cleanup()
+
+    async def run_contexts(self, contexts, cases):
+        await asyncio.gather(*(self.context_worker(context, cases) for context in contexts))
+
+    def run(self):
+        """Executer tous les cas dans N contextes d'un meme navigateur et generer un rapport unique"""
+        report = self.tests_class(self.app_url, **self.options)
+        self.result_stream = report.result_stream
+        driver = report.driver
+        home = driver.current_window_handle
+        self.switcher = ContextSwitcher(driver)
+        self.switcher.bind(home)
+
+        print("=" * 60)
+        print(f"TESTS DE SECURITE - MODE CONTEXTES ({self.workers} contextes, un navigateur)")
+        print("=" * 60)
+
+        contexts = []
+        try:
+            for index in range(1, self.workers + 1):
+                contexts.append(open_context(driver, index, self.app_url))
+        except Exception as e:
+            print(f"ATTENTION: Contextes isoles indisponibles ({str(e)}), {len(contexts)} contexte(s) ouvert(s)")
+        if not contexts:
+            # Sans contexte isole, les onglets partageraient token et cookies: execution dans la session unique
+            self.switcher.bind(None)
+            try:
+                return report.run_shard() if report.shard else report.run_tests()
+            finally:
+                report.cleanup()
+
+        cases = enumerate(report.iter_cases())
+        self.threads = ThreadPoolExecutor(max_workers=len(contexts), thread_name_prefix="context")
+        try:
+            asyncio.run(self.run_contexts(contexts, cases))
+        finally:
+            self.threads.shutdown()
+            for context in contexts:
+                close_context(driver, context)
+            driver.switch_to.window(home)
+
+        report.extra_report["contexts"] = {
+            "count": len(contexts),
+            "window_switches": self.switcher.switches,
+        }
+        try:
+            return self.finish(report)
+        finally:
+            report.cleanup()
@@ -0,0 +1,76 @@
+import csv
+import glob
+import hashlib
+import itertools
+import json
+import os
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+
+def chunked(iterable, size):
+    """Decouper un iterable en listes de taille fixe sans le materialiser"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class PayloadCorpus:
+    """Corpus de payloads lu en flux depuis des fichiers JSONL/CSV"""
+
+    def __init__(self, directory=CORPUS_DIR, tags=None):
+        self.directory = directory
+        self.tags = set(tags or [])
+
+    def files(self, category):
+        """Fichiers d'une categorie: <categorie>*.jsonl et <categorie>*.csv, tries par nom"""
+        patterns = [f"{category}*.jsonl", f"{category}*.csv"]
+        paths = []
+        for pattern in patterns:
+            paths.extend(glob.glob(os.path.join(self.directory, pattern)))
+        return sorted(paths)
+
+    def read_file(self, path):
+        """Lire un fichier ligne par ligne"""
+        with open(path, newline="", encoding="utf-8") as f:
+            if path.endswith(".csv"):
+                # Colonnes: username,password,tags (tags separes par '|')
+                for row in csv.DictReader(f):
+                    yield {
+                        "username": row.get("username", ""),
+                        "password": row.get("password", ""),
+                        "tags": [t for t in (row.get("tags") or "").split("|") if t]
+                    }
+            else:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+
+    def cases(self, category):
+        """Generer les cas d'une categorie: dedoublonnes, tagues et filtres par tag"""
+        seen = set()
+        for path in self.files(category):
+            for entry in self.read_file(path):
+                username = entry.get("username", "")
+                password = entry.get("password", "")
+                # Empreinte courte pour dedoublonner sans garder les payloads en memoire
+                key = hashlib.blake2b(f"{username}\0{password}".encode("utf-8"), digest_size=8).digest()
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                tags = set(entry.get("tags", []))
+                tags.add(category)
+                if self.tags and not (tags & self.tags):
+                    continue
+
+                yield {
+                    "category": category,
+                    "username": username,
+                    "password": password,
+                    "tags": sorted(tags)
+                }
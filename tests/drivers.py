@@ -0,0 +1,139 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from network_log import enable_performance_log
+
+GRID_URL = "http://selenium:4444/wd/hub"
+DEFAULT_CDP_ADDRESS = "127.0.0.1:9222"
+DRIVER_BACKENDS = ("remote", "local", "cdp")
+
+# Binaires Chrome/Chromium cherches dans le PATH pour le mode cdp
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+
+def chrome_options(headless=False, network_log=False):
+    """Options Chrome communes aux sessions du harness"""
+    options = Options()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-setuid-sandbox")
+    # Onglets en arriere-plan non ralentis (mode contextes: un seul onglet est au premier plan)
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    if headless:
+        options.add_argument("--headless=new")
+    if network_log:
+        enable_performance_log(options)
+    return options
+
+
+def devtools_ready(address, timeout=1):
+    """Un navigateur ecoute-t-il le protocole DevTools a cette adresse"""
+    try:
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class DriverFactory:
+    """Creer le driver selon le backend: grille Selenium, Chrome local headless ou navigateur DevTools"""
+
+    def __init__(self, backend="remote", grid_url=GRID_URL, chromedriver=None, cdp_address=None, worker_id=None,
+                 network_log=False):
+        if backend not in DRIVER_BACKENDS:
+            raise ValueError(f"Backend de driver inconnu: {backend} (attendu: {', '.join(DRIVER_BACKENDS)})")
+        self.backend = backend
+        self.grid_url = grid_url
+        self.chromedriver = chromedriver
+        self.network_log = network_log
+        self.cdp_address = cdp_address or DEFAULT_CDP_ADDRESS
+        if worker_id is not None:
+            # Un navigateur DevTools par session en mode pool
+            host, _, port = self.cdp_address.rpartition(":")
+            self.cdp_address = f"{host or '127.0.0.1'}:{int(port) + worker_id}"
+        self.browser = None
+        self.profile_dir = None
+
+    def create(self):
+        return getattr(self, self.backend)()
+
+    def remote(self):
+        """Session sur la grille: chaque commande traverse le reseau jusqu'au conteneur selenium"""
+        return webdriver.Remote(command_executor=self.grid_url, options=chrome_options(network_log=self.network_log))
+
+    def local(self):
+        """Chrome headless pilote par un chromedriver local (PATH, CHROMEDRIVER ou Selenium Manager)"""
+        service = Service(executable_path=self.chromedriver) if self.chromedriver else Service()
+        return webdriver.Chrome(service=service, options=chrome_options(headless=True, network_log=self.network_log))
+
+    def cdp(self):
+        """Rattacher chromedriver a un navigateur expose en DevTools, lance ici s'il n'ecoute pas deja"""
+        if not devtools_ready(self.cdp_address):
+            self.launch_browser()
+        options = chrome_options(network_log=self.network_log)
+        options.debugger_address = self.cdp_address
+        service = Service(executable_path=self.chromedriver) if self.chromedriver else Service()
+        return webdriver.Chrome(service=service, options=options)
+
+    def launch_browser(self, timeout=15):
+        binary = os.environ.get("CHROME_BINARY") or next(filter(None, map(shutil.which, CHROME_BINARIES)), None)
+        if not binary:
+            raise RuntimeError(f"Aucun navigateur Chrome trouve pour le mode cdp (CHROME_BINARY ou {', '.join(CHROME_BINARIES)})")
+        host, _, port = self.cdp_address.rpartition(":")
+        self.profile_dir = tempfile.mkdtemp(prefix="security-chrome-")
+        self.browser = subprocess.Popen(
+            [
+                binary,
+                "--headless=new",
+                f"--remote-debugging-address={host or '127.0.0.1'}",
+                f"--remote-debugging-port={port}",
+                f"--user-data-dir={self.profile_dir}",
+                "--no-first-run",
+                *chrome_options().arguments,
+                "about:blank",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if devtools_ready(self.cdp_address):
+                print(f"SUCCES: Navigateur DevTools lance sur {self.cdp_address}")
+                return
+            if self.browser.poll() is not None:
+                break
+            time.sleep(0.2)
+        self.close()
+        raise RuntimeError(f"Navigateur DevTools injoignable sur {self.cdp_address}")
+
+    def close(self):
+        """Arreter le navigateur lance pour le mode cdp (un navigateur deja present est laisse ouvert)"""
+        if self.browser is not None:
+            self.browser.terminate()
+            try:
+                self.browser.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.browser.kill()
+            self.browser = None
+        if self.profile_dir:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+    def describe(self):
+        if self.backend == "remote":
+            return f"grille {self.grid_url}"
+        if self.backend == "local":
+            return f"Chrome headless local ({self.chromedriver or 'chromedriver du PATH'})"
+        return f"navigateur DevTools {self.cdp_address}"
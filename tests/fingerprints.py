@@ -0,0 +1,180 @@
+import hashlib
+import json
+import random
+from urllib.parse import urlsplit
+
+from probe import has_token
+
+# Fragments inseres par le fuzzer (SQL, encodages, separateurs, gabarits)
+FUZZ_TOKENS = [
+    "'", '"', "`", "--", "#", "/*", "*/", ";", ")", "(", "=", "\\", "%27", "%00", "\x00",
+    " OR 1=1", " OR '1'='1", "' OR ''='", " UNION SELECT NULL", " AND 1=0", "admin", "ADMIN",
+    "\t", "\n", " ", "${7*7}", "{{7*7}}", "<", ">", "аdmin", "ａdmin",
+]
+
+# Remplacements visuellement proches (cyrillique, pleine chasse)
+HOMOGLYPHS = {"a": "а", "e": "е", "o": "о", "i": "і", "d": "ԁ", "m": "ｍ", "n": "ｎ"}
+
+MAX_LENGTH = 256
+
+
+def outcome(snapshot, payload=None):
+    """Resultat observable d'une tentative, sans ce qui ne depend que du payload"""
+    error = (snapshot.get("dom") or {}).get("error_message") or ""
+    if payload and payload.strip():
+        # Un message qui reprend la saisie ne doit pas creer un resultat par payload
+        error = error.replace(payload.strip(), "<payload>")
+    storage = sorted(snapshot.get("local_storage", {})) + sorted(f"session:{key}" for key in snapshot.get("session_storage", {}))
+    return {
+        "signin_status": snapshot.get("signin_status"),
+        "path": urlsplit(snapshot.get("url", "")).path,
+        "token": has_token(snapshot),
+        "storage": storage,
+        "cookies": sorted(cookie["name"] for cookie in snapshot.get("cookies", [])),
+        "error": error,
+        "dom_hash": (snapshot.get("dom") or {}).get("hash"),
+    }
+
+
+def fingerprint(result):
+    """Empreinte courte d'un resultat (dict retourne par outcome)"""
+    key = json.dumps(result, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=6).hexdigest()
+
+
+class OutcomeClusters:
+    """Regrouper les cas par empreinte de resultat: un representant capture, les autres comptes"""
+
+    def __init__(self, examples=5):
+        self.examples = examples
+        self.clusters = {}
+
+    def observe(self, key, test_name, payload, result):
+        """Enregistrer un cas; True s'il ouvre un nouveau cluster (representant)"""
+        cluster = self.clusters.get(key)
+        if cluster is None:
+            self.clusters[key] = {
+                "fingerprint": key,
+                "count": 1,
+                "representative": test_name,
+                "outcome": result,
+                "examples": [payload],
+            }
+            return True
+        cluster["count"] += 1
+        if len(cluster["examples"]) < self.examples:
+            cluster["examples"].append(payload)
+        return False
+
+    def representative(self, key):
+        return self.clusters[key]["representative"]
+
+    def count(self, key):
+        cluster = self.clusters.get(key)
+        return cluster["count"] if cluster else 0
+
+    def merge(self, other):
+        """Ajouter les clusters d'une autre session (mode pool)"""
+        for key, cluster in other.clusters.items():
+            mine = self.clusters.get(key)
+            if mine is None:
+                self.clusters[key] = dict(cluster, examples=list(cluster["examples"]))
+                continue
+            mine["count"] += cluster["count"]
+            mine["examples"].extend(cluster["examples"][:self.examples - len(mine["examples"])])
+
+    def summary(self):
+        """Clusters tries par taille decroissante"""
+        return sorted(self.clusters.values(), key=lambda cluster: cluster["count"], reverse=True)
+
+
+class Mutator:
+    """Mutations de chaines pour le fuzzing du formulaire de login"""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def insert_token(self, text):
+        position = self.rng.randint(0, len(text))
+        return text[:position] + self.rng.choice(FUZZ_TOKENS) + text[position:]
+
+    def delete_span(self, text):
+        if not text:
+            return text
+        start = self.rng.randrange(len(text))
+        return text[:start] + text[start + self.rng.randint(1, 4):]
+
+    def flip_case(self, text):
+        if not text:
+            return text
+        position = self.rng.randrange(len(text))
+        return text[:position] + text[position].swapcase() + text[position + 1:]
+
+    def duplicate_span(self, text):
+        if not text:
+            return text
+        start = self.rng.randrange(len(text))
+        span = text[start:start + self.rng.randint(1, 8)]
+        return text[:start] + span + text[start:]
+
+    def homoglyph(self, text):
+        positions = [i for i, char in enumerate(text) if char.lower() in HOMOGLYPHS]
+        if not positions:
+            return self.insert_token(text)
+        position = self.rng.choice(positions)
+        return text[:position] + HOMOGLYPHS[text[position].lower()] + text[position + 1:]
+
+    def pad(self, text):
+        padding = self.rng.choice([" ", "\t", "\u00a0", "\u200b"]) * self.rng.randint(1, 3)
+        return padding + text if self.rng.random() < 0.5 else text + padding
+
+    def percent_encode(self, text):
+        if not text:
+            return text
+        position = self.rng.randrange(len(text))
+        return text[:position] + "".join(f"%{byte:02X}" for byte in text[position].encode("utf-8")) + text[position + 1:]
+
+    def mutate(self, text, other=None):
+        """Appliquer 1 a 3 mutations, avec croisement eventuel avec une autre entree"""
+        operators = [self.insert_token, self.delete_span, self.flip_case, self.duplicate_span,
+                     self.homoglyph, self.pad, self.percent_encode]
+        if other is not None and self.rng.random() < 0.2:
+            text = text[:self.rng.randint(0, len(text))] + other[self.rng.randint(0, len(other)):]
+        for _ in range(self.rng.randint(1, 3)):
+            text = self.rng.choice(operators)(text)
+        return text[:MAX_LENGTH]
+
+
+class FuzzQueue:
+    """File d'entrees du fuzzer: les graines d'abord, puis des mutations orientees vers les resultats rares"""
+
+    def __init__(self, seeds, clusters, seed=1):
+        self.rng = random.Random(seed)
+        self.mutator = Mutator(self.rng)
+        self.clusters = clusters
+        self.pending = [dict(entry) for entry in seeds]
+        self.entries = []
+
+    def next_input(self):
+        """Prochaine entree (username, password) et son parent"""
+        if self.pending:
+            entry = self.pending.pop(0)
+            return entry["username"], entry["password"], None
+        if not self.entries:
+            return "admin", "password", None
+
+        # Energie inversement proportionnelle a la taille du cluster atteint par l'entree
+        weights = [1.0 / max(1, self.clusters.count(entry["fingerprint"])) for entry in self.entries]
+        parent = self.rng.choices(self.entries, weights=weights)[0]
+        other = self.rng.choice(self.entries)
+        username, password = parent["username"], parent["password"]
+        if self.rng.random() < 0.7:
+            username = self.mutator.mutate(username, other["username"])
+        else:
+            password = self.mutator.mutate(password, other["password"])
+        return username, password, parent
+
+    def report(self, username, password, key, new, parent):
+        """Garder les graines et les mutants qui ont produit un nouveau resultat"""
+        if parent is None or new:
+            self.entries.append({"username": username, "password": password, "fingerprint": key})
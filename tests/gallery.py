@@ -0,0 +1,175 @@
+import argparse
+import glob
+import html
+import json
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+THUMB_WIDTH = 320
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Galerie des captures d'ecran - Tests de securite</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        .info {{ background: #f5f5f5; padding: 10px; margin: 10px 0; }}
+        .grid {{ display: grid; grid-template-columns: repeat(auto-fill, minmax({width}px, 1fr)); gap: 16px; }}
+        .screenshot {{ border: 1px solid #ddd; padding: 8px; }}
+        .screenshot.failed {{ border-color: #c62828; background: #fdecea; }}
+        .screenshot.skipped {{ border-color: #ef6c00; background: #fff3e0; }}
+        .screenshot img {{ width: 100%; height: auto; border: 1px solid #ccc; }}
+        .screenshot h3 {{ color: #333; margin: 6px 0; font-size: 13px; word-break: break-all; }}
+        .screenshot p {{ margin: 2px 0; font-size: 12px; color: #555; }}
+    </style>
+</head>
+<body>
+    <h1>Galerie des captures d'ecran - Tests de securite</h1>
+    <div class="info">
+        <strong>Date:</strong> {date}<br>
+        <strong>Nombre de captures:</strong> {count}<br>
+        <strong>Echecs documentes:</strong> {failed}
+    </div>
+    <div class="grid">
+{cards}
+    </div>
+</body>
+</html>
+"""
+
+CARD_TEMPLATE = """        <div class="screenshot{css}">
+            <a href="{original}" target="_blank"><img src="{thumb}" alt="{name}" loading="lazy" decoding="async"{size}></a>
+            <h3>{name}</h3>
+            {test}
+        </div>"""
+
+
+def image_size(path):
+    """Dimensions d'un PNG lues dans l'entete (sans Pillow), None pour les autres formats"""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(24)
+    except OSError:
+        return None
+    if header[:8] != b"\x89PNG\r\n\x1a\n":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def make_thumbnail(job):
+    """Reduire une capture (execute dans un processus du pool); retourne le chemin et la taille de la vignette"""
+    source, target, width = job
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+        with Image.open(target) as thumb:
+            return target, thumb.size
+    with Image.open(source) as image:
+        image = image.convert("RGB")
+        image.thumbnail((width, width * 4))
+        image.save(target, format="JPEG", quality=70, optimize=True)
+        return target, image.size
+
+
+def screenshot_results(report_path):
+    """Test et verdict associes a chaque capture dans un rapport JSON"""
+    if not report_path:
+        return {}
+    try:
+        with open(report_path) as f:
+            results = json.load(f).get("results", [])
+    except (OSError, ValueError):
+        print(f"ATTENTION: Rapport illisible: {report_path}")
+        return {}
+    return {os.path.basename(result["screenshot"]): result for result in results if result.get("screenshot")}
+
+
+def build_gallery(directory="screenshots", output="screenshots_gallery.html", report=None, width=THUMB_WIDTH, workers=None):
+    """Galerie HTML: vignettes reduites en parallele, originaux charges seulement a l'ouverture"""
+    images = sorted(
+        path for path in glob.glob(os.path.join(directory, "*"))
+        if path.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    if not images:
+        return None
+
+    thumbs = {}
+    if Image is None:
+        print("ATTENTION: Pillow absent, galerie sans vignettes (originaux en chargement differe)")
+    else:
+        thumbs_dir = os.path.join(directory, "thumbs")
+        os.makedirs(thumbs_dir, exist_ok=True)
+        jobs = [
+            (path, os.path.join(thumbs_dir, os.path.splitext(os.path.basename(path))[0] + ".jpg"), width)
+            for path in images
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for (source, _, _), thumb in zip(jobs, executor.map(make_thumbnail, jobs, chunksize=8)):
+                thumbs[source] = thumb
+
+    results = screenshot_results(report)
+    base = os.path.dirname(os.path.abspath(output))
+    cards = []
+    failed = 0
+    for path in images:
+        name = os.path.basename(path)
+        thumb, size = thumbs.get(path, (path, image_size(path)))
+        result = results.get(name)
+        test = ""
+        css = ""
+        if result:
+            status = "non concluant" if result.get("skipped") else "reussi" if result["passed"] else "ECHEC"
+            test = f"<p><strong>{html.escape(result['test'])}</strong> - {status}</p><p>{html.escape(result.get('details') or '')}</p>"
+            if result.get("skipped"):
+                css = " skipped"
+            elif not result["passed"]:
+                css = " failed"
+                failed += 1
+        cards.append(CARD_TEMPLATE.format(
+            css=css,
+            original=html.escape(os.path.relpath(path, base)),
+            thumb=html.escape(os.path.relpath(thumb, base)),
+            name=html.escape(name),
+            size=f' width="{size[0]}" height="{size[1]}"' if size else "",
+            test=test,
+        ))
+
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(PAGE_TEMPLATE.format(
+            width=width,
+            date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            count=len(images),
+            failed=failed,
+            cards="\n".join(cards),
+        ))
+    return output
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Galerie HTML des captures d'ecran avec vignettes")
+    parser.add_argument("--dir", default="screenshots", help="Repertoire des captures")
+    parser.add_argument("--output", default="screenshots_gallery.html")
+    parser.add_argument("--report", help="Rapport JSON pour associer tests et verdicts (par defaut: le plus recent)")
+    parser.add_argument("--width", type=int, default=THUMB_WIDTH, help="Largeur des vignettes (pixels)")
+    parser.add_argument("--workers", type=int, default=None, help="Processus de reduction (par defaut: nombre de CPU)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = args.report
+    if report is None:
+        reports = sorted(glob.glob("security_report_*.json"), key=os.path.getmtime)
+        report = reports[-1] if reports else None
+    output = build_gallery(args.dir, args.output, report, args.width, args.workers)
+    if output:
+        print(f"SUCCES: Galerie HTML creee: {output}")
+    else:
+        print(f"ATTENTION: Aucune capture dans {args.dir}")
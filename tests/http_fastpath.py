@@ -0,0 +1,185 @@
+import asyncio
+import json
+import ssl
+import urllib.request
+from urllib.parse import urlsplit
+
+# URL de repli utilisee par AuthService quand config.json est inaccessible
+DEFAULT_API_URL = "http://backend-api:8080/api"
+
+
+def resolve_api_url(app_url, timeout=5):
+    """Lire apiUrl dans assets/config.json comme le fait l'application"""
+    try:
+        with urllib.request.urlopen(f"{app_url.rstrip('/')}/assets/config.json", timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))["apiUrl"]
+    except Exception as e:
+        print(f"ATTENTION: config.json illisible ({str(e)}), API par defaut: {DEFAULT_API_URL}")
+        return DEFAULT_API_URL
+
+
+class HttpResponse:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8")) if self.body else None
+
+
+class AsyncHttpPool:
+    """Client HTTP/1.1 asyncio minimal avec connexions keep-alive reutilisees"""
+
+    def __init__(self, base_url, size=8, timeout=10):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.base_path = parts.path.rstrip("/")
+        self.size = size
+        self.timeout = timeout
+        self.idle = []
+        self.opened = 0
+        self.slots = asyncio.Semaphore(size)
+
+    async def _connect(self):
+        ssl_context = ssl.create_default_context() if self.scheme == "https" else None
+        self.opened += 1
+        return await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=ssl_context),
+            self.timeout
+        )
+
+    async def _read_response(self, reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Connexion fermee par le serveur")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                body += await reader.readexactly(size)
+                await reader.readline()
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            headers["connection"] = "close"
+
+        return HttpResponse(status, headers, body)
+
+    async def _send(self, connection, raw):
+        reader, writer = connection
+        try:
+            writer.write(raw)
+            await writer.drain()
+            return await asyncio.wait_for(self._read_response(reader), self.timeout)
+        except BaseException:
+            writer.close()
+            raise
+
+    async def request(self, method, path, body=None, headers=None):
+        """Envoyer une requete sur une connexion du pool (ouverte si besoin)"""
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        lines = [
+            f"{method} {self.base_path}{path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Connection: keep-alive",
+            "Accept: application/json",
+            f"Content-Length: {len(payload)}",
+        ]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        raw = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload
+
+        async with self.slots:
+            if self.idle:
+                connection = self.idle.pop()
+                try:
+                    response = await self._send(connection, raw)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # Connexion keep-alive fermee entre-temps par le serveur: nouvelle connexion
+                    connection = await self._connect()
+                    response = await self._send(connection, raw)
+            else:
+                connection = await self._connect()
+                response = await self._send(connection, raw)
+
+            if response.headers.get("connection", "").lower() == "close":
+                connection[1].close()
+            else:
+                self.idle.append(connection)
+            return response
+
+    async def close(self):
+        while self.idle:
+            reader, writer = self.idle.pop()
+            writer.close()
+
+
+class HttpFastPath:
+    """Envoyer les payloads d'injection directement sur /auth/signin, sans navigateur"""
+
+    def __init__(self, api_url, concurrency=8, timeout=10):
+        self.api_url = api_url
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    async def check(self, client, case):
+        """Tester un payload: un token dans la reponse signifie une authentification reussie"""
+        username = case["username"]
+        label = f"Protection SQL - {username[:20]}" if case["category"] == "sql" else f"Protection bypass - {username.strip()}"
+        try:
+            response = await client.request("POST", "/auth/signin", {"username": username, "password": case["password"]})
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            token = data.get("token") if isinstance(data, dict) else None
+            if 200 <= response.status < 300 and token:
+                return {
+                    "test": label,
+                    "passed": False,
+                    "details": f"Vulnerabilites: Token genere malgre les mauvais credentials (HTTP {response.status})"
+                }
+            return {"test": label, "passed": True, "details": f"Tentative bloquee (HTTP {response.status})"}
+        except Exception as e:
+            return {"test": label.replace("Protection", "Test", 1), "passed": False, "details": f"Erreur: {str(e)}"}
+
+    async def run_async(self, cases):
+        client = AsyncHttpPool(self.api_url, size=self.concurrency, timeout=self.timeout)
+        results = {}
+        iterator = enumerate(cases)
+
+        async def worker():
+            # Chaque worker tire le cas suivant: le corpus reste lu en flux
+            for index, case in iterator:
+                results[index] = await self.check(client, case)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            await client.close()
+
+        print(f"SUCCES: {len(results)} payloads envoyes via HTTP, {client.opened} connexion(s) ouverte(s)")
+        return [results[index] for index in sorted(results)]
+
+    def run(self, cases):
+        """Executer tous les cas et retourner les resultats dans l'ordre du corpus"""
+        return asyncio.run(self.run_async(cases))
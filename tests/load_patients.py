@@ -0,0 +1,237 @@
+import asyncio
+import random
+import time
+
+from http_fastpath import AsyncHttpPool
+from stub_backend import generate_patient
+from timing import LatencyHistogram
+
+# Repartition par defaut des appels de PatientService
+DEFAULT_MIX = {
+    "fetchPatients": 50,
+    "getPatient": 20,
+    "addPatient": 10,
+    "updatePatient": 10,
+    "deletePatient": 10,
+}
+
+
+def parse_mix(text):
+    """Lire un melange 'fetchPatients=50,getPatient=20,...'"""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Operation inconnue dans le melange: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def patient_request(rng, index):
+    """Corps IPatientRequest synthetique"""
+    patient = generate_patient(rng, index)
+    return {
+        "nom": patient["nom"],
+        "prenom": patient["prenom"],
+        "sexe": patient["sexe"],
+        "taille": patient["taille"],
+        "poids": patient["poids"],
+        "dateNaissance": patient["dateNaissance"],
+        "contacts": [{"type": c["type"], "contact": c["contact"]} for c in patient["contacts"]],
+    }
+
+
+class PatientLoadTest:
+    """Charge CRUD sur /api/v1/patients a debit cible, avec histogrammes de latence par operation"""
+
+    def __init__(self, api_url, username="admin", password="password123", rate=20.0, duration=30.0,
+                 concurrency=16, mix=None, seed=1, timeout=10):
+        self.api_url = api_url
+        self.username = username
+        self.password = password
+        self.rate = rate
+        self.duration = duration
+        self.concurrency = concurrency
+        self.mix = mix or dict(DEFAULT_MIX)
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        # Toutes les operations: un repli (creer avant de supprimer) peut sortir du melange
+        # Latence depuis le creneau prevu (retard d'envoi compris) et temps de service depuis l'envoi
+        self.histograms = {name: LatencyHistogram() for name in DEFAULT_MIX}
+        self.service_histograms = {name: LatencyHistogram() for name in DEFAULT_MIX}
+        self.errors = {name: 0 for name in DEFAULT_MIX}
+        self.statuses = {name: {} for name in DEFAULT_MIX}
+        self.known_ids = []
+        # Seuls les patients crees par la charge sont modifies ou supprimes
+        self.created_ids = []
+        # Patients vises par une operation en cours: ni supprimes ni relus entre-temps (faux 404)
+        self.reserved_ids = set()
+        self.max_lag = 0.0
+
+    async def login(self, client):
+        """Se connecter une fois et retourner l'en-tete bearer reutilise par tous les appels"""
+        response = await client.request("POST", "/auth/signin", {"username": self.username, "password": self.password})
+        data = response.json() if response.status < 300 else None
+        if not data or not data.get("token"):
+            raise RuntimeError(f"Connexion impossible pour la charge (HTTP {response.status})")
+        return {"Authorization": f"Bearer {data['token']}"}
+
+    def free_ids(self, ids):
+        return [patient_id for patient_id in ids if patient_id not in self.reserved_ids]
+
+    def reserve(self, ids):
+        """Choisir un patient libre et le reserver le temps de l'operation"""
+        patient_id = self.rng.choice(self.free_ids(ids))
+        self.reserved_ids.add(patient_id)
+        return patient_id
+
+    def available(self, operation):
+        if operation in ("updatePatient", "deletePatient"):
+            return bool(self.free_ids(self.created_ids))
+        if operation == "getPatient":
+            return bool(self.free_ids(self.known_ids))
+        return True
+
+    def pick_operation(self):
+        operation = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if self.available(operation):
+            return operation
+        # Repli sur une operation du melange realisable maintenant
+        possible = [name for name in self.mix if self.mix[name] > 0 and self.available(name)]
+        if possible:
+            return self.rng.choices(possible, weights=[self.mix[name] for name in possible])[0]
+        # Aucune (ex. deletePatient seul): creer ou lister d'abord les patients vises
+        return "addPatient" if operation in ("updatePatient", "deletePatient") else "fetchPatients"
+
+    async def call(self, client, headers, operation, index):
+        """Executer une operation de PatientService et retourner la reponse"""
+        if operation == "fetchPatients":
+            response = await client.request("GET", "/v1/patients", headers=headers)
+            if response.status < 300 and not self.known_ids:
+                data = (response.json() or {}).get("data") or []
+                self.known_ids = [p["id"] for p in data[:1000] if isinstance(p, dict) and "id" in p]
+            return response
+        if operation == "getPatient":
+            patient_id = self.reserve(self.known_ids)
+            try:
+                return await client.request("GET", f"/v1/patients/{patient_id}", headers=headers)
+            finally:
+                self.reserved_ids.discard(patient_id)
+        if operation == "addPatient":
+            response = await client.request("POST", "/v1/patients", patient_request(self.rng, index), headers)
+            data = (response.json() or {}).get("data") if response.status < 300 else None
+            if isinstance(data, dict) and data.get("id"):
+                self.created_ids.append(data["id"])
+                self.known_ids.append(data["id"])
+            return response
+        if operation == "updatePatient":
+            patient_id = self.reserve(self.created_ids)
+            try:
+                return await client.request("PUT", f"/v1/patients/{patient_id}", patient_request(self.rng, index), headers)
+            finally:
+                self.reserved_ids.discard(patient_id)
+        if operation == "deletePatient":
+            # Retire des listes avant l'envoi: plus aucune operation ne le vise
+            patient_id = self.reserve(self.created_ids)
+            self.created_ids.remove(patient_id)
+            if patient_id in self.known_ids:
+                self.known_ids.remove(patient_id)
+            try:
+                return await client.request("DELETE", f"/v1/patients/{patient_id}", headers=headers)
+            finally:
+                self.reserved_ids.discard(patient_id)
+        raise ValueError(operation)
+
+    async def cleanup(self, client, headers):
+        """Supprimer les patients crees par la charge et encore presents en base"""
+        ids, self.created_ids = self.created_ids, []
+        responses = await asyncio.gather(
+            *(client.request("DELETE", f"/v1/patients/{patient_id}", headers=headers) for patient_id in ids),
+            return_exceptions=True
+        )
+        for patient_id, response in zip(ids, responses):
+            status = str(response) if isinstance(response, Exception) else response.status
+            if not isinstance(status, int) or status >= 300:
+                print(f"ATTENTION: Patient de charge {patient_id} non supprime ({status})")
+
+    async def run_async(self):
+        client = AsyncHttpPool(self.api_url, size=self.concurrency, timeout=self.timeout)
+        headers = None
+        try:
+            headers = await self.login(client)
+            start = time.monotonic()
+            next_slot = 0
+            completed = 0
+
+            async def worker():
+                nonlocal next_slot, completed
+                while True:
+                    # Modele ouvert: le creneau i est prevu a start + i / rate
+                    slot = next_slot
+                    next_slot += 1
+                    scheduled = start + slot / self.rate
+                    if scheduled - start >= self.duration:
+                        return
+                    delay = scheduled - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    else:
+                        self.max_lag = max(self.max_lag, -delay)
+
+                    operation = self.pick_operation()
+                    began = time.monotonic()
+                    try:
+                        response = await self.call(client, headers, operation, slot)
+                        status = response.status
+                    except Exception:
+                        status = "exception"
+                    finished = time.monotonic()
+                    # Mesure depuis le creneau prevu: un envoi retarde compte dans la latence (omission coordonnee)
+                    self.histograms[operation].record(finished - scheduled)
+                    self.service_histograms[operation].record(finished - began)
+                    self.statuses[operation][str(status)] = self.statuses[operation].get(str(status), 0) + 1
+                    if status == "exception" or status >= 400:
+                        self.errors[operation] += 1
+                    completed += 1
+
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+            elapsed = time.monotonic() - start
+        finally:
+            # Ne pas laisser en base les patients crees par la charge, meme apres une erreur
+            if headers and self.created_ids:
+                await self.cleanup(client, headers)
+            await client.close()
+
+        return self.report(completed, elapsed)
+
+    def report(self, completed, elapsed):
+        endpoints = {}
+        for operation, histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            endpoints[operation] = dict(histogram.summary(), **{
+                "throughput": round(histogram.count / elapsed, 2) if elapsed else 0.0,
+                "errors": self.errors[operation],
+                "error_rate": round(self.errors[operation] / histogram.count, 4),
+                "statuses": self.statuses[operation],
+                "service": self.service_histograms[operation].summary(),
+            })
+        total_errors = sum(self.errors.values())
+        return {
+            "api_url": self.api_url,
+            "target_rate": self.rate,
+            "duration": round(elapsed, 3),
+            "concurrency": self.concurrency,
+            "mix": self.mix,
+            "requests": completed,
+            "throughput": round(completed / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(total_errors / completed, 4) if completed else 0.0,
+            "max_schedule_lag": round(self.max_lag, 3),
+            "endpoints": endpoints,
+        }
+
+    def run(self):
+        return asyncio.run(self.run_async())
@@ -0,0 +1,309 @@
+import json
+import threading
+from urllib.parse import urlsplit
+
+from timing import percentile
+
+# Au-dela, une reponse de /auth/signin est signalee comme lente
+SIGNIN_SLOW_MS = 1000.0
+
+# Methodes dont la repetition est attendue (pre-vol CORS avant chaque appel API)
+IGNORED_DUPLICATES = ("OPTIONS",)
+
+
+def enable_performance_log(options):
+    """Activer le journal performance (evenements Network DevTools) dans les options Chrome"""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    return options
+
+
+def read_performance_log(driver):
+    """Vider le journal performance de la session (un aller-retour)"""
+    if hasattr(driver, "get_log"):
+        return driver.get_log("performance")
+    return driver.execute("getLog", {"type": "performance"})["value"]
+
+
+class PerformanceLogBuffer:
+    """Journal performance commun a la session, reparti par onglet (webview) entre les contextes"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    @classmethod
+    def for_driver(cls, driver):
+        """Un seul tampon par driver, partage par les sessions de test qui l'utilisent"""
+        buffer = getattr(driver, "security_performance_log", None)
+        if buffer is None:
+            buffer = cls(driver)
+            driver.security_performance_log = buffer
+        return buffer
+
+    def drain(self, webview=None):
+        """Evenements Network recus depuis le dernier appel (tous, ou ceux d'un onglet)"""
+        with self.lock:
+            for entry in read_performance_log(self.driver):
+                message = json.loads(entry["message"])
+                event = message.get("message", {})
+                if event.get("method", "").startswith("Network."):
+                    self.pending.setdefault(message.get("webview"), []).append(event)
+            if webview is None:
+                events = [event for events in self.pending.values() for event in events]
+                self.pending = {}
+                return events
+            return self.pending.pop(webview, [])
+
+
+def request_phases(timing, finished):
+    """Phases d'une requete (ms) a partir de ResourceTiming DevTools"""
+    if not timing:
+        return {}
+
+    def span(start, end):
+        value = timing.get(end, -1) - timing.get(start, -1)
+        return round(value, 1) if timing.get(start, -1) >= 0 and value >= 0 else 0.0
+
+    phases = {
+        "dns": span("dnsStart", "dnsEnd"),
+        "connect": span("connectStart", "connectEnd"),
+        "ssl": span("sslStart", "sslEnd"),
+        "send": span("sendStart", "sendEnd"),
+        "wait": span("sendEnd", "receiveHeadersEnd"),
+    }
+    if finished is not None:
+        headers_end = timing["requestTime"] + timing.get("receiveHeadersEnd", 0) / 1000
+        phases["receive"] = round(max(0.0, finished - headers_end) * 1000, 1)
+    return phases
+
+
+def initiator_of(initiator):
+    """Origine d'une requete: type et premiere frame de pile (script:ligne) si disponible"""
+    if not initiator:
+        return None
+    frames = (initiator.get("stack") or {}).get("callFrames") or []
+    if frames:
+        frame = frames[0]
+        name = frame.get("functionName") or "?"
+        return f"{initiator.get('type')} {name} {frame.get('url', '').rsplit('/', 1)[-1]}:{frame.get('lineNumber', 0) + 1}"
+    if initiator.get("url"):
+        return f"{initiator.get('type')} {initiator['url'].rsplit('/', 1)[-1]}"
+    return initiator.get("type")
+
+
+def build_requests(events):
+    """Requetes reconstituees a partir des evenements Network (ordre de depart)"""
+    requests = {}
+    order = []
+    for event in events:
+        method = event.get("method")
+        params = event.get("params", {})
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            if request_id in requests and params.get("redirectResponse"):
+                # Redirection: la requete precedente est close sous un identifiant distinct
+                previous = requests.pop(request_id)
+                previous["status"] = params["redirectResponse"].get("status")
+                previous["end"] = params.get("timestamp")
+                requests[f"{request_id}:{len(order)}"] = previous
+            request = params.get("request", {})
+            requests[request_id] = {
+                "url": request.get("url"),
+                "method": request.get("method"),
+                "type": params.get("type"),
+                "loader": params.get("loaderId"),
+                "initiator": initiator_of(params.get("initiator")),
+                "start": params.get("timestamp"),
+                "wall_time": params.get("wallTime"),
+                "status": None,
+                "timing": None,
+                "end": None,
+                "bytes": 0,
+                "cached": False,
+                "error": None,
+            }
+            order.append(request_id)
+        elif request_id in requests:
+            request = requests[request_id]
+            if method == "Network.responseReceived":
+                response = params.get("response", {})
+                request["status"] = response.get("status")
+                request["timing"] = response.get("timing")
+                request["cached"] = bool(response.get("fromDiskCache") or response.get("fromServiceWorker"))
+            elif method == "Network.loadingFinished":
+                request["end"] = params.get("timestamp")
+                request["bytes"] = params.get("encodedDataLength", 0)
+            elif method == "Network.loadingFailed":
+                request["end"] = params.get("timestamp")
+                request["error"] = params.get("errorText")
+
+    result = []
+    for request in sorted(requests.values(), key=lambda request: request["start"] or 0):
+        total = (request["end"] - request["start"]) * 1000 if request["end"] and request["start"] else None
+        result.append({
+            "url": request["url"],
+            "method": request["method"],
+            "type": request["type"],
+            "status": request["status"],
+            "loader": request["loader"],
+            "initiator": request["initiator"],
+            "start": request["start"],
+            "wall_time": request["wall_time"],
+            "total_ms": round(total, 1) if total is not None else None,
+            "phases": request_phases(request["timing"], request["end"]),
+            "bytes": request["bytes"],
+            "cached": request["cached"],
+            "error": request["error"],
+        })
+    return result
+
+
+def find_network_issues(requests, app_url, slow_signin_ms=SIGNIN_SLOW_MS):
+    """Doublons, /auth/signin lent ou envoye a l'origine de l'application, requetes en echec"""
+    findings = []
+    seen = {}
+    for request in requests:
+        if request["method"] in IGNORED_DUPLICATES or not request["url"] or request["url"].startswith("data:"):
+            continue
+        # Doublon = meme requete dans le meme document (deux navigations rechargent legitimement)
+        seen.setdefault((request["loader"], request["method"], request["url"]), []).append(request)
+    for (_, method, url), same in seen.items():
+        if len(same) > 1:
+            initiators = sorted({request["initiator"] or "?" for request in same})
+            findings.append({
+                "kind": "duplicate",
+                "detail": f"{method} {urlsplit(url).path} x{len(same)} ({'; '.join(initiators)})",
+            })
+
+    app_origin = urlsplit(app_url).netloc
+    for request in requests:
+        if request["method"] in IGNORED_DUPLICATES or "/auth/signin" not in (request["url"] or ""):
+            continue
+        if urlsplit(request["url"]).netloc == app_origin:
+            # apiUrl encore vide quand le login part avant la fin du chargement de config.json
+            findings.append({"kind": "signin_origin", "detail": f"/auth/signin envoye a l'application: {request['url']}"})
+        if request["total_ms"] is not None and request["total_ms"] > slow_signin_ms:
+            findings.append({"kind": "slow_signin", "detail": f"/auth/signin en {request['total_ms']:.0f}ms (> {slow_signin_ms:.0f}ms)"})
+
+    for request in requests:
+        if request["error"] and request["error"] != "net::ERR_ABORTED":
+            findings.append({"kind": "failed", "detail": f"{request['method']} {request['url']}: {request['error']}"})
+    return findings
+
+
+class NetworkLog:
+    """Requetes du navigateur rattachees a chaque resultat de test, a partir du journal performance"""
+
+    def __init__(self, driver, app_url, webview=None, slow_signin_ms=SIGNIN_SLOW_MS):
+        self.buffer = PerformanceLogBuffer.for_driver(driver)
+        self.app_url = app_url
+        self.webview = webview
+        self.slow_signin_ms = slow_signin_ms
+        self.enabled = True
+
+    def close_case(self, test_name):
+        """Requetes faites depuis le dernier resultat et anomalies detectees"""
+        if not self.enabled:
+            return None
+        try:
+            events = self.buffer.drain(self.webview)
+        except Exception as e:
+            # Session sans journal performance (broker, grille non configuree)
+            print(f"ATTENTION: Journal reseau indisponible, capture desactivee: {str(e)}")
+            self.enabled = False
+            return None
+        requests = build_requests(events)
+        return {"requests": requests, "findings": find_network_issues(requests, self.app_url, self.slow_signin_ms)}
+
+
+def waterfall(requests):
+    """Cascade des requetes: debut et phases relatifs a la premiere requete"""
+    timed = [request for request in requests if request["start"]]
+    if not timed:
+        return []
+    origin = min(request["start"] for request in timed)
+    return [
+        {
+            "url": request["url"],
+            "method": request["method"],
+            "status": request["status"],
+            "start_ms": round((request["start"] - origin) * 1000, 1),
+            "total_ms": request["total_ms"],
+            "phases": request["phases"],
+            "bytes": request["bytes"],
+            "initiator": request["initiator"],
+        }
+        for request in timed
+    ]
+
+
+def print_waterfall(rows, width=40):
+    if not rows:
+        return
+    span = max((row["start_ms"] + (row["total_ms"] or 0)) for row in rows) or 1.0
+    for row in rows:
+        offset = int(row["start_ms"] / span * width)
+        length = max(1, int((row["total_ms"] or 0) / span * width))
+        bar = " " * offset + "#" * min(length, width - offset)
+        path = urlsplit(row["url"] or "").path or row["url"]
+        total = f"{row['total_ms']:.0f}ms" if row["total_ms"] is not None else "n/d"
+        print(f"RESEAU |{bar:<{width}}| {row['start_ms']:>7.0f}ms +{total:>7} {row['status'] or '-'} {row['method']} {path[-60:]}")
+
+
+def network_summary(results):
+    """Synthese reseau du run: volumes, latence par endpoint, /auth/signin, anomalies, cascade du demarrage"""
+    endpoints = {}
+    findings = {}
+    boot = None
+    signin = []
+    total_requests = 0
+    total_bytes = 0
+    for result in results:
+        network = result.get("network")
+        if not network:
+            continue
+        requests = network["requests"]
+        total_requests += len(requests)
+        total_bytes += sum(request["bytes"] for request in requests)
+        if boot is None and any(request["type"] == "Document" for request in requests):
+            # Premier chargement complet de l'application dans le run
+            boot = {"test": result["test"], "waterfall": waterfall(requests)}
+        for request in requests:
+            key = f"{request['method']} {urlsplit(request['url'] or '').path}"
+            entry = endpoints.setdefault(key, {"count": 0, "bytes": 0, "durations": []})
+            entry["count"] += 1
+            entry["bytes"] += request["bytes"]
+            if request["total_ms"] is not None:
+                entry["durations"].append(request["total_ms"])
+                if "/auth/signin" in key and request["method"] != "OPTIONS":
+                    signin.append(request["total_ms"])
+        for finding in network["findings"]:
+            entry = findings.setdefault((finding["kind"], finding["detail"]), {**finding, "count": 0, "tests": []})
+            entry["count"] += 1
+            if len(entry["tests"]) < 5:
+                entry["tests"].append(result["test"])
+
+    return {
+        "requests": total_requests,
+        "bytes": total_bytes,
+        "endpoints": {
+            key: {
+                "count": entry["count"],
+                "bytes": entry["bytes"],
+                "p50_ms": round(percentile(entry["durations"], 0.50), 1) if entry["durations"] else None,
+                "p95_ms": round(percentile(entry["durations"], 0.95), 1) if entry["durations"] else None,
+                "max_ms": max(entry["durations"]) if entry["durations"] else None,
+            }
+            for key, entry in sorted(endpoints.items(), key=lambda item: item[1]["count"], reverse=True)
+        },
+        "signin": {
+            "count": len(signin),
+            "p50_ms": round(percentile(signin, 0.50), 1) if signin else None,
+            "p95_ms": round(percentile(signin, 0.95), 1) if signin else None,
+            "max_ms": max(signin) if signin else None,
+        },
+        "findings": sorted(findings.values(), key=lambda finding: finding["count"], reverse=True),
+        "boot": boot,
+    }
@@ -0,0 +1,221 @@
+import json
+
+from probe import describe_xss_events
+
+# Navigation dans l'application deja chargee via le routeur Angular (pas de rechargement)
+ROUTE_JS = """
+var path = arguments[0];
+if (!document.querySelector('app-root') || location.origin !== arguments[1]) {
+    return false;
+}
+history.pushState(null, '', path);
+window.dispatchEvent(new PopStateEvent('popstate', {state: null}));
+return true;
+"""
+
+# Remplissage du formulaire patient en un seul appel: affectation des valeurs,
+# evenements input/blur pour les FormControl, selection des mat-select dans l'overlay,
+# puis soumission si le formulaire est valide. La reponse POST/PUT est conservee.
+FILL_PATIENT_FORM_JS = """
+var values = arguments[0];
+var done = arguments[arguments.length - 1];
+var form = document.querySelector('form.patient-form');
+if (!form) { done({filled: false, submitted: false, error: 'formulaire introuvable'}); return; }
+
+if (!window.__secPatientHook) {
+    window.__secPatientHook = true;
+    var open = XMLHttpRequest.prototype.open;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__secPatientWrite = /^(POST|PUT)$/i.test(method) && String(url).indexOf('/v1/patients') !== -1;
+        return open.apply(this, arguments);
+    };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        var xhr = this;
+        if (xhr.__secPatientWrite) {
+            xhr.addEventListener('loadend', function () {
+                window.__secPatientWrite = {status: xhr.status, body: xhr.responseText};
+            });
+        }
+        return send.apply(this, arguments);
+    };
+}
+window.__secPatientWrite = null;
+
+var setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+var setInput = function (input, value) {
+    setter.call(input, value == null ? '' : String(value));
+    input.dispatchEvent(new Event('input', {bubbles: true}));
+    input.dispatchEvent(new Event('blur'));
+};
+var control = function (root, name) { return root.querySelector('[formcontrolname="' + name + '"]'); };
+var items = function () { return form.querySelectorAll('.contact-item'); };
+// Le changement de detection est coalesce: attendre que le DOM suive
+var waitFor = function (test, next, tries) {
+    var found = test();
+    if (found || tries <= 0) { next(found); return; }
+    setTimeout(function () { waitFor(test, next, tries - 1); }, 20);
+};
+var selects = [];
+
+var growContacts = function (next) {
+    // Le bouton d'ajout est un bouton de soumission implicite: l'utiliser avant de remplir
+    if (items().length >= values.contacts.length) { next(); return; }
+    var count = items().length;
+    form.querySelector('.contact-list > button').click();
+    waitFor(function () { return items().length > count; }, function () { growContacts(next); }, 50);
+};
+
+var fillInputs = function () {
+    ['nom', 'prenom', 'dateNaissance', 'taille', 'poids'].forEach(function (name) {
+        setInput(control(form, name), values[name]);
+    });
+    selects.push([control(form, 'sexe'), values.sexe]);
+    var contactItems = items();
+    values.contacts.forEach(function (contact, index) {
+        var item = contactItems[index];
+        if (!item) { return; }
+        setInput(control(item, 'contact'), contact.contact);
+        selects.push([control(item, 'type'), contact.type]);
+    });
+};
+
+var chooseNext = function (next) {
+    var pending = selects.shift();
+    if (!pending) { next(); return; }
+    (pending[0].querySelector('.mat-mdc-select-trigger') || pending[0]).click();
+    waitFor(function () {
+        var options = document.querySelectorAll('.cdk-overlay-container mat-option');
+        for (var i = 0; i < options.length; i++) {
+            if (options[i].textContent.trim().toUpperCase() === pending[1]) { return options[i]; }
+        }
+        return null;
+    }, function (option) {
+        if (option) { option.click(); }
+        waitFor(function () { return !document.querySelector('.cdk-overlay-container mat-option'); },
+                function () { chooseNext(next); }, 50);
+    }, 50);
+};
+
+growContacts(function () {
+    fillInputs();
+    chooseNext(function () {
+        waitFor(function () { return form.classList.contains('ng-valid'); }, function (valid) {
+            var invalid = Array.prototype.map.call(
+                form.querySelectorAll('[formcontrolname].ng-invalid'),
+                function (el) { return el.getAttribute('formcontrolname'); }
+            );
+            if (valid && values.submit !== false) {
+                form.querySelector('button[type="submit"]').click();
+            }
+            done({filled: true, submitted: !!valid && values.submit !== false, invalid: invalid});
+        }, 10);
+    });
+});
+"""
+
+# Lecture de la reponse POST/PUT capturee par FILL_PATIENT_FORM_JS
+PATIENT_WRITE_JS = "return window.__secPatientWrite || null;"
+
+# Affichage de patient-details: boites de dialogue, elements injectes et rendu litteral des payloads
+DETAILS_JS = """
+var path = arguments[0];
+var payloads = arguments[1];
+var done = arguments[arguments.length - 1];
+window.__secDialogs = [];
+['alert', 'confirm', 'prompt'].forEach(function (name) {
+    window[name] = function (message) { window.__secDialogs.push(name + ': ' + String(message)); return null; };
+});
+history.pushState(null, '', path);
+window.dispatchEvent(new PopStateEvent('popstate', {state: null}));
+
+var started = Date.now();
+var collect = function () {
+    var root = document.querySelector('app-patient-details');
+    var card = root && root.querySelector('mat-card');
+    var injected = [];
+    if (root) {
+        root.querySelectorAll('*').forEach(function (el) {
+            var tag = el.tagName.toLowerCase();
+            if (['script', 'iframe', 'object', 'embed', 'img', 'svg', 'video', 'audio'].indexOf(tag) !== -1) {
+                injected.push(tag);
+            }
+            Array.prototype.forEach.call(el.attributes, function (attr) {
+                if (/^on/i.test(attr.name) || /^\\s*javascript:/i.test(attr.value)) {
+                    injected.push(tag + '[' + attr.name + ']');
+                }
+            });
+        });
+    }
+    var text = card ? card.textContent : '';
+    done({
+        rendered: !!card,
+        url: location.pathname,
+        dialogs: window.__secDialogs,
+        injected: injected,
+        events: window.__secXss ? window.__secXss.events.splice(0) : [],
+        literal: payloads.every(function (payload) { return text.indexOf(payload.trim()) !== -1; })
+    });
+};
+var poll = function () {
+    if (document.querySelector('app-patient-details mat-card-title') || Date.now() - started > 10000) {
+        // Une frame de plus pour laisser les scripts eventuellement injectes s'executer
+        requestAnimationFrame(function () { setTimeout(collect, 50); });
+        return;
+    }
+    setTimeout(poll, 20);
+};
+poll();
+"""
+
+# Suppression du patient cree, avec l'API et le token de la page
+DELETE_PATIENT_JS = """
+var id = arguments[0];
+var done = arguments[arguments.length - 1];
+fetch('/assets/config.json').then(function (response) { return response.json(); }).then(function (config) {
+    return fetch(config.apiUrl + '/v1/patients/' + id, {
+        method: 'DELETE',
+        headers: {'Authorization': 'Bearer ' + localStorage.getItem('auth_token')}
+    });
+}).then(function (response) { done(response.status); }, function () { done(0); });
+"""
+
+
+def form_values(payload, index):
+    """Valeurs du formulaire patient: le payload dans chaque champ texte, y compris les contacts"""
+    return {
+        "nom": payload,
+        "prenom": payload,
+        "sexe": "FEMME" if index % 2 else "HOMME",
+        "dateNaissance": "1990-01-15",
+        "taille": 170,
+        "poids": 70,
+        "contacts": [
+            {"type": "EMAIL", "contact": payload},
+            {"type": "MOBILE", "contact": payload},
+        ],
+    }
+
+
+def written_patient_id(write):
+    """Identifiant du patient dans la reponse IApiResponse d'un POST/PUT"""
+    try:
+        data = json.loads(write["body"]).get("data")
+    except (TypeError, ValueError, AttributeError):
+        return None
+    return data.get("id") if isinstance(data, dict) else None
+
+
+def details_findings(details, write_status):
+    """Problemes releves apres une ecriture et l'affichage de patient-details"""
+    findings = []
+    if write_status >= 500:
+        findings.append(f"Erreur serveur HTTP {write_status}")
+    if details:
+        if details["dialogs"]:
+            findings.append(f"Boite de dialogue declenchee ({'; '.join(details['dialogs'])[:60]})")
+        if details["injected"]:
+            findings.append(f"Elements injectes dans patient-details: {', '.join(sorted(set(details['injected'])))}")
+        if details.get("events"):
+            findings.append(f"Instrumentation XSS: {describe_xss_events(details['events'])}")
+    return findings
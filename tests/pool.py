@@ -0,0 +1,133 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from waits import WaitEngine
+
+
+class SessionPool:
+    """Repartir les cas de test sur N sessions Selenium Grid en parallele"""
+
+    def __init__(self, app_url, workers, tests_class, **options):
+        self.app_url = app_url
+        self.workers = workers
+        self.tests_class = tests_class
+        self.options = options
+        self.lock = threading.Lock()
+        self.case_results = {}
+        self.screenshot_counts = {}
+        self.wait_records = []
+        self.spans = []
+        self.commands = []
+        self.written = []
+        self.dropped = []
+        self.clusters = []
+        self.caches = []
+        self.cache_disabled = None
+        self.build_key = None
+        self.result_stream = None
+        self.positions = {}
+
+    def next_case(self, cases):
+        """Prendre le cas suivant dans l'iterateur partage (lu a la demande)"""
+        with self.lock:
+            return next(cases, None)
+
+    def worker(self, worker_id, cases):
+        """Ouvrir une session et executer les cas pris dans l'iterateur jusqu'a epuisement"""
+        tests = self.tests_class(self.app_url, worker_id=worker_id, **self.options)
+        # Un seul flux de resultats pour toutes les sessions
+        tests.result_stream = self.result_stream
+        print(f"SUCCES: Session {worker_id} ouverte")
+        try:
+            while True:
+                item = self.next_case(cases)
+                if item is None:
+                    break
+                self.run_case(worker_id, tests, *item)
+        finally:
+            self.collect(worker_id, tests)
+            tests.cleanup()
+
+    def run_case(self, worker_id, tests, index, case):
+        """Executer un cas dans une session et garder ses resultats a sa position"""
+        with self.lock:
+            self.positions[case[0]] = index
+        results = tests.run_case(case)
+        for result in results:
+            result["worker"] = worker_id
+        with self.lock:
+            self.case_results[index] = results
+
+    def collect(self, worker_id, tests):
+        """Recuperer les mesures, captures et verdicts d'une session pour le rapport commun"""
+        with self.lock:
+            self.screenshot_counts[worker_id] = tests.screenshot_counter
+            self.wait_records.extend(tests.waits.records if tests.waits else [])
+            self.spans.extend(tests.timer.spans)
+            self.commands.extend(tests.profiler.records)
+            tests.captures.finish()
+            self.written.extend(tests.captures.written)
+            self.dropped.extend(tests.captures.dropped)
+            self.clusters.append(tests.clusters)
+            if tests.result_cache is not None:
+                self.caches.append(tests.result_cache)
+                self.build_key = self.build_key or tests.build_key
+            self.cache_disabled = self.cache_disabled or tests.cache_disabled
+
+    def merged_results(self):
+        """Fusionner les resultats dans l'ordre d'enumeration des cas"""
+        merged = []
+        for index in sorted(self.case_results):
+            merged.extend(self.case_results[index])
+        return merged
+
+    def run(self):
+        """Executer tous les cas et generer un rapport unique"""
+        report = self.tests_class(self.app_url, start_driver=False, **self.options)
+        self.result_stream = report.result_stream
+        # Les cas sont enumeres a la demande pour ne pas charger tout le corpus
+        cases = enumerate(report.iter_cases())
+
+        print("=" * 60)
+        print(f"TESTS DE SECURITE - MODE POOL ({self.workers} sessions)")
+        print("=" * 60)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.worker, worker_id, cases) for worker_id in range(1, self.workers + 1)]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"ERREUR: Session en echec: {str(e)}")
+
+        return self.finish(report)
+
+    def finish(self, report):
+        """Rapport unique a partir des sessions collectees"""
+        report.test_results = self.merged_results()
+        if not report.case_positions:
+            # Flux dans l'ordre de fin des cas: remis dans l'ordre d'enumeration pour le rapport
+            report.case_positions = self.positions
+        if report.http_fast_path:
+            report.test_http_fast_path()
+        report.screenshot_counter = sum(self.screenshot_counts.values())
+        report.waits = WaitEngine(None)
+        report.waits.records = self.wait_records
+        report.timer.spans = sorted(self.spans, key=lambda span: span["start"])
+        report.profiler.records = self.commands
+        report.captures.written = self.written
+        report.captures.dropped = self.dropped
+        report.captures.captured = report.screenshot_counter
+        for clusters in self.clusters:
+            report.clusters.merge(clusters)
+        if self.cache_disabled and not self.caches:
+            # Toutes les sessions ont execute leurs cas: le rapport indique pourquoi
+            report.disable_cache(self.cache_disabled)
+        if report.result_cache is not None:
+            report.build_key = self.build_key
+            for cache in self.caches:
+                report.result_cache.merge(cache)
+        report.generate_simple_report()
+
+        failed = sum(1 for t in report.test_results if not t['passed'])
+        return failed == 0 and bool(report.test_results)
@@ -0,0 +1,205 @@
+# Sonde executee en un seul appel WebDriver: token, URL, cookies visibles,
+# contenu du stockage et marqueurs DOM
+PROBE_JS = """
+var dump = function (storage) {
+    var out = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        out[key] = storage.getItem(key);
+    }
+    return out;
+};
+var cookies = [];
+if (document.cookie) {
+    document.cookie.split(';').forEach(function (part) {
+        var index = part.indexOf('=');
+        var name = (index === -1 ? part : part.slice(0, index)).trim();
+        if (name) {
+            // Un cookie lisible en JS n'est pas HttpOnly; sur http il n'est pas Secure non plus
+            cookies.push({name: name, httpOnly: false, secure: location.protocol === 'https:' ? null : false});
+        }
+    });
+}
+var banner = document.querySelector('.error-message');
+var root = document.querySelector('app-root');
+var xss = window.__secXss ? window.__secXss.events.splice(0) : null;
+// Statut de /auth/signin consomme par la sonde: une tentative sans requete ne reprend pas le precedent
+var signinStatus = window.__secTracker ? window.__secTracker.signinStatus : null;
+if (window.__secTracker) { window.__secTracker.signinStatus = null; }
+// Empreinte de structure de la page (balises et id, sans texte ni valeurs saisies): FNV-1a 32 bits
+var structure = '';
+if (root) {
+    root.querySelectorAll('*').forEach(function (el) { structure += el.tagName + (el.id ? '#' + el.id : '') + ';'; });
+}
+var domHash = 2166136261;
+for (var i = 0; i < structure.length; i++) {
+    domHash = Math.imul(domHash ^ structure.charCodeAt(i), 16777619) >>> 0;
+}
+return {
+    url: window.location.href,
+    title: document.title,
+    token: localStorage.getItem('auth_token'),
+    current_user: localStorage.getItem('current_user'),
+    local_storage: dump(localStorage),
+    session_storage: dump(sessionStorage),
+    cookies: cookies,
+    xss_events: xss,
+    signin_status: signinStatus,
+    dom: {
+        login_form: !!document.querySelector("input[name='username']"),
+        logout_button: !!document.getElementById('logout'),
+        toolbar: !!document.querySelector('mat-toolbar'),
+        error_message: banner ? banner.textContent.trim() : null,
+        script_count: document.getElementsByTagName('script').length,
+        root_length: root ? root.innerHTML.length : 0,
+        hash: domHash.toString(16)
+    }
+};
+"""
+
+# Instrumentation XSS installee une fois par document: dialogues, scripts inseres et
+# attributs on* / javascript: observes par MutationObserver, violations CSP.
+# Les evenements sont gardes dans un tampon de la page et lus en un seul appel.
+XSS_MONITOR_JS = """
+(function () {
+    if (window.__secXss) { return; }
+    var monitor = {events: [], lost: 0};
+    window.__secXss = monitor;
+    // Les noeuds du document initial (index.html) ne sont pas des injections
+    var armed = document.readyState !== 'loading';
+    document.addEventListener('DOMContentLoaded', function () { armed = true; });
+    var record = function (kind, detail) {
+        if (monitor.events.length >= 100) { monitor.lost += 1; return; }
+        monitor.events.push({kind: kind, detail: String(detail).slice(0, 200), url: location.pathname});
+    };
+    ['alert', 'confirm', 'prompt'].forEach(function (name) {
+        // Ne pas ouvrir de vraie boite de dialogue: elle bloquerait les commandes WebDriver
+        window[name] = function (message) {
+            record('dialog', name + ': ' + message);
+            return name === 'confirm' ? false : null;
+        };
+    });
+    var URL_ATTRIBUTES = ['href', 'src', 'action', 'formaction', 'data'];
+    var inspectAttribute = function (el, name) {
+        var value = el.getAttribute(name);
+        if (value === null) { return; }
+        var label = el.tagName.toLowerCase() + '[' + name + '=' + value + ']';
+        if (/^on/i.test(name)) {
+            record('handler', label);
+        } else if (URL_ATTRIBUTES.indexOf(name.toLowerCase()) !== -1 && /^\\s*javascript:/i.test(value)) {
+            record('javascript-url', label);
+        }
+    };
+    var inspect = function (el) {
+        if (el.nodeType !== 1) { return; }
+        var tag = el.tagName.toLowerCase();
+        if (tag === 'script') {
+            var src = el.getAttribute('src');
+            if (!src || new URL(src, location.href).origin !== location.origin) {
+                record('script', el.outerHTML);
+            }
+        }
+        if (tag === 'iframe' && el.hasAttribute('srcdoc')) {
+            record('iframe', el.outerHTML);
+        }
+        for (var i = 0; i < el.attributes.length; i++) {
+            inspectAttribute(el, el.attributes[i].name);
+        }
+    };
+    new MutationObserver(function (mutations) {
+        if (!armed) { return; }
+        mutations.forEach(function (mutation) {
+            if (mutation.type === 'attributes') {
+                inspectAttribute(mutation.target, mutation.attributeName);
+                return;
+            }
+            mutation.addedNodes.forEach(function (node) {
+                if (node.nodeType !== 1) { return; }
+                inspect(node);
+                node.querySelectorAll('*').forEach(inspect);
+            });
+        });
+    }).observe(document, {childList: true, subtree: true, attributes: true});
+    document.addEventListener('securitypolicyviolation', function (event) {
+        record('csp', event.violatedDirective + ' ' + (event.blockedURI || 'inline'));
+    });
+})();
+"""
+
+# Vider le tampon d'evenements XSS (null si l'instrumentation est absente du document)
+XSS_EVENTS_JS = """
+var monitor = window.__secXss;
+if (!monitor) { return null; }
+var events = monitor.events.splice(0);
+if (monitor.lost) {
+    events.push({kind: 'lost', detail: monitor.lost + ' evenements non conserves', url: location.pathname});
+    monitor.lost = 0;
+}
+return events;
+"""
+
+EMPTY_TOKENS = ["null", "undefined", "", None]
+
+
+def install_xss_monitor(driver):
+    """Enregistrer l'instrumentation XSS pour chaque nouveau document quand le driver expose CDP"""
+    if not hasattr(driver, "execute_cdp_cmd"):
+        # Driver distant: l'instrumentation est reinjectee avec le suivi reseau apres chaque navigation
+        return False
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": XSS_MONITOR_JS})
+    return True
+
+
+def read_xss_events(driver):
+    """Lire et vider le tampon d'evenements XSS de la page en un seul appel"""
+    return driver.execute_script(XSS_EVENTS_JS)
+
+
+def describe_xss_events(events):
+    """Resume lisible des evenements XSS releves"""
+    return "; ".join(f"{event['kind']}: {event['detail'][:60]}" for event in events)
+
+
+def take_snapshot(driver, webdriver_cookies=True):
+    """Collecter l'etat de la page (sonde JS, plus les cookies WebDriver pour voir les HttpOnly)"""
+    snapshot = driver.execute_script(PROBE_JS)
+    unknown_secure = any(c["secure"] is None and 'session' in c["name"].lower() for c in snapshot["cookies"])
+    if webdriver_cookies or unknown_secure:
+        # Aller-retour supplementaire pour voir aussi les cookies HttpOnly
+        snapshot["cookies"] = [
+            {"name": c["name"], "httpOnly": bool(c.get("httpOnly")), "secure": bool(c.get("secure"))}
+            for c in driver.get_cookies()
+        ]
+    return snapshot
+
+
+def has_token(snapshot):
+    """Indiquer si un token d'authentification est present dans le snapshot"""
+    return snapshot.get("token") not in EMPTY_TOKENS
+
+
+def find_vulnerabilities(snapshot):
+    """Appliquer localement les regles de vulnerabilite a un snapshot"""
+    vulnerabilities = []
+
+    # Verifier si un token a ete genere
+    if has_token(snapshot):
+        vulnerabilities.append("Token genere malgre les mauvais credentials")
+
+    # Verifier l'URL actuelle
+    if "patients" in snapshot.get("url", ""):
+        vulnerabilities.append("Redirection non autorisee vers la zone protegee")
+
+    # Verifier les cookies de session
+    for cookie in snapshot.get("cookies", []):
+        if 'session' in cookie['name'].lower() and not cookie.get('httpOnly'):
+            vulnerabilities.append(f"Cookie de session sans flag HttpOnly: {cookie['name']}")
+        if 'session' in cookie['name'].lower() and cookie.get('secure') is False:
+            vulnerabilities.append(f"Cookie de session sans flag Secure: {cookie['name']}")
+
+    # Execution de script ou injection DOM relevee par l'instrumentation
+    if snapshot.get("xss_events"):
+        vulnerabilities.append(f"Execution de script detectee: {describe_xss_events(snapshot['xss_events'])}")
+
+    return vulnerabilities
+
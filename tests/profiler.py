@@ -0,0 +1,102 @@
+import json
+import time
+
+
+def payload_size(value):
+    """Taille approximative (octets) d'un parametre ou d'une reponse WebDriver"""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    try:
+        return len(json.dumps(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+class CommandProfiler:
+    """Compter et chronometrer chaque aller-retour WebDriver vers la grille"""
+
+    def __init__(self):
+        self.records = []
+        self.open_records = []
+
+    def attach(self, driver):
+        """Envelopper l'executeur de commandes du driver (Remote, Chrome local...)"""
+        executor = driver.command_executor
+        execute = executor.execute
+
+        def profiled_execute(command, params):
+            start = time.monotonic()
+            response = None
+            try:
+                response = execute(command, params)
+                return response
+            finally:
+                self.record(command, params, response, time.monotonic() - start)
+
+        executor.execute = profiled_execute
+        return driver
+
+    def record(self, command, params, response, duration):
+        """Enregistrer une commande executee (par attach ou par un executeur partage)"""
+        record = {
+            "command": command,
+            "duration": duration,
+            "sent": payload_size(params),
+            "received": payload_size(response.get("value") if isinstance(response, dict) else response),
+            "test": None,
+        }
+        self.records.append(record)
+        self.open_records.append(record)
+
+    def close_case(self, test_name):
+        """Rattacher les commandes executees depuis le dernier resultat a un test"""
+        calls = len(self.open_records)
+        total = sum(record["duration"] for record in self.open_records)
+        for record in self.open_records:
+            record["test"] = test_name
+        self.open_records = []
+        return {"calls": calls, "time": round(total, 3)}
+
+    def by_command(self):
+        """Agregation par commande, triee par temps total decroissant"""
+        commands = {}
+        for record in self.records:
+            entry = commands.setdefault(record["command"], {"command": record["command"], "calls": 0, "time": 0.0, "sent": 0, "received": 0})
+            entry["calls"] += 1
+            entry["time"] += record["duration"]
+            entry["sent"] += record["sent"]
+            entry["received"] += record["received"]
+        rows = sorted(commands.values(), key=lambda entry: entry["time"], reverse=True)
+        for entry in rows:
+            entry["time"] = round(entry["time"], 3)
+            entry["avg_ms"] = round(entry["time"] / entry["calls"] * 1000, 1)
+        return rows
+
+    def by_test(self):
+        """Nombre d'appels et temps WebDriver par test"""
+        tests = {}
+        for record in self.records:
+            entry = tests.setdefault(record["test"] or "(hors test)", {"calls": 0, "time": 0.0})
+            entry["calls"] += 1
+            entry["time"] = round(entry["time"] + record["duration"], 3)
+        return tests
+
+    def summary(self, top=15):
+        return {
+            "total_calls": len(self.records),
+            "total_time": round(sum(record["duration"] for record in self.records), 3),
+            "top_commands": self.by_command()[:top],
+            "by_test": self.by_test(),
+        }
+
+    def print_table(self, top=15):
+        """Afficher les commandes les plus couteuses"""
+        rows = self.by_command()[:top]
+        if not rows:
+            return
+        print(f"\n--- Commandes WebDriver ({len(self.records)} appels) ---")
+        print(f"{'Commande':<32}{'Appels':>8}{'Total (s)':>12}{'Moy (ms)':>10}{'Recu (Ko)':>12}")
+        for entry in rows:
+            print(f"{entry['command']:<32}{entry['calls']:>8}{entry['time']:>12.3f}{entry['avg_ms']:>10.1f}{entry['received'] / 1024:>12.1f}")
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import random
+import urllib.request
+
+from http_fastpath import AsyncHttpPool
+from load_patients import patient_request
+
+# Servir un config.json pointant sur le backend de substitution: l'application lit apiUrl via fetch()
+STUB_CONFIG_JS = """
+(function (config) {
+    var original = window.fetch;
+    window.fetch = function (input, init) {
+        var url = typeof input === 'string' ? input : (input && input.url) || '';
+        if (url.indexOf('/assets/config.json') !== -1) {
+            return Promise.resolve(new Response(config, {status: 200, headers: {'Content-Type': 'application/json'}}));
+        }
+        return original.apply(this, arguments);
+    };
+})(%s);
+"""
+
+# Attendre que la liste affiche le nombre de patients attendu, puis collecter les mesures.
+# Les long tasks sont relues depuis le debut de la navigation grace a l'option buffered.
+RENDERED_JS = """
+var expected = arguments[0];
+var done = arguments[arguments.length - 1];
+var tasks = [];
+try {
+    new PerformanceObserver(function (list) {
+        list.getEntries().forEach(function (entry) {
+            tasks.push({start: entry.startTime, duration: entry.duration});
+        });
+    }).observe({type: 'longtask', buffered: true});
+} catch (e) {}
+var collect = function (renderedAt) {
+    var nav = performance.getEntriesByType('navigation')[0] || {};
+    var memory = performance.memory || {};
+    done({
+        rendered: true,
+        items: document.querySelectorAll('mat-list-item').length,
+        rendered_ms: Math.round(renderedAt),
+        navigation: {
+            response_end_ms: Math.round(nav.responseEnd || 0),
+            dom_content_loaded_ms: Math.round(nav.domContentLoadedEventEnd || 0),
+            load_event_ms: Math.round(nav.loadEventEnd || 0)
+        },
+        long_tasks: tasks.length,
+        long_tasks_ms: Math.round(tasks.reduce(function (sum, t) { return sum + t.duration; }, 0)),
+        heap_used: memory.usedJSHeapSize || null,
+        heap_total: memory.totalJSHeapSize || null
+    });
+};
+var check = function () {
+    if (document.querySelectorAll('mat-list-item').length >= expected) {
+        // Mesurer a la frame suivante (rendu effectif), puis laisser l'observateur se vider
+        requestAnimationFrame(function () {
+            var renderedAt = performance.now();
+            setTimeout(function () { collect(renderedAt); }, 0);
+        });
+        return true;
+    }
+    return false;
+};
+if (!check()) {
+    var observer = new MutationObserver(function () {
+        if (check()) { observer.disconnect(); }
+    });
+    observer.observe(document.body, {childList: true, subtree: true});
+}
+"""
+
+
+def api_login(api_url, username="admin", password="password123", timeout=10):
+    """Obtenir un token via /auth/signin"""
+    request = urllib.request.Request(
+        f"{api_url}/auth/signin",
+        data=json.dumps({"username": username, "password": password}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))["token"]
+
+
+def count_patients(api_url, token, timeout=60):
+    """Nombre de patients renvoyes par GET /v1/patients"""
+    request = urllib.request.Request(f"{api_url}/v1/patients", headers={"Authorization": f"Bearer {token}"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return len(json.loads(response.read().decode("utf-8")).get("data") or [])
+
+
+def parse_sizes(text):
+    """Lire une liste de tailles '100,1k,10k,50k'"""
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        if part:
+            sizes.append(int(float(part[:-1]) * 1000) if part.endswith("k") else int(part))
+    return sorted(sizes)
+
+
+def scaling(curve):
+    """Cout marginal du rendu (ms pour 1000 patients supplementaires) entre deux tailles"""
+    points = [point for point in curve if point.get("rendered")]
+    slopes = []
+    for previous, current in zip(points, points[1:]):
+        added = current["patients"] - previous["patients"]
+        if added > 0:
+            slopes.append({
+                "from": previous["patients"],
+                "to": current["patients"],
+                "ms_per_1000": round((current["rendered_ms"] - previous["rendered_ms"]) * 1000 / added, 1),
+            })
+    return slopes
+
+
+async def add_patients(api_url, token, count, concurrency=16, seed=1, created=None):
+    """Creer des patients synthetiques via l'API (backend reel); leurs identifiants sont ajoutes a `created`"""
+    client = AsyncHttpPool(api_url, size=concurrency, timeout=30)
+    rng = random.Random(seed)
+    headers = {"Authorization": f"Bearer {token}"}
+    remaining = iter(range(count))
+    created = [] if created is None else created
+
+    async def worker():
+        for index in remaining:
+            response = await client.request("POST", "/v1/patients", patient_request(rng, index), headers)
+            try:
+                data = (response.json() or {}).get("data") if response.status < 300 else None
+            except ValueError:
+                data = None
+            if isinstance(data, dict) and data.get("id"):
+                created.append(data["id"])
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        await client.close()
+    return created
+
+
+async def delete_patients(api_url, token, ids, concurrency=16):
+    """Supprimer des patients via l'API et retourner le nombre de suppressions en echec"""
+    client = AsyncHttpPool(api_url, size=concurrency, timeout=30)
+    headers = {"Authorization": f"Bearer {token}"}
+    remaining = iter(ids)
+    failed = 0
+
+    async def worker():
+        nonlocal failed
+        for patient_id in remaining:
+            try:
+                response = await client.request("DELETE", f"/v1/patients/{patient_id}", headers=headers)
+                if response.status >= 300:
+                    failed += 1
+            except Exception:
+                failed += 1
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        await client.close()
+    return failed
+
+
+def page_command(driver, cmd, params=None):
+    """Commande DevTools sur la page du driver (import differe: la sonde reste utilisable sans Selenium)"""
+    from contexts import cdp_command
+    return cdp_command(driver, cmd, params)
+
+
+class RenderProbe:
+    """Mesurer le rendu de /patients pour des volumes croissants de patients"""
+
+    def __init__(self, driver, app_url, api_url, stub=None, timeout=180):
+        self.driver = driver
+        self.app_url = app_url.rstrip("/")
+        self.api_url = api_url
+        self.stub = stub
+        self.timeout = timeout
+        # Patients crees par la sonde sur un backend reel, supprimes a la fin
+        self.created = []
+
+    def use_stub_config(self):
+        """Faire lire au navigateur un apiUrl pointant sur le backend de substitution (DevTools requis)"""
+        try:
+            return page_command(self.driver, "Page.addScriptToEvaluateOnNewDocument", {
+                "source": STUB_CONFIG_JS % json.dumps(json.dumps({"apiUrl": self.api_url}))
+            })["identifier"]
+        except Exception as e:
+            # Sans redirection, l'application interrogerait l'apiUrl de config.json et non le backend de substitution
+            raise RuntimeError(f"Backend de substitution inutilisable pour le rendu, config.json non redirige: {str(e)}")
+
+    def seed(self, size, token):
+        """Amener le backend a `size` patients et retourner le nombre reellement servi"""
+        if self.stub is not None:
+            self.stub.seed_patients(size)
+            return size
+        current = count_patients(self.api_url, token)
+        if current < size:
+            print(f"Creation de {size - current} patients via l'API...")
+            asyncio.run(add_patients(self.api_url, token, size - current, seed=size, created=self.created))
+        return count_patients(self.api_url, token)
+
+    def cleanup(self, token, script_id, initial):
+        """Retirer la redirection de config.json et les patients ajoutes par la sonde"""
+        if self.stub is not None:
+            self.stub.seed_patients(initial)
+            if script_id is not None:
+                try:
+                    page_command(self.driver, "Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+                except Exception:
+                    pass
+            return
+        if not self.created:
+            return
+        print(f"Suppression des {len(self.created)} patients crees par la sonde...")
+        failed = asyncio.run(delete_patients(self.api_url, token, self.created))
+        if failed:
+            print(f"ATTENTION: {failed} patient(s) cree(s) par la sonde non supprime(s)")
+        self.created = []
+
+    def measure(self, expected, token):
+        """Charger /patients avec un token deja en place et collecter les mesures de rendu"""
+        # Le token doit etre pose sur l'origine de l'application avant le chargement de /patients
+        self.driver.get(f"{self.app_url}/login")
+        self.driver.execute_script(
+            "localStorage.setItem('auth_token', arguments[0]);"
+            "localStorage.setItem('current_user', JSON.stringify('admin'));",
+            token
+        )
+        self.driver.get(f"{self.app_url}/patients")
+        self.driver.set_script_timeout(self.timeout)
+        return self.driver.execute_async_script(RENDERED_JS, expected)
+
+    def run(self, sizes):
+        token = api_login(self.api_url)
+        script_id = self.use_stub_config() if self.stub is not None else None
+        initial = len(self.stub.patients) if self.stub is not None else 0
+        curve = []
+        try:
+            for size in sorted(sizes):
+                expected = self.seed(size, token)
+                print(f"\nRendu de /patients avec {expected} patients...")
+                try:
+                    metrics = self.measure(expected, token)
+                except Exception as e:
+                    metrics = {"rendered": False, "error": str(e)}
+                metrics["size"] = size
+                metrics["patients"] = expected
+                curve.append(metrics)
+        finally:
+            self.cleanup(token, script_id, initial)
+        return curve
@@ -0,0 +1,173 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+import urllib.request
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+CACHE_FILE = ".security_cache.json"
+CACHE_MAX_BYTES = 20 * 1024 * 1024
+
+# Modules dont depend le verdict de tous les cas (sonde, attentes, formulaires, empreintes)
+DETECTION_FILES = ("probe.py", "waits.py", "fingerprints.py", "patient_forms.py")
+
+# Endpoints de l'API interroges pour identifier le backend deploye (/health ne dit pas quelle version repond)
+BACKEND_VERSION_PATHS = ("/version", "/actuator/info", "/info")
+
+
+class BundleAssets(HTMLParser):
+    """Scripts et modules precharges references par index.html"""
+
+    def __init__(self):
+        super().__init__()
+        self.assets = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "script" and attrs.get("src"):
+            self.assets.append(attrs["src"])
+        elif tag == "link" and attrs.get("rel") == "modulepreload" and attrs.get("href"):
+            self.assets.append(attrs["href"])
+
+
+def fetch(url, timeout):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+
+def backend_identity(api_url, timeout=5):
+    """Identite du backend deploye: BACKEND_VERSION, sinon reponse d'un endpoint de version de l'API (None si inconnue)"""
+    version = os.environ.get("BACKEND_VERSION")
+    if version:
+        return version
+    base = api_url.rstrip("/")
+    for path in BACKEND_VERSION_PATHS:
+        try:
+            body = fetch(base + path, timeout).strip()
+        except (OSError, ValueError):
+            continue
+        if body and body not in (b"{}", b"[]"):
+            return f"{path}:{hashlib.blake2b(body, digest_size=16).hexdigest()}"
+    return None
+
+
+def bundle_hash(app_url, backend_version, timeout=10):
+    """Empreinte du build servi: index.html, main et chunks precharges, config.json et version du backend"""
+    # Les chunks charges a la demande ont un nom hache reference par main: leur changement change main
+    base = app_url.rstrip("/") + "/"
+    digest = hashlib.blake2b(digest_size=16)
+    index = fetch(base, timeout)
+    digest.update(index)
+    parser = BundleAssets()
+    parser.feed(index.decode("utf-8", "replace"))
+    assets = sorted(set(parser.assets))
+    for asset in assets:
+        url = urljoin(base, asset)
+        digest.update(url.encode("utf-8"))
+        digest.update(fetch(url, timeout))
+    try:
+        digest.update(fetch(f"{base}assets/config.json", timeout))
+    except OSError:
+        pass
+    digest.update(backend_version.encode("utf-8"))
+    return digest.hexdigest(), len(assets)
+
+
+def logic_hash(tests_class, method, helpers=()):
+    """Empreinte de la logique de detection d'un cas: sa methode, les aides qu'elle appelle et les modules de sonde"""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in (method,) + tuple(helpers):
+        digest.update(inspect.getsource(getattr(tests_class, name)).encode("utf-8"))
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in DETECTION_FILES:
+        with open(os.path.join(here, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Verdicts des cas deja executes, indexes par build + logique de detection + payload, persistes entre les runs"""
+
+    def __init__(self, path=CACHE_FILE, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.entries = self.load()
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    @staticmethod
+    def key(build, logic, case):
+        return hashlib.blake2b(json.dumps([build, logic, case]).encode("utf-8"), digest_size=16).hexdigest()
+
+    def load(self):
+        """Lire les verdicts enregistres (vide au premier run ou si le fichier est illisible)"""
+        try:
+            with open(self.path) as f:
+                return dict(json.load(f).get("entries", {}))
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def get(self, key):
+        """Verdicts en cache d'un cas, ou None"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry["used"] = time.time()
+        return entry["results"]
+
+    def put(self, key, results):
+        now = time.time()
+        self.pending[key] = {"results": results, "stored": now, "used": now}
+
+    def merge(self, other):
+        """Ajouter les verdicts et les acces d'une autre session (mode pool)"""
+        self.pending.update(other.pending)
+        self.hits += other.hits
+        self.misses += other.misses
+        for key, entry in other.entries.items():
+            mine = self.entries.get(key)
+            if mine is not None:
+                mine["used"] = max(mine["used"], entry["used"])
+
+    def save(self):
+        """Fusionner avec le fichier courant, evincer les moins recemment utilises au-dela de la taille maximum"""
+        entries = self.load()
+        for key, entry in self.entries.items():
+            if key in entries:
+                entries[key]["used"] = max(entries[key]["used"], entry["used"])
+        entries.update(self.pending)
+
+        sizes = {key: len(json.dumps(entry)) for key, entry in entries.items()}
+        total = sum(sizes.values())
+        for key in sorted(entries, key=lambda key: entries[key]["used"]):
+            if total <= self.max_bytes:
+                break
+            total -= sizes[key]
+            del entries[key]
+            self.evicted += 1
+
+        # Temporaire propre au processus: les shards paralleles partagent l'espace de travail
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"entries": entries}, f)
+        os.replace(tmp, self.path)
+        self.entries = entries
+        stored, self.pending = len(self.pending), {}
+        return stored
+
+    def summary(self):
+        return {
+            "file": self.path,
+            "entries": len(self.entries),
+            "size": sum(len(json.dumps(entry)) for entry in self.entries.values()),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+        }
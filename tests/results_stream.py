@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+
+class ResultStream:
+    """Resultats ajoutes au fil de l'eau dans un fichier JSONL: un run interrompu garde ce qui a ete execute"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+        self.count = 0
+
+    def write(self, result):
+        """Ajouter un resultat (une ligne) et le pousser sur disque immediatement"""
+        line = json.dumps(result, ensure_ascii=False) + "\n"
+        with self.lock:
+            if self.file is None:
+                # Ouverture au premier resultat: pas de fichier vide pour les modes sans resultat
+                self.file = open(self.path, "a", encoding="utf-8")
+            self.file.write(line)
+            self.file.flush()
+            self.count += 1
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def read_results(path, positions=None):
+    """Relire un flux de resultats, dans l'ordre des cas si leurs positions sont connues"""
+    results = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    results.append(json.loads(line))
+                except ValueError:
+                    # Derniere ligne tronquee par un arret brutal
+                    print(f"ATTENTION: Ligne illisible ignoree dans {path}")
+    except OSError:
+        return []
+    if positions:
+        last = len(positions)
+        ordered = sorted(enumerate(results), key=lambda item: (positions.get(item[1].get("case"), last), item[0]))
+        results = [result for _, result in ordered]
+    return results
+
+
+def summarize(results):
+    passed = sum(1 for result in results if result["passed"])
+    # Non concluant: ni reussi ni echoue (ex. formulaire refuse avant tout envoi)
+    skipped = sum(1 for result in results if result.get("skipped"))
+    return {
+        "total": len(results),
+        "passed": passed,
+        "failed": len(results) - passed - skipped,
+        "skipped": skipped
+    }
+
+
+def write_junit(results, path, suite="securite-authentification"):
+    """Rapport JUnit XML (publie par Jenkins) derive des resultats"""
+    summary = summarize(results)
+    # Durees propres par phase: leur somme est le temps du cas, sans double compte des phases imbriquees
+    durations = [sum((result.get("timings") or {}).values()) for result in results]
+    testsuite = ET.Element("testsuite", {
+        "name": suite,
+        "tests": str(summary["total"]),
+        "failures": str(summary["failed"]),
+        "errors": "0",
+        "skipped": str(summary["skipped"]),
+        "time": f"{sum(durations):.3f}",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+    })
+    for result, duration in zip(results, durations):
+        case = result.get("case") or ""
+        testcase = ET.SubElement(testsuite, "testcase", {
+            "classname": f"{suite}.{case.rstrip('0123456789').rstrip('_') or 'hors_cas'}",
+            "name": result["test"],
+            "time": f"{duration:.3f}",
+        })
+        if result.get("skipped"):
+            ET.SubElement(testcase, "skipped", {"message": (result.get("details") or "")[:500]})
+        elif not result["passed"]:
+            failure = ET.SubElement(testcase, "failure", {"message": (result.get("details") or "")[:500]})
+            failure.text = result.get("details") or ""
+        output = [result.get("details") or ""]
+        if result.get("screenshot"):
+            output.append(f"Capture: {result['screenshot']}")
+        if result.get("cached"):
+            output.append("Verdict repris du cache")
+        ET.SubElement(testcase, "system-out").text = "\n".join(line for line in output if line)
+    ET.ElementTree(testsuite).write(path, encoding="utf-8", xml_declaration=True)
+    return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Reconstruire le rapport et le JUnit d'un run depuis son flux JSONL")
+    parser.add_argument("stream", help="Flux de resultats (security_results_<date>.jsonl)")
+    parser.add_argument("--output", help="Rapport JSON (par defaut: security_report_<date>.json du flux)")
+    parser.add_argument("--junit", help="Rapport JUnit XML (par defaut: security_junit_<date>.xml du flux)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = read_results(args.stream)
+    if not results:
+        print(f"ERREUR: Aucun resultat dans {args.stream}")
+        exit(1)
+
+    stamp = os.path.splitext(os.path.basename(args.stream))[0].replace("security_results_", "", 1)
+    output = args.output or f"security_report_{stamp}.json"
+    junit = write_junit(results, args.junit or f"security_junit_{stamp}.xml")
+    report = {
+        "date": datetime.now().isoformat(),
+        "recovered_from": args.stream,
+        "summary": summarize(results),
+        "results": results
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    summary = report["summary"]
+    print(f"SUCCES: Rapport reconstruit: {output} (JUnit: {junit})")
+    print(f"Resultats: {summary['passed']} reussis, {summary['failed']} echoues, {summary['skipped']} non concluants sur {summary['total']} tests")
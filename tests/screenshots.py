@@ -0,0 +1,146 @@
+import collections
+import io
+import os
+import queue
+import threading
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+_STOP = object()
+
+# Formats de sortie acceptes (alias -> nom Pillow) et extension des fichiers
+IMAGE_FORMATS = {"png": "png", "jpeg": "jpeg", "jpg": "jpeg", "webp": "webp"}
+EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+
+class ScreenshotWriter:
+    """Ecriture des captures en arriere-plan: re-encodage, nommage et I/O disque hors du thread de test"""
+
+    def __init__(self, directory, image_format="png", max_pending=16):
+        self.directory = directory
+        if image_format.lower() not in IMAGE_FORMATS:
+            raise ValueError(f"Format de capture inconnu: {image_format} (formats: {', '.join(sorted(IMAGE_FORMATS))})")
+        self.image_format = IMAGE_FORMATS[image_format.lower()]
+        if self.image_format != "png" and Image is None:
+            print(f"ATTENTION: Pillow absent, format {self.image_format} ignore, captures en PNG")
+            self.image_format = "png"
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.written = 0
+        self.errors = []
+        self.thread = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+        self.thread.start()
+
+    def filename_for(self, stem):
+        """Chemin final d'une capture selon le format de sortie"""
+        return f"{self.directory}/{stem}.{EXTENSIONS[self.image_format]}"
+
+    def submit(self, stem, png_bytes):
+        """Mettre une capture en file d'ecriture et retourner son chemin final"""
+        filename = self.filename_for(stem)
+        # File bornee: bloque le thread de test si le disque ne suit pas
+        self.pending.put((filename, png_bytes))
+        return filename
+
+    def encode(self, png_bytes):
+        """Re-encoder les octets PNG dans le format de sortie"""
+        if self.image_format == "png":
+            return png_bytes
+        image = Image.open(io.BytesIO(png_bytes))
+        if self.image_format == "jpeg":
+            image = image.convert("RGB")
+        output = io.BytesIO()
+        image.save(output, format=self.image_format.upper(), quality=80)
+        return output.getvalue()
+
+    def _run(self):
+        while True:
+            item = self.pending.get()
+            try:
+                if item is _STOP:
+                    return
+                filename, png_bytes = item
+                data = self.encode(png_bytes)
+                os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+                with open(filename, "wb") as f:
+                    f.write(data)
+                self.written += 1
+            except Exception as e:
+                self.errors.append(str(e))
+                print(f"ERREUR: Ecriture capture impossible: {str(e)}")
+            finally:
+                self.pending.task_done()
+
+    def flush(self):
+        """Attendre que toutes les captures en file soient ecrites"""
+        self.pending.join()
+
+    def close(self):
+        """Vider la file puis arreter le thread d'ecriture"""
+        if self.thread.is_alive():
+            self.pending.put(_STOP)
+            self.thread.join()
+
+
+class CapturePolicy:
+    """Politique de capture: always, on-failure (tampon circulaire) ou sampled"""
+
+    POLICIES = ("always", "on-failure", "sampled")
+
+    def __init__(self, writer, policy="always", ring_size=10, ring_bytes=50 * 1024 * 1024, sample_every=5):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Politique de capture inconnue: {policy}")
+        self.writer = writer
+        self.policy = policy
+        self.ring = collections.deque()
+        self.ring_size = ring_size
+        self.ring_bytes = ring_bytes
+        self.ring_used = 0
+        self.sample_every = max(1, sample_every)
+        self.captured = 0
+        self.written = []
+        self.dropped = []
+
+    def capture(self, stem, png_bytes):
+        """Ecrire la capture ou la garder en memoire selon la politique"""
+        self.captured += 1
+        filename = self.writer.filename_for(stem)
+        if self.policy == "always" or (self.policy == "sampled" and (self.captured - 1) % self.sample_every == 0):
+            self.written.append(self.writer.submit(stem, png_bytes))
+            return filename
+
+        self.ring.append((stem, png_bytes))
+        self.ring_used += len(png_bytes)
+        while self.ring and (len(self.ring) > self.ring_size or self.ring_used > self.ring_bytes):
+            old_stem, old_bytes = self.ring.popleft()
+            self.ring_used -= len(old_bytes)
+            self.dropped.append(self.writer.filename_for(old_stem))
+        return filename
+
+    def flush(self, reason=""):
+        """Ecrire les dernieres captures gardees en memoire (echec ou exception)"""
+        if not self.ring:
+            return
+        print(f"CAPTURE: Ecriture de {len(self.ring)} capture(s) en memoire{' - ' + reason if reason else ''}")
+        while self.ring:
+            stem, png_bytes = self.ring.popleft()
+            self.ring_used -= len(png_bytes)
+            self.written.append(self.writer.submit(stem, png_bytes))
+
+    def finish(self):
+        """Abandonner les captures restantes en memoire (aucun echec ne les a reclamees)"""
+        while self.ring:
+            stem, png_bytes = self.ring.popleft()
+            self.dropped.append(self.writer.filename_for(stem))
+        self.ring_used = 0
+
+    def summary(self):
+        """Resume pour le rapport: captures ecrites et abandonnees"""
+        return {
+            "policy": self.policy,
+            "captured": self.captured,
+            "written": sorted(self.written),
+            "dropped": sorted(self.dropped)
+        }
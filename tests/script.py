@@ -1,24 +1,176 @@
 import sys
-import time
 import json
 import os
-from selenium import webdriver
+import argparse
+import itertools
+import socket
+from urllib.parse import urlsplit
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, NoAlertPresentException
 from datetime import datetime
+from waits import WaitEngine
+from probe import (
+    take_snapshot,
+    find_vulnerabilities,
+    has_token,
+    XSS_MONITOR_JS,
+    install_xss_monitor,
+    read_xss_events,
+    describe_xss_events,
+)
+from screenshots import ScreenshotWriter, CapturePolicy
+from corpus import PayloadCorpus, CORPUS_DIR, chunked
+from http_fastpath import HttpFastPath, resolve_api_url
+from timing import PhaseTimer, timed
+from profiler import CommandProfiler
+from load_patients import PatientLoadTest, parse_mix
+from render_probe import RenderProbe, parse_sizes, scaling
+from shards import parse_shard, shard_cases, in_shard, case_key
+from result_cache import ResultCache, CACHE_FILE, CACHE_MAX_BYTES, backend_identity, bundle_hash, logic_hash
+from results_stream import ResultStream, read_results, summarize, write_junit
+from network_log import NetworkLog, SIGNIN_SLOW_MS, network_summary, print_waterfall
+from budgets import BudgetStore, BUDGETS_FILE
+from fingerprints import OutcomeClusters, FuzzQueue, outcome, fingerprint
+from session_broker import BrokerClient
+from drivers import DriverFactory, DRIVER_BACKENDS, GRID_URL
+from patient_forms import (
+    ROUTE_JS,
+    FILL_PATIENT_FORM_JS,
+    PATIENT_WRITE_JS,
+    DETAILS_JS,
+    DELETE_PATIENT_JS,
+    form_values,
+    written_patient_id,
+    details_findings,
+)
+
+# Budget de temps maximum (secondes) par etape d'attente
+WAIT_BUDGETS = {
+    "page_prete": 10,
+    "champs_login": 30,
+    "soumission_login": 15,
+    "deconnexion": 10,
+    "formulaire_patient": 15,
+    "saisie_patient": 15,
+    "ecriture_patient": 15,
+    "sonde_details": 15,
+    "suppression_patient": 10,
+}
+
+# Plafond des etapes sans budget dedie
+WAIT_CEILING = 30
+
+# Aides dont le code fait partie de la logique de detection de chaque cas (cle du cache de resultats)
+DETECTION_HELPERS = (
+    "navigate_to_login", "reset_to_login", "locate_login_form", "fill_login_form", "submit_login",
+    "check_for_vulnerabilities", "capture_outcome", "open_patient_page", "fill_patient_form",
+    "wait_for_patient_write", "check_patient_details", "submit_patient_form",
+)
+
+# Taille des lots lus depuis le corpus de payloads
+CORPUS_CHUNK_SIZE = 50
+
+# Reinitialisation dans la page: vide le token, l'utilisateur et les cookies,
+# revient sur /login via le routeur Angular et verifie les champs deja localises
+FAST_RESET_JS = """
+localStorage.removeItem('auth_token');
+localStorage.removeItem('current_user');
+document.cookie.split(';').forEach(function (part) {
+    var name = part.split('=')[0].trim();
+    if (name) {
+        document.cookie = name + '=; expires=Thu, 01 Jan 1970 00:00:00 GMT; path=/';
+    }
+});
+var routed = false;
+if (!/\\/login\\/?$/.test(location.pathname)) {
+    history.pushState(null, '', '/login');
+    window.dispatchEvent(new PopStateEvent('popstate', {state: null}));
+    routed = true;
+}
+var fields = Array.prototype.slice.call(arguments);
+return {
+    routed: routed,
+    connected: fields.length > 0 && fields.every(function (el) { return el && el.isConnected; }),
+    token: localStorage.getItem('auth_token'),
+    cookies: document.cookie
+};
+"""
 
 class AuthSecurityTests:
-    def __init__(self, app_url):
+    def __init__(self, app_url, worker_id=None, start_driver=True, fast_reset=False, capture_policy="always",
+                 corpus_dir=CORPUS_DIR, corpus_tags=None, http_fast_path=False, api_url=None, http_concurrency=8,
+                 patient_forms=False, shard=None, broker=None, cluster_outcomes=False,
+                 result_cache=None, force=False, driver_backend="remote", grid_url=GRID_URL, chromedriver=None,
+                 cdp_address=None, network_log=False):
         self.app_url = app_url
+        self.worker_id = worker_id
         self.driver = None
-        self.wait = None
+        self.waits = None
         self.test_results = []
         self.screenshot_counter = 0
         self.screenshots_dir = "screenshots"
-        self.setup_driver()
+        self.screenshot_writer = None
+        self.captures = None
+        self.capture_policy = capture_policy
+        self.last_snapshot = None
+        self.timer = PhaseTimer(worker_id or 0)
+        self.budget_store = BudgetStore(
+            os.environ.get("WAIT_BUDGETS_FILE", BUDGETS_FILE),
+            factor=float(os.environ.get("WAIT_BUDGET_FACTOR", "3"))
+        )
+        self.profiler = CommandProfiler()
+        self.extra_report = {}
+        self.fast_reset = fast_reset
+        self.corpus = PayloadCorpus(corpus_dir, corpus_tags)
+        # Mode rapide: injections SQL et contournements envoyes en HTTP, sans navigateur
+        self.http_fast_path = http_fast_path
+        self.api_url = api_url
+        self.http_concurrency = http_concurrency
+        # Formulaires patient-add / patient-update alimentes par le corpus
+        self.patient_forms = patient_forms
+        # Shard (i, n) execute par cet agent et position globale de ses cas pour la fusion
+        self.shard = shard
+        self.case_positions = {}
+        # Broker de sessions chaudes (host:port); session Remote froide si absent ou indisponible
+        self.broker = broker
+        self.broker_client = None
+        # Backend du driver hors broker: grille, Chrome local headless ou navigateur DevTools
+        self.driver_factory = DriverFactory(driver_backend, grid_url, chromedriver, cdp_address, worker_id, network_log)
+        # Requetes du navigateur (journal performance) rattachees a chaque resultat
+        self.network_log = network_log
+        self.network = None
+        # Regroupement des resultats equivalents: une capture par resultat distinct
+        self.cluster_outcomes = cluster_outcomes
+        self.clusters = OutcomeClusters()
+        # Verdicts des cas inchanges (meme build, meme logique, meme payload) repris sans execution
+        self.result_cache = ResultCache(
+            result_cache,
+            max_bytes=int(float(os.environ.get("RESULT_CACHE_MAX_MB", CACHE_MAX_BYTES / 1048576)) * 1048576)
+        ) if result_cache else None
+        self.force = force
+        self.build_key = None
+        # Raison de la desactivation du cache (build ou backend non identifiables), reportee dans le rapport
+        self.cache_disabled = None
+        self.logic_hashes = {}
+        self.login_form = None
+        # Les cookies HttpOnly ne sont visibles que via WebDriver: un aller-retour par sonde, desactivable
+        self.probe_webdriver_cookies = os.environ.get("PROBE_WEBDRIVER_COOKIES") != "0"
+        # Prefixe par worker pour garder une numerotation isolee en mode pool
+        self.screenshot_prefix = f"w{worker_id:02d}_" if worker_id is not None else ""
+        if shard:
+            # Noms uniques une fois les captures des agents regroupees
+            self.screenshot_prefix = f"s{shard[0]:02d}_{self.screenshot_prefix}"
+        # Horodatage commun au flux de resultats et aux rapports du run
+        self.run_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if shard:
+            # Un rapport par shard, fusionne ensuite par shards.py
+            self.run_stamp = f"{self.run_stamp}_shard{shard[0]}of{shard[1]}"
+        # Chaque resultat est ecrit des qu'il est enregistre (rapport reconstructible apres un arret brutal)
+        self.result_stream = ResultStream(f"security_results_{self.run_stamp}.jsonl")
+        self.current_case = None
+        if start_driver:
+            self.setup_driver()
         self.setup_screenshots_dir()
 
     def setup_screenshots_dir(self):
@@ -26,15 +178,28 @@ class AuthSecurityTests:
         if not os.path.exists(self.screenshots_dir):
             os.makedirs(self.screenshots_dir)
             print(f"SUCCES: Repertoire cree: {self.screenshots_dir}")
+        self.screenshot_writer = ScreenshotWriter(
+            self.screenshots_dir,
+            image_format=os.environ.get("SCREENSHOT_FORMAT", "png")
+        )
+        self.captures = CapturePolicy(
+            self.screenshot_writer,
+            policy=self.capture_policy,
+            ring_size=int(os.environ.get("SCREENSHOT_RING_SIZE", "10")),
+            sample_every=int(os.environ.get("SCREENSHOT_SAMPLE_EVERY", "5"))
+        )
 
+    @timed("capture")
     def take_screenshot(self, name, description=""):
         """Prendre une capture d'ecran avec un nom descriptif"""
         try:
             self.screenshot_counter += 1
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{self.screenshots_dir}/{self.screenshot_counter:02d}_{timestamp}_{name}.png"
+            stem = f"{self.screenshot_prefix}{self.screenshot_counter:02d}_{timestamp}_{name}"
 
-            self.driver.save_screenshot(filename)
+            # Seule la recuperation des octets bloque le test, l'ecriture se fait en arriere-plan
+            png_bytes = self.driver.get_screenshot_as_png()
+            filename = self.captures.capture(stem, png_bytes)
             print(f"CAPTURE: Capture d'ecran: {filename}")
             if description:
                 print(f"   Description: {description}")
@@ -45,26 +210,53 @@ class AuthSecurityTests:
             return None
 
     def setup_driver(self):
-        options = Options()
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-setuid-sandbox")
-
-        self.driver = webdriver.Remote(
-            command_executor='http://selenium:4444/wd/hub',
-            options=options
+        if self.broker:
+            try:
+                self.broker_client = BrokerClient(self.broker)
+                self.driver = self.broker_client.acquire(self.app_url)
+                print(f"SUCCES: Session chaude empruntee au broker {self.broker}")
+            except Exception as e:
+                print(f"ATTENTION: Broker {self.broker} indisponible ({str(e)}), nouvelle session")
+                if self.broker_client:
+                    self.broker_client.close()
+                self.broker_client = None
+        if self.driver is None:
+            self.driver = self.driver_factory.create()
+            print(f"SUCCES: Session ouverte: {self.driver_factory.describe()}")
+        self.use_driver(self.driver)
+
+    def use_driver(self, driver, profile=True):
+        """Moteur d'attente et instrumentation pour un driver (propre ou partage entre contextes)"""
+        self.driver = driver
+        if profile:
+            self.profiler.attach(self.driver)
+        if self.network_log:
+            self.network = NetworkLog(
+                self.driver,
+                self.app_url,
+                slow_signin_ms=float(os.environ.get("SIGNIN_SLOW_MS", SIGNIN_SLOW_MS))
+            )
+        # Budgets appris des runs precedents, plafonnes par WAIT_BUDGETS (seuls budgets au premier run)
+        self.waits = WaitEngine(
+            self.driver,
+            default_timeout=WAIT_CEILING,
+            budgets=self.budget_store.budgets(WAIT_BUDGETS),
+            page_scripts=(XSS_MONITOR_JS,)
         )
-        self.wait = WebDriverWait(self.driver, 30)
+        # Instrumentation XSS des le debut de chaque document si le driver le permet
+        try:
+            install_xss_monitor(self.driver)
+        except Exception as e:
+            print(f"ATTENTION: Instrumentation XSS par document impossible: {str(e)}")
 
+    @timed("navigation")
     def navigate_to_login(self):
         """Naviguer vers la page de login, gerer les redirections"""
+        self.login_form = None
         try:
             print(f"Navigation vers: {self.app_url}")
             self.driver.get(self.app_url)
-            time.sleep(3)
+            self.waits.wait_for_page_ready("page_prete")
 
             # Capture d'ecran apres navigation initiale
             self.take_screenshot("initial_navigation", "Page apres navigation initiale")
@@ -78,14 +270,14 @@ class AuthSecurityTests:
                 login_url = f"{self.app_url}/login"
                 print(f"Redirection manuelle vers: {login_url}")
                 self.driver.get(login_url)
-                time.sleep(3)
+                self.waits.wait_for_page_ready("page_prete")
 
                 # Capture apres redirection vers login
                 self.take_screenshot("redirect_to_login", "Page apres redirection vers /login")
 
             # Attendre que les champs de login soient presents
             try:
-                self.wait.until(EC.presence_of_element_located((By.NAME, "username")))
+                self.waits.until("champs_login", EC.presence_of_element_located((By.NAME, "username")))
                 print("SUCCES: Page de login chargee avec succes")
 
                 # Capture de la page de login prete
@@ -103,47 +295,115 @@ class AuthSecurityTests:
             self.take_screenshot("navigation_error", f"Erreur navigation: {str(e)}")
             return False
 
-    def log_test_result(self, test_name, passed, details="", screenshot_path=None):
-        """Enregistrer le resultat d'un test"""
-        self.test_results.append({
+    @timed("reinitialisation")
+    def reset_to_login(self):
+        """Reinitialiser l'etat dans la page au lieu de recharger l'application"""
+        if not self.fast_reset or self.login_form is None:
+            return self.navigate_to_login()
+
+        # Apres une connexion reussie l'etat Angular en memoire est authentifie: rechargement
+        if self.last_snapshot and (has_token(self.last_snapshot) or "patients" in self.last_snapshot["url"]):
+            return self.navigate_to_login()
+
+        try:
+            state = self.driver.execute_script(FAST_RESET_JS, *self.login_form)
+            if state["token"] is None and not state["cookies"]:
+                if state["connected"]:
+                    print("SUCCES: Etat reinitialise sans rechargement")
+                    return True
+                if state["routed"]:
+                    # Le composant de login a ete recree: relocaliser les champs
+                    self.login_form = None
+                    self.waits.until("champs_login", EC.presence_of_element_located((By.NAME, "username")))
+                    print("SUCCES: Retour sur /login sans rechargement")
+                    return True
+        except Exception as e:
+            print(f"ATTENTION: Reinitialisation rapide impossible: {str(e)}")
+
+        print("ATTENTION: Reinitialisation non verifiee, rechargement complet")
+        return self.navigate_to_login()
+
+    @timed("localisation")
+    def locate_login_form(self):
+        """Localiser les champs et le bouton du formulaire de login"""
+        if self.fast_reset and self.login_form is not None:
+            return self.login_form
+        username_input = self.waits.until("champs_login", EC.element_to_be_clickable((By.NAME, "username")))
+        password_input = self.waits.until("champs_login", EC.element_to_be_clickable((By.NAME, "password")))
+        submit_button = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+        self.login_form = (username_input, password_input, submit_button)
+        return self.login_form
+
+    @timed("saisie")
+    def fill_login_form(self, username_input, password_input, username, password):
+        """Saisir les identifiants dans le formulaire de login"""
+        username_input.clear()
+        username_input.send_keys(username)
+        password_input.clear()
+        password_input.send_keys(password)
+
+    @timed("soumission")
+    def submit_login(self, submit_button):
+        """Soumettre le formulaire et attendre que la reponse de /auth/signin soit traitee
+
+        Retourne None si la soumission n'a pas abouti (budget depasse ou coupe-circuit ouvert).
+        """
+        marker = self.waits.begin_submit()
+        submit_button.click()
+        try:
+            state = self.waits.wait_for_submit_outcome("soumission_login", marker)
+        except TimeoutException:
+            state = None
+        if not state:
+            print("ERREUR: Soumission non terminee")
+        return state
+
+    def record_result(self, result):
+        """Garder un resultat et l'ajouter au flux JSONL"""
+        if self.current_case is not None:
+            result.setdefault("case", self.current_case)
+        if self.worker_id is not None:
+            result.setdefault("worker", self.worker_id)
+        self.test_results.append(result)
+        self.result_stream.write(result)
+
+    def log_test_result(self, test_name, passed, details="", screenshot_path=None, skipped=False):
+        """Enregistrer le resultat d'un test (skipped: non concluant, ni reussi ni echoue)"""
+        if skipped:
+            passed = False
+        result = {
             "test": test_name,
             "passed": passed,
             "details": details,
             "screenshot": screenshot_path,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
-        status = "SUCCES PASSE" if passed else "ERREUR ECHOUE"
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "timings": self.timer.close_case(test_name),
+            "webdriver": self.profiler.close_case(test_name)
+        }
+        if self.network is not None:
+            result["network"] = self.network.close_case(test_name)
+        if skipped:
+            result["skipped"] = True
+        self.record_result(result)
+        if not passed:
+            # Conserver les dernieres captures en memoire qui documentent l'echec
+            self.captures.flush(test_name)
+        status = "ATTENTION NON CONCLUANT" if skipped else "SUCCES PASSE" if passed else "ERREUR ECHOUE"
         print(f"{status} - {test_name}")
         if details:
             print(f"   Details: {details}")
         if screenshot_path:
             print(f"   Capture: {screenshot_path}")
 
+    @timed("sonde")
     def check_for_vulnerabilities(self):
         """Verifier les vulnerabilites communes apres chaque tentative"""
         vulnerabilities = []
 
         try:
-            # Capture d'ecran avant verification des vulnerabilites
-            screenshot_path = self.take_screenshot("vulnerability_check", "Etat de la page lors de la verification des vulnerabilites")
-
-            # Verifier si un token a ete genere
-            token = self.driver.execute_script("return localStorage.getItem('auth_token');")
-            if token and token not in ["null", "undefined", "", None]:
-                vulnerabilities.append("Token genere malgre les mauvais credentials")
-
-            # Verifier l'URL actuelle
-            current_url = self.driver.current_url
-            if "patients" in current_url:
-                vulnerabilities.append("Redirection non autorisee vers la zone protegee")
-
-            # Verifier les cookies de session
-            cookies = self.driver.get_cookies()
-            for cookie in cookies:
-                if 'session' in cookie['name'].lower() and not cookie.get('httpOnly'):
-                    vulnerabilities.append(f"Cookie de session sans flag HttpOnly: {cookie['name']}")
-                if 'session' in cookie['name'].lower() and not cookie.get('secure'):
-                    vulnerabilities.append(f"Cookie de session sans flag Secure: {cookie['name']}")
+            # Un seul aller-retour: token, URL, cookies, stockage et marqueurs DOM
+            self.last_snapshot = take_snapshot(self.driver, self.probe_webdriver_cookies)
+            vulnerabilities = find_vulnerabilities(self.last_snapshot)
 
             # Si des vulnerabilites sont detectees, prendre une capture speciale
             if vulnerabilities:
@@ -155,6 +415,20 @@ class AuthSecurityTests:
 
         return vulnerabilities
 
+    def capture_outcome(self, test_name, payload, screenshot_name, description):
+        """Capture et sonde apres soumission; en mode cluster, capture seulement pour un resultat nouveau"""
+        if not self.cluster_outcomes:
+            screenshot = self.take_screenshot(screenshot_name, description)
+            return self.check_for_vulnerabilities(), screenshot, ""
+
+        self.last_snapshot = None
+        vulnerabilities = self.check_for_vulnerabilities()
+        result = outcome(self.last_snapshot or {}, payload)
+        key = fingerprint(result)
+        if self.clusters.observe(key, test_name, payload, result) or vulnerabilities:
+            return vulnerabilities, self.take_screenshot(screenshot_name, description), f" (cluster {key})"
+        return vulnerabilities, None, f" (meme resultat que '{self.clusters.representative(key)}', cluster {key})"
+
     def test_basic_injection(self):
         """Test basique d'injection SQL"""
         print("\n=== TEST: Injection SQL Basique ===")
@@ -165,22 +439,19 @@ class AuthSecurityTests:
 
         try:
             # Test simple d'injection SQL
-            username_input = self.wait.until(EC.element_to_be_clickable((By.NAME, "username")))
-            password_input = self.wait.until(EC.element_to_be_clickable((By.NAME, "password")))
-            submit_button = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+            username_input, password_input, submit_button = self.locate_login_form()
 
             # Injection SQL classique
-            username_input.clear()
-            username_input.send_keys("admin' OR '1'='1")
-            password_input.clear()
-            password_input.send_keys("password")
+            self.fill_login_form(username_input, password_input, "admin' OR '1'='1", "password")
 
             # Capture avant soumission
             screenshot_before = self.take_screenshot("sql_injection_before", "Avant soumission injection SQL basique")
 
             print("Tentative d'injection SQL...")
-            submit_button.click()
-            time.sleep(3)
+            if not self.submit_login(submit_button):
+                screenshot = self.take_screenshot("sql_injection_no_response", "Soumission injection SQL basique non terminee")
+                self.log_test_result("Protection injection SQL basique", False, "Soumission non terminee", screenshot)
+                return False
 
             # Capture apres soumission
             screenshot_after = self.take_screenshot("sql_injection_after", "Apres soumission injection SQL basique")
@@ -223,31 +494,27 @@ class AuthSecurityTests:
             return False
 
         try:
-            username_input = self.wait.until(EC.element_to_be_clickable((By.NAME, "username")))
-            password_input = self.wait.until(EC.element_to_be_clickable((By.NAME, "password")))
-            submit_button = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+            username_input, password_input, submit_button = self.locate_login_form()
 
             # Utiliser les vraies credentials
-            username_input.clear()
-            username_input.send_keys("admin")
-            password_input.clear()
-            password_input.send_keys("password123")
+            self.fill_login_form(username_input, password_input, "admin", "password123")
 
             # Capture avant connexion valide
             screenshot_before = self.take_screenshot("valid_login_before", "Avant connexion avec credentials valides")
 
             print("Tentative de connexion valide...")
-            submit_button.click()
-            time.sleep(5)
+            if not self.submit_login(submit_button):
+                screenshot = self.take_screenshot("valid_login_no_response", "Connexion valide non terminee")
+                self.log_test_result("Connexion valide", False, "Soumission non terminee", screenshot)
+                return False
 
             # Capture apres connexion
             screenshot_after = self.take_screenshot("valid_login_after", "Apres connexion valide")
 
             # Verifier si on est bien connecte
-            current_url = self.driver.current_url
-            token = self.driver.execute_script("return localStorage.getItem('auth_token');")
+            self.last_snapshot = take_snapshot(self.driver)
 
-            if "patients" in current_url or (token and token not in ["null", "undefined", "", None]):
+            if "patients" in self.last_snapshot["url"] or has_token(self.last_snapshot):
                 # Capture de la page apres connexion reussie
                 success_screenshot = self.take_screenshot("valid_login_success", "Connexion reussie - page protegee")
 
@@ -262,7 +529,7 @@ class AuthSecurityTests:
                 try:
                     logout_button = self.driver.find_element(By.ID, "logout")
                     logout_button.click()
-                    time.sleep(2)
+                    self.waits.wait_for_url("deconnexion", "login")
                     # Capture apres deconnexion
                     self.take_screenshot("after_logout", "Apres deconnexion")
                 except:
@@ -292,137 +559,122 @@ class AuthSecurityTests:
         """Test de differentes variations d'injection SQL"""
         print("\n=== TEST: Variations d'Injection SQL ===")
 
-        sql_payloads = [
-            ("admin' --", "password"),
-            ("admin' OR 1=1 --", "password"),
-            ("' OR '1'='1' --", "' OR '1'='1' --"),
-            ("admin'; DROP TABLE users; --", "password"),
-        ]
+        return self.run_corpus("sql", self.check_sql_payload)
 
-        all_passed = True
+    def check_sql_payload(self, i, username, password):
+        """Tester une variation d'injection SQL"""
+        if not self.reset_to_login():
+            return True
 
-        for i, (username, password) in enumerate(sql_payloads):
-            if not self.navigate_to_login():
-                continue
-
-            try:
-                print(f"\nTest injection {i+1}: {username[:30]}...")
+        try:
+            print(f"\nTest injection {i+1}: {username[:30]}...")
 
-                username_input = self.wait.until(EC.element_to_be_clickable((By.NAME, "username")))
-                password_input = self.wait.until(EC.element_to_be_clickable((By.NAME, "password")))
-                submit_button = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+            username_input, password_input, submit_button = self.locate_login_form()
 
-                username_input.clear()
-                username_input.send_keys(username)
-                password_input.clear()
-                password_input.send_keys(password)
+            self.fill_login_form(username_input, password_input, username, password)
 
-                # Capture avant chaque variation
+            # Capture avant chaque variation (inutile quand les resultats sont regroupes)
+            if not self.cluster_outcomes:
                 screenshot_before = self.take_screenshot(f"sql_var_{i+1}_before", f"Avant injection variation {i+1}: {username[:20]}")
 
-                submit_button.click()
-                time.sleep(3)
-
-                # Capture apres chaque variation
-                screenshot_after = self.take_screenshot(f"sql_var_{i+1}_after", f"Apres injection variation {i+1}")
-
-                vulnerabilities = self.check_for_vulnerabilities()
+            if not self.submit_login(submit_button):
+                screenshot = self.take_screenshot(f"sql_var_{i+1}_no_response", f"Soumission non terminee variation {i+1}")
+                self.log_test_result(f"Protection SQL - {username[:20]}", False, "Soumission non terminee", screenshot)
+                return False
 
-                if vulnerabilities:
-                    self.log_test_result(
-                        f"Protection SQL - {username[:20]}",
-                        False,
-                        f"Vulnerabilites: {', '.join(vulnerabilities)}",
-                        screenshot_after
-                    )
-                    all_passed = False
-                else:
-                    self.log_test_result(
-                        f"Protection SQL - {username[:20]}",
-                        True,
-                        "Injection bloquee",
-                        screenshot_after
-                    )
+            # Capture apres chaque variation et sonde
+            vulnerabilities, screenshot_after, cluster = self.capture_outcome(
+                f"Protection SQL - {username[:20]}", username,
+                f"sql_var_{i+1}_after", f"Apres injection variation {i+1}"
+            )
 
-            except Exception as e:
-                error_screenshot = self.take_screenshot(f"sql_var_{i+1}_error", f"Erreur variation {i+1}: {str(e)}")
+            if vulnerabilities:
                 self.log_test_result(
-                    f"Test SQL - {username[:20]}",
+                    f"Protection SQL - {username[:20]}",
                     False,
-                    f"Erreur: {str(e)}",
-                    error_screenshot
+                    f"Vulnerabilites: {', '.join(vulnerabilities)}{cluster}",
+                    screenshot_after
                 )
-                all_passed = False
+                return False
+            else:
+                self.log_test_result(
+                    f"Protection SQL - {username[:20]}",
+                    True,
+                    f"Injection bloquee{cluster}",
+                    screenshot_after
+                )
+                return True
 
-        return all_passed
+        except Exception as e:
+            error_screenshot = self.take_screenshot(f"sql_var_{i+1}_error", f"Erreur variation {i+1}: {str(e)}")
+            self.log_test_result(
+                f"Test SQL - {username[:20]}",
+                False,
+                f"Erreur: {str(e)}",
+                error_screenshot
+            )
+            return False
 
     def test_xss_basic(self):
         """Test XSS basique"""
         print("\n=== TEST: XSS Basique ===")
 
+        return self.run_corpus("xss", self.check_xss_payload)
+
+    def check_xss_payload(self, i, username, password):
+        """Tester un payload XSS"""
         if not self.navigate_to_login():
             return False
 
         try:
-            username_input = self.wait.until(EC.element_to_be_clickable((By.NAME, "username")))
-            password_input = self.wait.until(EC.element_to_be_clickable((By.NAME, "password")))
-            submit_button = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+            username_input, password_input, submit_button = self.locate_login_form()
 
-            # Test XSS simple
-            xss_payload = "<script>alert('XSS')</script>"
-            username_input.clear()
-            username_input.send_keys(xss_payload)
-            password_input.clear()
-            password_input.send_keys("password")
+            self.fill_login_form(username_input, password_input, username, password)
 
             # Capture avant test XSS
-            screenshot_before = self.take_screenshot("xss_before", "Avant test XSS")
+            screenshot_before = self.take_screenshot(f"xss_{i+1}_before", f"Avant test XSS {i+1}")
 
-            submit_button.click()
-            time.sleep(2)
+            if not self.submit_login(submit_button):
+                screenshot = self.take_screenshot(f"xss_{i+1}_no_response", f"Soumission non terminee test XSS {i+1}")
+                self.log_test_result(f"Protection XSS - {username[:20]}", False, "Soumission non terminee", screenshot)
+                return False
 
             # Capture apres test XSS
-            screenshot_after = self.take_screenshot("xss_after", "Apres test XSS")
+            screenshot_after = self.take_screenshot(f"xss_{i+1}_after", f"Apres test XSS {i+1}")
 
-            # Verifier si une alerte s'est declenchee
-            try:
-                alert = self.driver.switch_to.alert
-                alert_text = alert.text
-                # Capture de l'alerte si possible
-                alert_screenshot = self.take_screenshot("xss_alert", f"Alerte XSS detectee: {alert_text}")
-                alert.accept()
+            # Un seul appel: evenements releves par l'instrumentation depuis le chargement de la page
+            events = read_xss_events(self.driver)
+            if events is None:
+                # Document recharge sans instrumentation: une vraie alerte a pu s'ouvrir
+                try:
+                    alert = self.driver.switch_to.alert
+                    events = [{"kind": "dialog", "detail": f"alert: {alert.text}"}]
+                    alert.accept()
+                except NoAlertPresentException:
+                    events = []
+
+            if events:
+                xss_screenshot = self.take_screenshot(f"xss_{i+1}_detected", f"XSS detecte: {describe_xss_events(events)[:60]}")
                 self.log_test_result(
-                    "Protection XSS basique",
+                    f"Protection XSS - {username[:20]}",
                     False,
-                    f"Alerte XSS declenchee: {alert_text}",
-                    alert_screenshot
+                    f"Execution ou injection detectee: {describe_xss_events(events)}",
+                    xss_screenshot
                 )
                 return False
-            except:
-                # Pas d'alerte, verifier le DOM
-                page_source = self.driver.page_source
-                if "<script>" in page_source and "alert" in page_source:
-                    dom_screenshot = self.take_screenshot("xss_dom_injection", "Script XSS injecte dans le DOM")
-                    self.log_test_result(
-                        "Protection XSS basique",
-                        False,
-                        "Script injecte dans le DOM",
-                        dom_screenshot
-                    )
-                    return False
-                else:
-                    self.log_test_result(
-                        "Protection XSS basique",
-                        True,
-                        "XSS bloque correctement",
-                        screenshot_after
-                    )
-                    return True
+            else:
+                self.log_test_result(
+                    f"Protection XSS - {username[:20]}",
+                    True,
+                    "XSS bloque correctement",
+                    screenshot_after
+                )
+                return True
 
         except Exception as e:
-            error_screenshot = self.take_screenshot("xss_error", f"Erreur test XSS: {str(e)}")
+            error_screenshot = self.take_screenshot(f"xss_{i+1}_error", f"Erreur test XSS: {str(e)}")
             self.log_test_result(
-                "Test XSS basique",
+                f"Test XSS - {username[:20]}",
                 False,
                 f"Erreur: {str(e)}",
                 error_screenshot
@@ -433,118 +685,627 @@ class AuthSecurityTests:
         """Test de contournement d'authentification simple"""
         print("\n=== TEST: Contournement d'Authentification ===")
 
-        bypass_attempts = [
-            ("admin ", "password"),  # Espace apres
-            (" admin", "password"),  # Espace avant
-            ("ADMIN", "password"),   # Majuscules
-            ("admin\x00", "password"),  # Null byte
-        ]
+        return self.run_corpus("bypass", self.check_bypass_attempt)
 
-        all_passed = True
+    def check_bypass_attempt(self, i, username, password):
+        """Tester une tentative de contournement d'authentification"""
+        if not self.reset_to_login():
+            return True
 
-        for i, (username, password) in enumerate(bypass_attempts):
-            if not self.navigate_to_login():
-                continue
-
-            try:
-                print(f"\nTest bypass {i+1}: '{username}'")
+        try:
+            print(f"\nTest bypass {i+1}: '{username}'")
 
-                username_input = self.wait.until(EC.element_to_be_clickable((By.NAME, "username")))
-                password_input = self.wait.until(EC.element_to_be_clickable((By.NAME, "password")))
-                submit_button = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+            username_input, password_input, submit_button = self.locate_login_form()
 
-                username_input.clear()
-                username_input.send_keys(username)
-                password_input.clear()
-                password_input.send_keys(password)
+            self.fill_login_form(username_input, password_input, username, password)
 
-                # Capture avant test de bypass
+            # Capture avant test de bypass (inutile quand les resultats sont regroupes)
+            if not self.cluster_outcomes:
                 screenshot_before = self.take_screenshot(f"bypass_{i+1}_before", f"Avant test bypass {i+1}: '{username.strip()}'")
 
-                submit_button.click()
-                time.sleep(3)
-
-                # Capture apres test de bypass
-                screenshot_after = self.take_screenshot(f"bypass_{i+1}_after", f"Apres test bypass {i+1}")
-
-                vulnerabilities = self.check_for_vulnerabilities()
+            if not self.submit_login(submit_button):
+                screenshot = self.take_screenshot(f"bypass_{i+1}_no_response", f"Soumission non terminee bypass {i+1}")
+                self.log_test_result(f"Protection bypass - {username.strip()}", False, "Soumission non terminee", screenshot)
+                return False
 
-                if vulnerabilities:
-                    self.log_test_result(
-                        f"Protection bypass - {username.strip()}",
-                        False,
-                        f"Vulnerabilites: {', '.join(vulnerabilities)}",
-                        screenshot_after
-                    )
-                    all_passed = False
-                else:
-                    self.log_test_result(
-                        f"Protection bypass - {username.strip()}",
-                        True,
-                        "Tentative bloquee",
-                        screenshot_after
-                    )
+            # Capture apres test de bypass et sonde
+            vulnerabilities, screenshot_after, cluster = self.capture_outcome(
+                f"Protection bypass - {username.strip()}", username,
+                f"bypass_{i+1}_after", f"Apres test bypass {i+1}"
+            )
 
-            except Exception as e:
-                error_screenshot = self.take_screenshot(f"bypass_{i+1}_error", f"Erreur bypass {i+1}: {str(e)}")
+            if vulnerabilities:
                 self.log_test_result(
-                    f"Test bypass - {username.strip()}",
+                    f"Protection bypass - {username.strip()}",
                     False,
-                    f"Erreur: {str(e)}",
-                    error_screenshot
+                    f"Vulnerabilites: {', '.join(vulnerabilities)}{cluster}",
+                    screenshot_after
                 )
-                all_passed = False
+                return False
+            else:
+                self.log_test_result(
+                    f"Protection bypass - {username.strip()}",
+                    True,
+                    f"Tentative bloquee{cluster}",
+                    screenshot_after
+                )
+                return True
+
+        except Exception as e:
+            error_screenshot = self.take_screenshot(f"bypass_{i+1}_error", f"Erreur bypass {i+1}: {str(e)}")
+            self.log_test_result(
+                f"Test bypass - {username.strip()}",
+                False,
+                f"Erreur: {str(e)}",
+                error_screenshot
+            )
+            return False
+
+    @timed("navigation")
+    def open_patient_page(self, path):
+        """Ouvrir une page patient en etant connecte, par le routeur Angular si l'application est chargee"""
+        origin = "{0.scheme}://{0.netloc}".format(urlsplit(self.app_url))
+        if not self.driver.execute_script(ROUTE_JS, path, origin):
+            self.driver.get(f"{self.app_url.rstrip('/')}{path}")
+        state = self.waits.wait_for_page_ready("page_prete")
+
+        if state and "/login" in state["url"]:
+            # Redirige par AuthGuard: connexion avec les identifiants valides puis retour sur la page
+            self.login_form = None
+            username_input, password_input, submit_button = self.locate_login_form()
+            self.fill_login_form(username_input, password_input, "admin", "password123")
+            if not self.submit_login(submit_button):
+                # Leve pour que l'appelant enregistre l'echec avec sa capture d'erreur
+                raise TimeoutException("Soumission non terminee lors de la connexion a la page patient")
+            self.driver.execute_script(ROUTE_JS, path, origin)
+            self.waits.wait_for_page_ready("page_prete")
+
+        return self.waits.until("formulaire_patient", EC.presence_of_element_located((By.CSS_SELECTOR, "form.patient-form")))
+
+    @timed("saisie")
+    def fill_patient_form(self, values):
+        """Remplir et soumettre le formulaire patient en un seul appel WebDriver"""
+        return self.waits.execute_async("saisie_patient", FILL_PATIENT_FORM_JS, values)
+
+    @timed("soumission")
+    def wait_for_patient_write(self):
+        """Attendre la reponse du POST/PUT /v1/patients declenche par la soumission"""
+        write = self.waits.until("ecriture_patient", lambda driver: driver.execute_script(PATIENT_WRITE_JS), raise_on_timeout=False)
+        # Laisser la navigation de fin de soumission se terminer avant de changer de page
+        self.waits.wait_for_page_ready("page_prete")
+        return write
+
+    @timed("sonde")
+    def check_patient_details(self, patient_id, payload):
+        """Afficher patient-details et relever dialogues, elements injectes et rendu du payload"""
+        return self.waits.execute_async("sonde_details", DETAILS_JS, f"/patients/{patient_id}", [payload])
+
+    def delete_patient(self, patient_id):
+        """Supprimer un patient de test via l'API avec le token de la session"""
+        try:
+            status = self.waits.execute_async("suppression_patient", DELETE_PATIENT_JS, patient_id)
+        except Exception as e:
+            status = str(e)
+        if not isinstance(status, int) or not 200 <= status < 300:
+            print(f"ATTENTION: Patient de test {patient_id} non supprime ({status})")
+
+    def submit_patient_form(self, label, path, payload, index, patient_id=None, created=None):
+        """Soumettre un formulaire patient avec le payload et verifier patient-details"""
+        test_name = f"Formulaire {label} - {payload[:20]}"
+        self.open_patient_page(path)
+        outcome = self.fill_patient_form(form_values(payload, index))
+        if not outcome["submitted"]:
+            screenshot = self.take_screenshot(f"form_{label}_{index+1}_refused", f"Formulaire {label} refuse")
+            if "error" in outcome:
+                self.log_test_result(test_name, False, outcome["error"], screenshot)
+                return False, None
+            # Refuse par les validateurs Angular: le payload n'a pas atteint l'API, resultat non concluant
+            detail = f"Formulaire refuse, champs invalides: {', '.join(outcome['invalid'])}"
+            self.log_test_result(test_name, False, detail, screenshot, skipped=True)
+            return True, None
+
+        write = self.wait_for_patient_write()
+        if not write:
+            screenshot = self.take_screenshot(f"form_{label}_{index+1}_no_response", f"Pas de reponse {label}")
+            self.log_test_result(test_name, False, "Aucune reponse de l'API apres soumission", screenshot)
+            return False, None
+
+        patient_id = written_patient_id(write) or patient_id
+        if created is not None and write["status"] < 300 and patient_id and patient_id not in created:
+            # Identifiant retenu des la reponse du POST: supprime meme si la suite echoue
+            created.append(patient_id)
+        details = None
+        if write["status"] < 300 and patient_id:
+            details = self.check_patient_details(patient_id, payload)
+        findings = details_findings(details, write["status"])
+        screenshot = self.take_screenshot(f"form_{label}_{index+1}_details", f"patient-details apres {label}")
+
+        if findings:
+            self.log_test_result(test_name, False, f"Vulnerabilites: {', '.join(findings)}", screenshot)
+            return False, patient_id
+        if write["status"] >= 300:
+            detail = f"Ecriture refusee par l'API (HTTP {write['status']})"
+        elif not details or not details["rendered"]:
+            detail = "patient-details non affiche"
+        elif details["literal"]:
+            detail = "Payload affiche comme texte"
+        else:
+            detail = "Payload modifie a l'affichage, aucun element injecte"
+        self.log_test_result(test_name, True, detail, screenshot)
+        return True, patient_id
+
+    def check_patient_form_payload(self, i, category, payload):
+        """Injecter un payload dans patient-add puis patient-update sur le patient cree"""
+        created = []
+        try:
+            print(f"\nFormulaires patient {category} {i+1}: {payload[:30]}...")
+            added, patient_id = self.submit_patient_form("ajout", "/patients/add", payload, i, created=created)
+            if patient_id is None:
+                return added
+
+            updated, _ = self.submit_patient_form("modification", f"/patients/edit/{patient_id}", payload, i, patient_id)
+            return added and updated
+
+        except Exception as e:
+            error_screenshot = self.take_screenshot(f"form_{category}_{i+1}_error", f"Erreur formulaire patient: {str(e)}")
+            self.log_test_result(
+                f"Test formulaire patient - {payload[:20]}",
+                False,
+                f"Erreur: {str(e)}",
+                error_screenshot
+            )
+            return False
+        finally:
+            # Ne pas accumuler les patients de test (et leur payload) dans la base, meme apres une erreur
+            for patient_id in created:
+                self.delete_patient(patient_id)
+
+    def test_patient_forms(self):
+        """Payloads XSS et SQL dans les formulaires patient-add et patient-update"""
+        print("\n=== TEST: Formulaires Patient ===")
 
+        all_passed = True
+        for category in ("xss", "sql"):
+            check = lambda i, username, password, category=category: self.check_patient_form_payload(i, category, username)
+            if not self.run_corpus(category, check):
+                all_passed = False
         return all_passed
 
     def generate_simple_report(self):
         """Generer un rapport simple"""
+        self.captures.finish()
+        self.screenshot_writer.flush()
+        # Les rapports sont derives du flux ecrit pendant le run
+        self.result_stream.close()
+        if self.result_stream.count:
+            self.test_results = read_results(self.result_stream.path, self.case_positions)
+        capture_summary = self.captures.summary()
+        dropped = set(capture_summary["dropped"])
+        for test in self.test_results:
+            if test.get("screenshot") in dropped:
+                test["screenshot_dropped"] = True
         print("\n" + "="*60)
         print("RAPPORT DES TESTS DE SECURITE")
         print("="*60)
         print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"URL: {self.app_url}")
-        print(f"Captures d'ecran: {self.screenshot_counter} fichiers dans {self.screenshots_dir}/")
+        print(f"Captures d'ecran: {len(capture_summary['written'])} fichiers dans {self.screenshots_dir}/ (politique {capture_summary['policy']}, {len(capture_summary['dropped'])} abandonnee(s))")
 
-        passed = sum(1 for t in self.test_results if t['passed'])
-        failed = len(self.test_results) - passed
+        summary = summarize(self.test_results)
+        passed = summary["passed"]
+        failed = summary["failed"]
 
-        print(f"\nResultats: {passed} reussis, {failed} echoues")
-        print(f"Taux de reussite: {(passed/len(self.test_results)*100):.1f}%")
+        print(f"\nResultats: {passed} reussis, {failed} echoues, {summary['skipped']} non concluants")
+        if self.test_results:
+            print(f"Taux de reussite: {(passed/len(self.test_results)*100):.1f}%")
 
         if failed > 0:
             print("\n--- Tests echoues ---")
             for test in self.test_results:
-                if not test['passed']:
+                if not test['passed'] and not test.get('skipped'):
                     print(f"ERREUR {test['test']}")
                     if test['details']:
                         print(f"   -> {test['details']}")
                     if test.get('screenshot'):
                         print(f"   CAPTURE {test['screenshot']}")
 
+        if summary["skipped"] > 0:
+            print("\n--- Tests non concluants ---")
+            for test in self.test_results:
+                if test.get('skipped'):
+                    print(f"ATTENTION {test['test']}")
+                    if test['details']:
+                        print(f"   -> {test['details']}")
+
         # Lister toutes les captures d'ecran
         print(f"\n--- Captures d'ecran creees ({self.screenshot_counter} total) ---")
         for test in self.test_results:
             if test.get('screenshot'):
                 print(f"CAPTURE {test['screenshot']} - {test['test']}")
 
+        # Budgets utilises pendant ce run, puis apprentissage pour le suivant
+        budget_summary = self.budget_store.summary(WAIT_BUDGETS)
+        if self.waits and self.waits.records:
+            try:
+                self.budget_store.update(self.waits.records)
+            except OSError as e:
+                print(f"ATTENTION: Budgets d'attente non sauvegardes: {str(e)}")
+
+        # Temps d'attente reel par etape
+        wait_summary = self.waits.summary() if self.waits else {}
+        if wait_summary:
+            print("\n--- Temps d'attente par etape ---")
+            for step, stats in wait_summary.items():
+                budget = budget_summary.get(step, {}).get("budget", WAIT_CEILING)
+                print(f"ATTENTE {step}: {stats['count']} fois, total {stats['total']:.2f}s, max {stats['max']:.2f}s, budget {budget}s, {stats['timeouts']} depassement(s)")
+
+        # Repartition du temps par phase
+        phase_summary = self.timer.summary()
+        if phase_summary:
+            print("\n--- Temps par phase (p50 / p95 / max) ---")
+            for phase, stats in phase_summary.items():
+                print(f"PHASE {phase}: {stats['p50']:.2f}s / {stats['p95']:.2f}s / {stats['max']:.2f}s ({stats['count']} mesures)")
+
+        # Allers-retours WebDriver les plus couteux
+        self.profiler.print_table()
+
+        # Requetes du navigateur: latences, anomalies et cascade du premier chargement
+        if any(test.get("network") for test in self.test_results):
+            network = network_summary(self.test_results)
+            self.extra_report["network"] = network
+            signin = network["signin"]
+            print(f"\n--- Reseau ({network['requests']} requetes, {network['bytes'] / 1024:.0f} Ko) ---")
+            if signin["count"]:
+                print(f"RESEAU /auth/signin: {signin['count']} appels, p50 {signin['p50_ms']}ms, p95 {signin['p95_ms']}ms, max {signin['max_ms']}ms")
+            for finding in network["findings"][:10]:
+                print(f"ATTENTION: {finding['detail']} ({finding['count']} test(s))")
+            if network["boot"]:
+                print(f"Cascade du chargement ({network['boot']['test']}):")
+                print_waterfall(network["boot"]["waterfall"])
+
+        # Verdicts repris du cache et enregistres pour les prochains builds
+        if self.result_cache is not None:
+            try:
+                stored = self.result_cache.save()
+            except OSError as e:
+                stored = 0
+                print(f"ATTENTION: Cache de resultats non sauvegarde: {str(e)}")
+            cache_summary = dict(self.result_cache.summary(), stored=stored, build=self.build_key, forced=self.force)
+            self.extra_report["cache"] = cache_summary
+            cached = sum(1 for test in self.test_results if test.get("cached"))
+            print(f"\nCACHE: {cached} resultat(s) repris du cache, {len(self.test_results) - cached} execute(s), "
+                  f"{stored} verdict(s) enregistres, {cache_summary['evicted']} evince(s)")
+        elif self.cache_disabled:
+            self.extra_report["cache"] = {"disabled": self.cache_disabled}
+            print(f"\nCACHE: desactive ({self.cache_disabled})")
+
+        # Resultats distincts observes (mode cluster ou fuzzing)
+        if self.clusters.clusters:
+            clusters = self.clusters.summary()
+            self.extra_report["clusters"] = clusters
+            print(f"\n--- Resultats distincts ({len(clusters)} clusters) ---")
+            for cluster in clusters:
+                print(f"CLUSTER {cluster['fingerprint']}: {cluster['count']} cas, representant '{cluster['representative']}'")
+
+        run_stamp = self.run_stamp
+        trace_file = self.timer.write_chrome_trace(f"security_trace_{run_stamp}.json")
+        print(f"Trace des phases: {trace_file} (chrome://tracing / Perfetto)")
+
+        if not self.probe_webdriver_cookies:
+            # Un cookie de session HttpOnly sans Secure ne peut pas etre detecte par la seule sonde JS
+            self.extra_report["cookies"] = {"httponly_inspected": False}
+            print("\nATTENTION: Cookies HttpOnly non inspectes (PROBE_WEBDRIVER_COOKIES=0): flags Secure non verifies")
+
         # Sauvegarder le rapport JSON
-        report_file = f"security_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        report_file = f"security_report_{run_stamp}.json"
+        report = {
+            "date": datetime.now().isoformat(),
+            "url": self.app_url,
+            "screenshots_count": self.screenshot_counter,
+            "screenshots_dir": self.screenshots_dir,
+            "screenshots": capture_summary,
+            "summary": summary,
+            "results": self.test_results,
+            "results_stream": self.result_stream.path if self.result_stream.count else None,
+            "junit_file": f"security_junit_{run_stamp}.xml",
+            "timings": {
+                "phases": phase_summary,
+                "trace_file": trace_file
+            },
+            "webdriver_commands": self.profiler.summary(),
+            "waits": {
+                "steps": wait_summary,
+                "budgets": budget_summary,
+                "records": self.waits.records if self.waits else []
+            }
+        }
+        if self.shard:
+            report["shard"] = {"index": self.shard[0], "count": self.shard[1], "positions": self.case_positions}
+        # Sections ajoutees par les modes complementaires (charge, rendu...)
+        report.update(self.extra_report)
         with open(report_file, 'w') as f:
-            json.dump({
-                "date": datetime.now().isoformat(),
-                "url": self.app_url,
-                "screenshots_count": self.screenshot_counter,
-                "screenshots_dir": self.screenshots_dir,
-                "summary": {
-                    "total": len(self.test_results),
-                    "passed": passed,
-                    "failed": failed
-                },
-                "results": self.test_results
-            }, f, indent=2)
-
-        print(f"\nRapport sauvegarde: {report_file}")
+            json.dump(report, f, indent=2)
+
+        write_junit(self.test_results, report["junit_file"])
+        print(f"\nRapport sauvegarde: {report_file} (JUnit: {report['junit_file']})")
+
+    def test_http_fast_path(self):
+        """Injections SQL et contournements envoyes directement a /auth/signin"""
+        print("\n=== TEST: Injections et Contournements via HTTP (mode rapide) ===")
+
+        api_url = self.api_url or resolve_api_url(self.app_url)
+        print(f"API: {api_url} ({self.http_concurrency} connexions)")
+
+        runner = HttpFastPath(api_url, self.http_concurrency)
+        cases = itertools.chain(self.corpus.cases("sql"), self.corpus.cases("bypass"))
+        if self.shard:
+            cases = (case for case in cases if in_shard(case, *self.shard))
+
+        all_passed = True
+        for result in runner.run(cases):
+            self.log_test_result(result["test"], result["passed"], result["details"])
+            if not result["passed"]:
+                all_passed = False
+
+        return all_passed
+
+    def test_patient_load(self, rate=20.0, duration=30.0, concurrency=16, mix=None, max_error_rate=0.01):
+        """Charge CRUD sur PatientService (/api/v1/patients) a debit cible"""
+        print("\n=== CHARGE: CRUD Patients ===")
+
+        api_url = self.api_url or resolve_api_url(self.app_url)
+        print(f"API: {api_url} - {rate} req/s pendant {duration}s, {concurrency} connexions")
+
+        try:
+            result = PatientLoadTest(api_url, rate=rate, duration=duration, concurrency=concurrency, mix=mix).run()
+        except Exception as e:
+            self.log_test_result("Charge CRUD patients", False, f"Erreur: {str(e)}")
+            return False
+
+        self.extra_report["load"] = result
+        print(f"Debit: {result['throughput']} req/s ({result['requests']} requetes), erreurs {result['error_rate'] * 100:.2f}%")
+
+        all_passed = True
+        for operation, stats in result["endpoints"].items():
+            passed = stats["error_rate"] <= max_error_rate
+            self.log_test_result(
+                f"Charge - {operation}",
+                passed,
+                f"{stats['count']} appels, p50 {stats['p50'] * 1000:.1f}ms, p99 {stats['p99'] * 1000:.1f}ms, "
+                f"p999 {stats['p999'] * 1000:.1f}ms (service p99 {stats['service']['p99'] * 1000:.1f}ms), "
+                f"erreurs {stats['error_rate'] * 100:.2f}%"
+            )
+            if not passed:
+                all_passed = False
+
+        return all_passed
+
+    def test_render_scaling(self, sizes, stub=None, max_render_ms=None):
+        """Temps de rendu de /patients selon le nombre de patients (courbe taille/latence)"""
+        print("\n=== RENDU: Liste des patients ===")
+
+        api_url = self.api_url or resolve_api_url(self.app_url)
+        print(f"API: {api_url} - tailles {', '.join(str(size) for size in sizes)}")
+
+        try:
+            curve = RenderProbe(self.driver, self.app_url, api_url, stub=stub).run(sizes)
+        except Exception as e:
+            self.log_test_result("Rendu liste patients", False, f"Erreur: {str(e)}")
+            return False
+
+        self.extra_report["render"] = {"api_url": api_url, "curve": curve, "scaling": scaling(curve)}
+
+        all_passed = True
+        for point in curve:
+            name = f"Rendu - {point['patients']} patients"
+            if not point.get("rendered"):
+                screenshot = self.take_screenshot(f"render_{point['size']}", f"Liste non rendue ({point['patients']} patients)")
+                self.log_test_result(name, False, f"Liste non rendue: {point.get('error', '')}", screenshot)
+                all_passed = False
+                continue
+            heap = f"{point['heap_used'] / 1048576:.1f} Mo" if point.get("heap_used") else "n/d"
+            passed = max_render_ms is None or point["rendered_ms"] <= max_render_ms
+            self.log_test_result(
+                name,
+                passed,
+                f"liste rendue a {point['rendered_ms']}ms, DOMContentLoaded {point['navigation']['dom_content_loaded_ms']}ms, "
+                f"{point['long_tasks']} long tasks ({point['long_tasks_ms']}ms), tas JS {heap}"
+            )
+            if not passed:
+                all_passed = False
+
+        for slope in self.extra_report["render"]["scaling"]:
+            print(f"{slope['from']} -> {slope['to']} patients: {slope['ms_per_1000']}ms par 1000 patients")
+
+        return all_passed
+
+    def test_fuzz_login(self, iterations=200, seed=1):
+        """Fuzzing du login guide par les empreintes: muter en priorite les entrees aux resultats rares"""
+        print("\n=== FUZZING: Formulaire de login ===")
+
+        seeds = [
+            {"username": case["username"], "password": case["password"]}
+            for case in itertools.chain(self.corpus.cases("sql"), self.corpus.cases("bypass"))
+        ]
+        queue = FuzzQueue(seeds, self.clusters, seed=seed)
+        print(f"{len(seeds)} graines du corpus, {iterations} essais (graine aleatoire {seed})")
+
+        all_passed = True
+        discoveries = []
+        interesting = []
+        for i in range(iterations):
+            username, password, parent = queue.next_input()
+            test_name = f"Fuzz {i+1} - {username[:20]}"
+            if not self.reset_to_login():
+                continue
+            try:
+                username_input, password_input, submit_button = self.locate_login_form()
+                self.fill_login_form(username_input, password_input, username, password)
+                if not self.submit_login(submit_button):
+                    screenshot = self.take_screenshot(f"fuzz_{i+1}_no_response", f"Soumission non terminee fuzzing {i+1}")
+                    self.log_test_result(test_name, False, "Soumission non terminee", screenshot)
+                    all_passed = False
+                    continue
+                self.last_snapshot = None
+                vulnerabilities = self.check_for_vulnerabilities()
+            except Exception as e:
+                error_screenshot = self.take_screenshot(f"fuzz_{i+1}_error", f"Erreur fuzzing {i+1}: {str(e)}")
+                self.log_test_result(test_name, False, f"Erreur: {str(e)}", error_screenshot)
+                all_passed = False
+                continue
+
+            result = outcome(self.last_snapshot or {}, username)
+            key = fingerprint(result)
+            new = self.clusters.observe(key, test_name, username, result)
+            queue.report(username, password, key, new, parent)
+            if new:
+                discoveries.append({"iteration": i + 1, "clusters": len(self.clusters.clusters)})
+
+            # Seuls les resultats nouveaux et les vulnerabilites sont enregistres
+            if vulnerabilities:
+                screenshot = self.take_screenshot(f"fuzz_{i+1}_vuln", f"Fuzzing {i+1}: {', '.join(vulnerabilities)}")
+                self.log_test_result(test_name, False, f"Vulnerabilites: {', '.join(vulnerabilities)} (cluster {key})", screenshot)
+                all_passed = False
+            elif new:
+                screenshot = self.take_screenshot(f"fuzz_{i+1}_new", f"Fuzzing {i+1}: nouveau resultat {key}")
+                self.log_test_result(test_name, True, f"Nouveau resultat (cluster {key})", screenshot)
+            if (vulnerabilities or new) and parent is not None:
+                interesting.append({"category": "fuzz", "username": username, "password": password, "fingerprint": key,
+                                    "vulnerabilities": vulnerabilities})
+
+        self.extra_report["fuzz"] = {
+            "iterations": iterations,
+            "seed": seed,
+            "seeds": len(seeds),
+            "clusters": len(self.clusters.clusters),
+            "discoveries": discoveries,
+            "interesting": interesting,
+        }
+        print(f"Fuzzing: {len(self.clusters.clusters)} resultats distincts, {len(interesting)} entree(s) mutee(s) interessante(s)")
+        return all_passed
+
+    def run_corpus(self, category, check):
+        """Executer une verification sur chaque payload d'une categorie, lot par lot"""
+        all_passed = True
+        cases = enumerate(self.corpus.cases(category))
+
+        for chunk_index, chunk in enumerate(chunked(cases, CORPUS_CHUNK_SIZE)):
+            print(f"\nCorpus {category}: lot {chunk_index + 1} ({len(chunk)} payloads)")
+            for i, case in chunk:
+                if not check(i, case["username"], case["password"]):
+                    all_passed = False
+
+        return all_passed
+
+    def all_cases(self):
+        """Enumerer les cas de test unitaires (payloads inclus) dans l'ordre d'execution"""
+        yield ("valid_login", "test_valid_login", ())
+        yield ("basic_injection", "test_basic_injection", ())
+        if not self.http_fast_path:
+            for i, case in enumerate(self.corpus.cases("sql")):
+                yield (f"sql_var_{i+1}", "check_sql_payload", (i, case["username"], case["password"]))
+        for i, case in enumerate(self.corpus.cases("xss")):
+            yield (f"xss_{i+1}", "check_xss_payload", (i, case["username"], case["password"]))
+        if not self.http_fast_path:
+            for i, case in enumerate(self.corpus.cases("bypass")):
+                yield (f"bypass_{i+1}", "check_bypass_attempt", (i, case["username"], case["password"]))
+        if self.patient_forms:
+            for category in ("xss", "sql"):
+                for i, case in enumerate(self.corpus.cases(category)):
+                    yield (f"form_{category}_{i+1}", "check_patient_form_payload", (i, category, case["username"]))
+
+    def iter_cases(self):
+        """Cas de test du shard courant (tous les cas sans --shard)"""
+        if not self.shard:
+            return self.all_cases()
+        return shard_cases(self.all_cases(), *self.shard, positions=self.case_positions)
+
+    def case_cache_key(self, method, args):
+        """Cle de cache d'un cas (None sans cache ou si le build servi est illisible)"""
+        if self.result_cache is None:
+            return None
+        if self.build_key is None:
+            # Les cas SQL et contournement testent le backend: sans son identite un verdict en cache serait rejoue a tort
+            api_url = self.api_url or resolve_api_url(self.app_url)
+            backend = backend_identity(api_url)
+            if backend is None:
+                self.disable_cache(
+                    f"version du backend inconnue ({api_url}): definir BACKEND_VERSION "
+                    f"ou exposer /version ou /actuator/info"
+                )
+                return None
+            try:
+                self.build_key, assets = bundle_hash(self.app_url, backend)
+                print(f"Build servi: {self.build_key} ({assets} scripts, backend {backend})")
+            except Exception as e:
+                self.disable_cache(f"build servi illisible ({str(e)})")
+                return None
+        if method not in self.logic_hashes:
+            self.logic_hashes[method] = logic_hash(type(self), method, DETECTION_HELPERS)
+        return ResultCache.key(self.build_key, self.logic_hashes[method], case_key(method, args))
+
+    def disable_cache(self, reason):
+        """Executer tous les cas: le cache ne peut pas garantir que le build et le backend n'ont pas change"""
+        print("!" * 60)
+        print(f"ATTENTION: Cache de resultats desactive: {reason}")
+        print("ATTENTION: Tous les cas sont executes")
+        print("!" * 60)
+        self.cache_disabled = reason
+        self.result_cache = None
+
+    def replay_cached(self, case_id, cached):
+        """Reporter les verdicts en cache d'un cas inchange sans l'executer"""
+        first = len(self.test_results)
+        for result in cached:
+            self.record_result(dict(
+                result,
+                screenshot=None,
+                cached=True,
+                case=case_id,
+                timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            ))
+            print(f"SUCCES PASSE (cache) - {result['test']}")
+        return self.test_results[first:]
+
+    def run_case(self, case):
+        """Executer un cas et retourner les resultats qu'il a enregistres"""
+        case_id, method, args = case
+        key = self.case_cache_key(method, args)
+        if key and not self.force:
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                return self.replay_cached(case_id, cached)
+
+        first = len(self.test_results)
+        first_wait = len(self.waits.records) if self.waits else 0
+        self.current_case = case_id
+        try:
+            getattr(self, method)(*args)
+        except Exception as e:
+            error_screenshot = self.take_screenshot(f"{case_id}_error", f"Erreur cas {case_id}: {str(e)}")
+            self.log_test_result(f"Cas {case_id}", False, f"Erreur: {str(e)}", error_screenshot)
+        finally:
+            self.current_case = None
+        results = self.test_results[first:]
+        for result in results:
+            result["case"] = case_id
+        # Seuls les verdicts reussis sont gardes: un echec est re-execute (et capture) a chaque build,
+        # de meme qu'un cas dont une attente a depasse son budget ou a ete coupee
+        waits = self.waits.records[first_wait:] if self.waits else []
+        settled = all(record["satisfied"] and not record.get("short_circuit") for record in waits)
+        if key and results and settled and all(result["passed"] for result in results):
+            self.result_cache.put(key, [
+                {"test": result["test"], "passed": result["passed"], "details": result["details"]}
+                for result in results
+            ])
+        return results
+
+    def run_cases(self):
+        """Executer les cas (du shard courant) un par un, en reprenant les verdicts en cache"""
+        for case in self.iter_cases():
+            self.run_case(case)
+        if self.http_fast_path:
+            self.test_http_fast_path()
 
     def run_tests(self):
         """Executer les tests principaux"""
@@ -552,22 +1313,34 @@ class AuthSecurityTests:
         print("TESTS DE SECURITE - AUTHENTIFICATION")
         print("="*60)
 
-        # Capture d'ecran initiale
+        # Capture d'ecran initiale (une session du broker a deja l'application chargee)
         try:
-            self.driver.get(self.app_url)
-            time.sleep(2)
+            if self.broker_client is None:
+                self.driver.get(self.app_url)
+            self.waits.wait_for_page_ready("page_prete")
             self.take_screenshot("test_start", "Debut des tests de securite")
         except:
             pass
 
-        # Test de connexion valide d'abord
-        self.test_valid_login()
-
-        # Tests de securite
-        self.test_basic_injection()
-        self.test_sql_injection_variations()
-        self.test_xss_basic()
-        self.test_authentication_bypass()
+        if self.result_cache is not None:
+            # Cas par cas pour ne pas re-executer ceux dont le verdict est en cache
+            self.run_cases()
+        else:
+            # Test de connexion valide d'abord
+            self.test_valid_login()
+
+            # Tests de securite
+            self.test_basic_injection()
+            if self.http_fast_path:
+                # Le navigateur reste reserve aux verifications qui dependent du DOM
+                self.test_xss_basic()
+                self.test_http_fast_path()
+            else:
+                self.test_sql_injection_variations()
+                self.test_xss_basic()
+                self.test_authentication_bypass()
+            if self.patient_forms:
+                self.test_patient_forms()
 
         # Capture d'ecran finale
         try:
@@ -582,26 +1355,350 @@ class AuthSecurityTests:
         failed = sum(1 for t in self.test_results if not t['passed'])
         return failed == 0
 
+    def run_shard(self):
+        """Executer les cas du shard courant, un par un, dans cette session"""
+        index, count = self.shard
+        print("="*60)
+        print(f"TESTS DE SECURITE - SHARD {index}/{count}")
+        print("="*60)
+
+        self.run_cases()
+
+        self.generate_simple_report()
+
+        failed = sum(1 for t in self.test_results if not t['passed'])
+        return failed == 0
+
     def cleanup(self):
         """Nettoyer les ressources"""
         if self.driver:
             try:
                 # Capture finale avant fermeture
                 self.take_screenshot("cleanup", "Avant fermeture du driver")
-                self.driver.quit()
+                if self.broker_client:
+                    # Rendre la session au broker (reinitialisee de son cote) au lieu de la fermer
+                    self.broker_client.close()
+                else:
+                    self.driver.quit()
             except:
                 pass
+        self.driver_factory.close()
+        if self.screenshot_writer:
+            self.screenshot_writer.close()
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Tests de securite de l'authentification")
+    parser.add_argument("app_url", nargs="?", default="http://localhost:4201")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("SECURITY_WORKERS", "1")),
+        help="Nombre de sessions Selenium Grid en parallele (mode pool si > 1)"
+    )
+    parser.add_argument(
+        "--contexts",
+        type=int,
+        default=int(os.environ.get("SECURITY_CONTEXTS", "1")),
+        help="Nombre de contextes isoles (onglets) entrelaces dans un seul navigateur (mode contextes si > 1)"
+    )
+    parser.add_argument(
+        "--fast-reset",
+        action="store_true",
+        default=os.environ.get("FAST_RESET") == "1",
+        help="Reinitialiser l'etat dans la page entre les payloads au lieu de recharger"
+    )
+    parser.add_argument(
+        "--capture-policy",
+        choices=CapturePolicy.POLICIES,
+        default=os.environ.get("CAPTURE_POLICY", "always"),
+        help="always: toutes les captures, on-failure: tampon circulaire ecrit sur echec, sampled: une sur N plus les echecs"
+    )
+    parser.add_argument(
+        "--corpus-dir",
+        default=os.environ.get("CORPUS_DIR", CORPUS_DIR),
+        help="Repertoire des fichiers de payloads (<categorie>*.jsonl / <categorie>*.csv)"
+    )
+    parser.add_argument(
+        "--tags",
+        default=os.environ.get("CORPUS_TAGS", ""),
+        help="Ne garder que les payloads portant au moins un de ces tags (separes par des virgules)"
+    )
+    parser.add_argument(
+        "--http-fast-path",
+        action="store_true",
+        default=os.environ.get("HTTP_FAST_PATH") == "1",
+        help="Envoyer les injections SQL et contournements directement a /auth/signin"
+    )
+    parser.add_argument(
+        "--api-url",
+        default=os.environ.get("API_URL"),
+        help="URL de l'API (par defaut: apiUrl de assets/config.json)"
+    )
+    parser.add_argument(
+        "--http-concurrency",
+        type=int,
+        default=int(os.environ.get("HTTP_CONCURRENCY", "8")),
+        help="Nombre de connexions HTTP simultanees en mode rapide"
+    )
+    parser.add_argument(
+        "--shard",
+        default=os.environ.get("SECURITY_SHARD", ""),
+        help="Executer seulement le shard i/n des cas (repartition stable entre agents, fusion avec shards.py)"
+    )
+    parser.add_argument(
+        "--driver",
+        choices=DRIVER_BACKENDS,
+        default=os.environ.get("SECURITY_DRIVER", "remote"),
+        help="remote: grille Selenium, local: Chrome headless via chromedriver, cdp: navigateur expose en DevTools"
+    )
+    parser.add_argument("--grid-url", default=os.environ.get("GRID_URL", GRID_URL), help="URL de la grille Selenium (backend remote)")
+    parser.add_argument("--chromedriver", default=os.environ.get("CHROMEDRIVER"), help="Chemin de chromedriver (backends local et cdp)")
+    parser.add_argument(
+        "--cdp-address",
+        default=os.environ.get("CDP_ADDRESS"),
+        help="host:port DevTools du navigateur (backend cdp, lance en headless s'il n'ecoute pas)"
+    )
+    parser.add_argument(
+        "--network-log",
+        action="store_true",
+        default=os.environ.get("NETWORK_LOG") == "1",
+        help="Journal reseau du navigateur par test: doublons, /auth/signin lent, cascade du chargement"
+    )
+    parser.add_argument(
+        "--broker",
+        default=os.environ.get("SESSION_BROKER"),
+        help="Adresse host:port du broker de sessions chaudes (python3 tests/session_broker.py APP_URL)"
+    )
+    parser.add_argument(
+        "--patient-forms",
+        action="store_true",
+        default=os.environ.get("PATIENT_FORMS") == "1",
+        help="Injecter aussi les payloads XSS et SQL dans les formulaires patient-add et patient-update"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        default=os.environ.get("SECURITY_FORCE") == "1",
+        help="Re-executer tous les cas meme si leur verdict est en cache (le cache est mis a jour)"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        default=os.environ.get("RESULT_CACHE") == "1",
+        help="Reprendre les verdicts du cache de resultats (fixer BACKEND_VERSION: sans build identifie le cache se desactive)"
+    )
+    parser.add_argument(
+        "--cache-file",
+        default=os.environ.get("RESULT_CACHE_FILE", CACHE_FILE),
+        help="Fichier du cache de resultats (cle: build servi + logique de detection + payload)"
+    )
+    parser.add_argument(
+        "--cluster",
+        action="store_true",
+        default=os.environ.get("CLUSTER_OUTCOMES") == "1",
+        help="Regrouper les injections SQL et contournements par resultat: une capture par resultat distinct"
+    )
+    parser.add_argument(
+        "--fuzz",
+        type=int,
+        default=int(os.environ.get("FUZZ_ITERATIONS", "0")),
+        help="Mode fuzzing: nombre d'essais de mutations du login guides par les empreintes de resultat"
+    )
+    parser.add_argument("--fuzz-seed", type=int, default=int(os.environ.get("FUZZ_SEED", "1")), help="Graine aleatoire du fuzzing")
+    parser.add_argument(
+        "--stub-backend",
+        action="store_true",
+        default=os.environ.get("STUB_BACKEND") == "1",
+        help="Demarrer le backend de substitution asyncio dans le processus et l'utiliser comme API"
+    )
+    parser.add_argument(
+        "--stub-port",
+        type=int,
+        default=int(os.environ.get("STUB_PORT", "0")),
+        help="Port du backend de substitution (0: port libre)"
+    )
+    parser.add_argument(
+        "--stub-host",
+        default=os.environ.get("STUB_HOST"),
+        help="Adresse annoncee pour le backend de substitution (par defaut: IP de la machine)"
+    )
+    parser.add_argument(
+        "--stub-latency-ms",
+        type=float,
+        default=float(os.environ.get("STUB_LATENCY_MS", "0")),
+        help="Latence ajoutee a chaque reponse du backend de substitution"
+    )
+    parser.add_argument(
+        "--stub-error-rate",
+        type=float,
+        default=float(os.environ.get("STUB_ERROR_RATE", "0")),
+        help="Proportion de reponses 500 injectees par le backend de substitution"
+    )
+    parser.add_argument(
+        "--stub-patients",
+        type=int,
+        default=int(os.environ.get("STUB_PATIENTS", "20")),
+        help="Nombre de patients synthetiques servis par le backend de substitution"
+    )
+    parser.add_argument(
+        "--load",
+        action="store_true",
+        help="Mode charge: CRUD patients a debit cible, sans navigateur"
+    )
+    parser.add_argument("--load-rate", type=float, default=float(os.environ.get("LOAD_RATE", "20")), help="Requetes par seconde visees")
+    parser.add_argument("--load-duration", type=float, default=float(os.environ.get("LOAD_DURATION", "30")), help="Duree de la charge (secondes)")
+    parser.add_argument("--load-concurrency", type=int, default=int(os.environ.get("LOAD_CONCURRENCY", "16")), help="Requetes simultanees maximum")
+    parser.add_argument(
+        "--load-mix",
+        default=os.environ.get("LOAD_MIX", ""),
+        help="Melange des operations, ex: fetchPatients=50,getPatient=20,addPatient=10,updatePatient=10,deletePatient=10"
+    )
+    parser.add_argument(
+        "--load-max-error-rate",
+        type=float,
+        default=float(os.environ.get("LOAD_MAX_ERROR_RATE", "0.01")),
+        help="Taux d'erreur maximum accepte par operation"
+    )
+    parser.add_argument(
+        "--render-probe",
+        action="store_true",
+        help="Mode rendu: mesurer l'affichage de /patients pour des volumes croissants de patients"
+    )
+    parser.add_argument(
+        "--render-sizes",
+        default=os.environ.get("RENDER_SIZES", "100,1k,10k,50k"),
+        help="Nombres de patients a injecter, ex: 100,1k,10k,50k"
+    )
+    parser.add_argument(
+        "--render-max-ms",
+        type=float,
+        default=float(os.environ["RENDER_MAX_MS"]) if os.environ.get("RENDER_MAX_MS") else None,
+        help="Temps de rendu maximum accepte (ms depuis le debut de la navigation)"
+    )
+    return parser.parse_args(argv)
 
 # Point d'entree principal
 if __name__ == "__main__":
-    app_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:4201"
+    args = parse_args(sys.argv[1:])
+    app_url = args.app_url
+    options = {
+        "fast_reset": args.fast_reset,
+        "capture_policy": args.capture_policy,
+        "corpus_dir": args.corpus_dir,
+        "corpus_tags": [t.strip() for t in args.tags.split(",") if t.strip()],
+        "http_fast_path": args.http_fast_path,
+        "api_url": args.api_url,
+        "http_concurrency": args.http_concurrency,
+        "patient_forms": args.patient_forms,
+        "shard": parse_shard(args.shard),
+        "broker": args.broker,
+        "cluster_outcomes": args.cluster,
+        "result_cache": args.cache_file if args.cache else None,
+        "force": args.force,
+        "driver_backend": args.driver,
+        "grid_url": args.grid_url,
+        "chromedriver": args.chromedriver,
+        "cdp_address": args.cdp_address,
+        "network_log": args.network_log,
+    }
 
     print(f"Demarrage des tests de securite sur: {app_url}")
 
-    tests = AuthSecurityTests(app_url)
+    stub = None
+    if args.stub_backend:
+        from stub_backend import StubBackend
+
+        stub = StubBackend(
+            port=args.stub_port,
+            latency_ms=args.stub_latency_ms,
+            error_rate=args.stub_error_rate,
+            patients=args.stub_patients
+        )
+        stub.start()
+        options["api_url"] = stub.api_url(args.stub_host or socket.gethostbyname(socket.gethostname()))
+        print(f"API de substitution: {options['api_url']} (--render: config.json redirige par DevTools, sinon assets/config.json doit pointer dessus)")
+
+    if args.load:
+        tests = AuthSecurityTests(app_url, start_driver=False, **options)
+        try:
+            tests.test_patient_load(
+                rate=args.load_rate,
+                duration=args.load_duration,
+                concurrency=args.load_concurrency,
+                mix=parse_mix(args.load_mix),
+                max_error_rate=args.load_max_error_rate
+            )
+            tests.generate_simple_report()
+        finally:
+            tests.cleanup()
+            if stub:
+                stub.stop()
+        exit(0)  # Exit 0 pour ne pas bloquer Jenkins
+
+    if args.render_probe:
+        tests = AuthSecurityTests(app_url, **options)
+        try:
+            tests.test_render_scaling(parse_sizes(args.render_sizes), stub=stub, max_render_ms=args.render_max_ms)
+            tests.generate_simple_report()
+        finally:
+            tests.cleanup()
+            if stub:
+                stub.stop()
+        exit(0)  # Exit 0 pour ne pas bloquer Jenkins
+
+    if args.fuzz:
+        tests = AuthSecurityTests(app_url, **options)
+        try:
+            tests.test_fuzz_login(iterations=args.fuzz, seed=args.fuzz_seed)
+            tests.generate_simple_report()
+        finally:
+            tests.cleanup()
+            if stub:
+                stub.stop()
+        exit(0)  # Exit 0 pour ne pas bloquer Jenkins
+
+    if args.contexts > 1:
+        from contexts import ContextPool
+
+        if args.workers > 1:
+            print(f"ATTENTION: --workers {args.workers} ignore en mode contextes (un seul navigateur)")
+        pool = ContextPool(app_url, args.contexts, AuthSecurityTests, **options)
+        try:
+            success = pool.run()
+        except Exception as e:
+            print(f"\nERREUR: Erreur fatale: {str(e)}")
+            exit(1)
+        finally:
+            if stub:
+                stub.stop()
+        if success:
+            print("\nSUCCES: Tests de securite termines avec succes!")
+        else:
+            print("\nATTENTION: Certains tests ont echoue!")
+        exit(0)  # Exit 0 pour ne pas bloquer Jenkins
+
+    if args.workers > 1:
+        from pool import SessionPool
+
+        pool = SessionPool(app_url, args.workers, AuthSecurityTests, **options)
+        try:
+            success = pool.run()
+        except Exception as e:
+            print(f"\nERREUR: Erreur fatale: {str(e)}")
+            exit(1)
+        finally:
+            if stub:
+                stub.stop()
+        if success:
+            print("\nSUCCES: Tests de securite termines avec succes!")
+        else:
+            print("\nATTENTION: Certains tests ont echoue!")
+        exit(0)  # Exit 0 pour ne pas bloquer Jenkins
+
+    tests = AuthSecurityTests(app_url, **options)
 
     try:
-        success = tests.run_tests()
+        success = tests.run_shard() if tests.shard else tests.run_tests()
         if success:
             print("\nSUCCES: Tests de securite termines avec succes!")
             exit(0)
@@ -610,10 +1707,15 @@ if __name__ == "__main__":
             exit(0)  # Exit 0 pour ne pas bloquer Jenkins
     except Exception as e:
         print(f"\nERREUR: Erreur fatale: {str(e)}")
+        if tests.result_stream.count:
+            print(f"Resultats partiels: {tests.result_stream.path} (python3 tests/results_stream.py {tests.result_stream.path})")
         try:
             tests.take_screenshot("fatal_error", f"Erreur fatale: {str(e)}")
+            tests.captures.flush("erreur fatale")
         except:
             pass
         exit(1)
     finally:
         tests.cleanup()
+        if stub:
+            stub.stop()
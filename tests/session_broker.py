@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from drivers import GRID_URL, chrome_options
+
+DEFAULT_BROKER = "127.0.0.1:4455"
+
+# Etat de la page d'une session au repos: application chargee et rendue
+READY_JS = """
+var root = document.querySelector('app-root');
+return document.readyState === 'complete' && !!root && root.children.length > 0;
+"""
+
+# Remise a zero avant reutilisation: stockage vide (les cookies sont supprimes via WebDriver)
+CLEAR_STORAGE_JS = "localStorage.clear(); sessionStorage.clear();"
+
+
+class AttachedRemote(webdriver.Remote):
+    """Driver Remote rattache a une session existante de la grille, sans en creer une nouvelle"""
+
+    def __init__(self, command_executor, session_id, capabilities):
+        self.attached_session = (session_id, capabilities)
+        super().__init__(command_executor=command_executor, options=chrome_options())
+
+    def start_session(self, capabilities, *args, **kwargs):
+        self.session_id, self.caps = self.attached_session
+
+
+class WarmSession:
+    """Session de la grille gardee ouverte par le broker"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.leased = False
+        self.created = time.monotonic()
+        self.reuses = 0
+
+    @property
+    def session_id(self):
+        return self.driver.session_id
+
+
+class SessionBroker:
+    """Garder des sessions navigateur chaudes (application chargee) et les preter par socket local"""
+
+    def __init__(self, app_url, size=1, grid_url=GRID_URL, ready_timeout=30, keepalive=60):
+        self.app_url = app_url
+        self.size = size
+        self.grid_url = grid_url
+        self.ready_timeout = ready_timeout
+        self.keepalive = keepalive
+        self.sessions = []
+        self.lock = threading.Lock()
+        self.available = threading.Condition(self.lock)
+        self.stopping = threading.Event()
+        self.server = None
+
+    def open_session(self):
+        driver = webdriver.Remote(command_executor=self.grid_url, options=chrome_options())
+        session = WarmSession(driver)
+        self.reset(session)
+        print(f"SUCCES: Session chaude ouverte: {session.session_id}")
+        return session
+
+    def wait_ready(self, driver):
+        deadline = time.monotonic() + self.ready_timeout
+        while time.monotonic() < deadline:
+            try:
+                if driver.execute_script(READY_JS):
+                    return True
+            except WebDriverException:
+                pass
+            time.sleep(0.1)
+        return False
+
+    def reset(self, session):
+        """Fermer les onglets en trop, vider cookies et stockage, recharger l'application"""
+        driver = session.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        if driver.current_url.startswith(self.app_url):
+            driver.execute_script(CLEAR_STORAGE_JS)
+        driver.delete_all_cookies()
+        driver.get(self.app_url)
+        if not self.wait_ready(driver):
+            raise WebDriverException(f"Application non prete apres {self.ready_timeout}s")
+
+    def healthy(self, session):
+        """Verifier qu'une session repond encore"""
+        try:
+            return bool(session.driver.execute_script("return document.readyState"))
+        except WebDriverException:
+            return False
+
+    def replace(self, session):
+        """Remplacer une session morte ou impossible a reinitialiser"""
+        try:
+            session.driver.quit()
+        except Exception:
+            pass
+        try:
+            fresh = self.open_session()
+        except Exception as e:
+            print(f"ERREUR: Remplacement impossible, session retiree: {str(e)}")
+            with self.lock:
+                self.sessions.remove(session)
+            return None
+        with self.lock:
+            self.sessions[self.sessions.index(session)] = fresh
+            self.available.notify()
+        return fresh
+
+    def acquire(self, timeout=60):
+        """Preter une session au repos (attendre qu'une se libere si toutes sont pretees)"""
+        with self.available:
+            deadline = time.monotonic() + timeout
+            while True:
+                for session in self.sessions:
+                    if not session.leased:
+                        session.leased = True
+                        return session
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.available.wait(remaining)
+
+    def release(self, session):
+        """Controler et reinitialiser une session rendue avant de la remettre au repos"""
+        try:
+            if not self.healthy(session):
+                raise WebDriverException("session sans reponse")
+            self.reset(session)
+            session.reuses += 1
+            with self.available:
+                session.leased = False
+                self.available.notify()
+        except Exception as e:
+            print(f"ATTENTION: Session {session.session_id} remplacee: {str(e)}")
+            self.replace(session)
+
+    def status(self):
+        with self.lock:
+            return {
+                "app_url": self.app_url,
+                "grid_url": self.grid_url,
+                "sessions": [
+                    {"session_id": s.session_id, "leased": s.leased, "reuses": s.reuses,
+                     "age": round(time.monotonic() - s.created, 1)}
+                    for s in self.sessions
+                ],
+            }
+
+    def keep_alive(self):
+        """Eviter l'expiration des sessions au repos cote grille"""
+        while not self.stopping.wait(self.keepalive):
+            with self.lock:
+                idle = [session for session in self.sessions if not session.leased]
+                for session in idle:
+                    session.leased = True
+            for session in idle:
+                if self.healthy(session):
+                    with self.available:
+                        session.leased = False
+                        self.available.notify()
+                else:
+                    print(f"ATTENTION: Session {session.session_id} perdue, remplacement")
+                    self.replace(session)
+
+    def handle(self, connection):
+        """Protocole ligne JSON: acquire, status, shutdown. Le pret dure tant que la connexion est ouverte"""
+        reader = connection.makefile("r", encoding="utf-8")
+        lease = None
+        try:
+            for line in reader:
+                request = json.loads(line)
+                op = request.get("op")
+                if op == "acquire":
+                    if lease is not None:
+                        reply = {"ok": False, "error": "session deja pretee sur cette connexion"}
+                    else:
+                        lease = self.acquire(request.get("wait", 60))
+                        reply = {"ok": False, "error": "aucune session disponible"} if lease is None else {
+                            "ok": True,
+                            "executor": self.grid_url,
+                            "session_id": lease.session_id,
+                            "capabilities": lease.driver.caps,
+                            "app_url": self.app_url,
+                        }
+                elif op == "status":
+                    reply = dict(self.status(), ok=True)
+                elif op == "shutdown":
+                    reply = {"ok": True}
+                    threading.Thread(target=self.shutdown, daemon=True).start()
+                else:
+                    reply = {"ok": False, "error": f"operation inconnue: {op}"}
+                connection.sendall((json.dumps(reply) + "\n").encode("utf-8"))
+        except (OSError, ValueError):
+            pass
+        finally:
+            if lease is not None:
+                self.release(lease)
+
+    def serve(self, address):
+        host, _, port = address.rpartition(":")
+        broker = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                broker.handle(self.request)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer((host or "127.0.0.1", int(port)), Handler)
+        self.server.daemon_threads = True
+        for _ in range(self.size):
+            self.sessions.append(self.open_session())
+        threading.Thread(target=self.keep_alive, name="broker-keepalive", daemon=True).start()
+        print(f"SUCCES: Broker de sessions pret sur {address} ({self.size} session(s) sur {self.app_url})")
+        self.server.serve_forever()
+
+    def shutdown(self):
+        self.stopping.set()
+        if self.server:
+            self.server.shutdown()
+        for session in self.sessions:
+            try:
+                session.driver.quit()
+            except Exception:
+                pass
+
+
+class BrokerClient:
+    """Emprunter une session chaude; elle est rendue au broker a la fermeture de la connexion"""
+
+    def __init__(self, address=DEFAULT_BROKER, timeout=5):
+        host, _, port = address.rpartition(":")
+        self.connection = socket.create_connection((host or "127.0.0.1", int(port)), timeout=timeout)
+        self.reader = self.connection.makefile("r", encoding="utf-8")
+
+    def request(self, op, timeout=None, **params):
+        self.connection.settimeout(timeout)
+        self.connection.sendall((json.dumps(dict(params, op=op)) + "\n").encode("utf-8"))
+        reply = json.loads(self.reader.readline() or "{}")
+        if not reply.get("ok"):
+            raise RuntimeError(f"Broker: {reply.get('error', 'pas de reponse')}")
+        return reply
+
+    def acquire(self, app_url, wait=60):
+        """Retourner un driver rattache a une session chaude sur app_url"""
+        lease = self.request("acquire", timeout=wait + 30, wait=wait)
+        if not app_url.startswith(lease["app_url"]) and not lease["app_url"].startswith(app_url):
+            self.close()
+            raise RuntimeError(f"Broker sur une autre application: {lease['app_url']}")
+        return AttachedRemote(lease["executor"], lease["session_id"], lease["capabilities"])
+
+    def close(self):
+        try:
+            self.connection.close()
+        except OSError:
+            pass
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Broker de sessions Selenium chaudes pour les tests")
+    parser.add_argument("app_url", nargs="?", default="http://localhost:4201")
+    parser.add_argument("--listen", default=os.environ.get("SESSION_BROKER", DEFAULT_BROKER))
+    parser.add_argument("--sessions", type=int, default=int(os.environ.get("BROKER_SESSIONS", "1")))
+    parser.add_argument("--grid-url", default=os.environ.get("GRID_URL", GRID_URL))
+    parser.add_argument("--keepalive", type=float, default=60, help="Intervalle de controle des sessions au repos (secondes)")
+    parser.add_argument("--status", action="store_true", help="Afficher l'etat d'un broker en cours")
+    parser.add_argument("--stop", action="store_true", help="Arreter un broker en cours")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.status or args.stop:
+        client = BrokerClient(args.listen)
+        print(json.dumps(client.request("shutdown" if args.stop else "status", timeout=30), indent=2))
+        client.close()
+        exit(0)
+
+    broker = SessionBroker(args.app_url, size=args.sessions, grid_url=args.grid_url, keepalive=args.keepalive)
+    try:
+        broker.serve(args.listen)
+    except KeyboardInterrupt:
+        broker.shutdown()
@@ -0,0 +1,280 @@
+import argparse
+import glob
+import hashlib
+import json
+from datetime import datetime
+
+from timing import percentile
+from results_stream import summarize, write_junit
+from network_log import network_summary
+
+
+def parse_shard(text):
+    """Lire '--shard i/n' (i de 1 a n)"""
+    if not text:
+        return None
+    index, _, count = text.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Shard invalide: {text} (attendu i/n)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard invalide: {text} (attendu 1 <= i <= n)")
+    return index, count
+
+
+def shard_of(key, count):
+    """Shard (1..n) d'une cle: empreinte stable, independante de l'ordre et du processus"""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+
+def case_key(method, args):
+    """Cle d'un cas: la methode et ses payloads, pas sa position dans le corpus"""
+    # L'indice i du payload est retire pour qu'un ajout au corpus ne deplace pas les autres cas
+    payload = [arg for arg in args if not isinstance(arg, int)]
+    return json.dumps([method, payload], ensure_ascii=False)
+
+
+def shard_cases(cases, index, count, positions=None):
+    """Garder les cas du shard courant et memoriser leur position globale"""
+    for position, case in enumerate(cases):
+        case_id, method, args = case
+        if shard_of(case_key(method, args), count) != index:
+            continue
+        if positions is not None:
+            positions[case_id] = position
+        yield case
+
+
+def in_shard(corpus_case, index, count):
+    """Appartenance d'un cas du corpus (mode HTTP rapide) au shard courant"""
+    key = json.dumps([corpus_case["category"], corpus_case["username"], corpus_case["password"]], ensure_ascii=False)
+    return shard_of(key, count) == index
+
+
+# --- Fusion des rapports ---
+
+def merge_steps(reports):
+    """Temps d'attente par etape: sommes et maximum"""
+    steps = {}
+    for report in reports:
+        for step, stats in report.get("waits", {}).get("steps", {}).items():
+            entry = steps.setdefault(step, {"count": 0, "total": 0.0, "max": 0.0, "timeouts": 0, "short_circuits": 0})
+            entry["count"] += stats["count"]
+            entry["total"] = round(entry["total"] + stats["total"], 3)
+            entry["max"] = max(entry["max"], stats["max"])
+            entry["timeouts"] += stats["timeouts"]
+            entry["short_circuits"] += stats.get("short_circuits", 0)
+    return steps
+
+
+def load_trace(path):
+    try:
+        with open(path) as f:
+            return json.load(f).get("traceEvents", [])
+    except (OSError, ValueError):
+        return None
+
+
+def merge_phases(reports, traces):
+    """p50/p95/max par phase, recalcules depuis les traces quand elles sont toutes disponibles"""
+    if traces and all(events is not None for events in traces):
+        durations = {}
+        for events in traces:
+            for event in events:
+                # Duree propre de la phase, comme dans generate_simple_report
+                exclusive = event.get("args", {}).get("exclusive", event["dur"])
+                durations.setdefault(event["name"], []).append(exclusive / 1_000_000)
+        return {
+            phase: {
+                "count": len(values),
+                "total": round(sum(values), 3),
+                "p50": round(percentile(values, 0.50), 3),
+                "p95": round(percentile(values, 0.95), 3),
+                "max": round(max(values), 3),
+            }
+            for phase, values in sorted(durations.items())
+        }
+
+    # Sans les traces: percentiles approches par moyenne ponderee des shards
+    phases = {}
+    for report in reports:
+        for phase, stats in report.get("timings", {}).get("phases", {}).items():
+            phases.setdefault(phase, []).append(stats)
+    merged = {}
+    for phase, parts in sorted(phases.items()):
+        count = sum(part["count"] for part in parts)
+        merged[phase] = {
+            "count": count,
+            "total": round(sum(part["total"] for part in parts), 3),
+            "p50": round(sum(part["p50"] * part["count"] for part in parts) / count, 3) if count else 0.0,
+            "p95": round(sum(part["p95"] * part["count"] for part in parts) / count, 3) if count else 0.0,
+            "max": max(part["max"] for part in parts),
+            "approximate": True,
+        }
+    return merged
+
+
+def merge_commands(reports, top=15):
+    """Commandes WebDriver: totaux par commande et par test"""
+    commands = {}
+    by_test = {}
+    total_calls = 0
+    total_time = 0.0
+    for report in reports:
+        summary = report.get("webdriver_commands", {})
+        total_calls += summary.get("total_calls", 0)
+        total_time += summary.get("total_time", 0.0)
+        for row in summary.get("top_commands", []):
+            entry = commands.setdefault(row["command"], {"command": row["command"], "calls": 0, "time": 0.0, "sent": 0, "received": 0})
+            for key in ("calls", "time", "sent", "received"):
+                entry[key] += row[key]
+        for test, stats in summary.get("by_test", {}).items():
+            entry = by_test.setdefault(test, {"calls": 0, "time": 0.0})
+            entry["calls"] += stats["calls"]
+            entry["time"] = round(entry["time"] + stats["time"], 3)
+    rows = sorted(commands.values(), key=lambda entry: entry["time"], reverse=True)[:top]
+    for entry in rows:
+        entry["time"] = round(entry["time"], 3)
+        entry["avg_ms"] = round(entry["time"] / entry["calls"] * 1000, 1) if entry["calls"] else 0.0
+    return {"total_calls": total_calls, "total_time": round(total_time, 3), "top_commands": rows, "by_test": by_test}
+
+
+def merge_results(reports):
+    """Resultats dans l'ordre global des cas, puis ceux hors cas (mode HTTP rapide...) par shard"""
+    ordered = []
+    trailing = []
+    for shard_order, report in enumerate(reports):
+        positions = report.get("shard", {}).get("positions", {})
+        for order, result in enumerate(report.get("results", [])):
+            position = positions.get(result.get("case"))
+            if position is None:
+                trailing.append(result)
+            else:
+                ordered.append(((position, shard_order, order), result))
+    return [result for _, result in sorted(ordered, key=lambda item: item[0])] + trailing
+
+
+def merge_clusters(reports):
+    """Resultats distincts: clusters de meme empreinte additionnes, premier representant garde"""
+    clusters = {}
+    for report in reports:
+        for cluster in report.get("clusters", []):
+            entry = clusters.get(cluster["fingerprint"])
+            if entry is None:
+                clusters[cluster["fingerprint"]] = dict(cluster, examples=list(cluster["examples"]))
+                continue
+            entry["count"] += cluster["count"]
+            entry["examples"].extend(cluster["examples"][:max(0, 5 - len(entry["examples"]))])
+    return sorted(clusters.values(), key=lambda cluster: cluster["count"], reverse=True)
+
+
+def merge_reports(reports, paths=None, trace_file=None):
+    """Combiner des rapports de shards au format de generate_simple_report"""
+    paths = paths or [None] * len(reports)
+    results = merge_results(reports)
+
+    traces = [load_trace(report.get("timings", {}).get("trace_file", "")) for report in reports]
+    if trace_file and all(events is not None for events in traces):
+        events = []
+        for report, shard_events in zip(reports, traces):
+            pid = report.get("shard", {}).get("index", 1)
+            events.extend(dict(event, pid=pid) for event in shard_events)
+        with open(trace_file, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    else:
+        trace_file = None
+
+    captured = {
+        "policy": sorted({report.get("screenshots", {}).get("policy") for report in reports} - {None}),
+        "captured": sum(report.get("screenshots", {}).get("captured", 0) for report in reports),
+        "written": sorted(name for report in reports for name in report.get("screenshots", {}).get("written", [])),
+        "dropped": sorted(name for report in reports for name in report.get("screenshots", {}).get("dropped", [])),
+    }
+    captured["policy"] = captured["policy"][0] if len(captured["policy"]) == 1 else ",".join(captured["policy"])
+
+    merged = {
+        "date": datetime.now().isoformat(),
+        "url": reports[0].get("url") if reports else None,
+        "screenshots_count": sum(report.get("screenshots_count", 0) for report in reports),
+        "screenshots_dir": reports[0].get("screenshots_dir", "screenshots") if reports else "screenshots",
+        "screenshots": captured,
+        "summary": summarize(results),
+        "results": results,
+        "timings": {
+            "phases": merge_phases(reports, traces),
+            "trace_file": trace_file
+        },
+        "webdriver_commands": merge_commands(reports),
+        "waits": {
+            "steps": merge_steps(reports),
+            "budgets": reports[0].get("waits", {}).get("budgets", {}) if reports else {},
+            "records": [record for report in reports for record in report.get("waits", {}).get("records", [])]
+        },
+        "shards": [
+            {
+                "index": report.get("shard", {}).get("index"),
+                "count": report.get("shard", {}).get("count"),
+                "file": path,
+                "date": report.get("date"),
+                "summary": report.get("summary"),
+            }
+            for report, path in zip(reports, paths)
+        ],
+    }
+
+    if any("clusters" in report for report in reports):
+        merged["clusters"] = merge_clusters(reports)
+
+    if any("network" in report for report in reports):
+        # Percentiles recalcules sur l'ensemble des requetes, pas moyennes des shards
+        merged["network"] = network_summary(merged["results"])
+
+    # Sections des modes complementaires: copiees telles quelles, ou listees par shard si plusieurs
+    known = set(merged) | {"shard"}
+    for key in sorted({key for report in reports for key in report} - known):
+        sections = [report[key] for report in reports if key in report]
+        merged[key] = sections[0] if len(sections) == 1 else sections
+    return merged
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fusionner les rapports de securite des shards")
+    parser.add_argument("reports", nargs="*", help="Rapports a fusionner (par defaut: security_report_*_shard*.json)")
+    parser.add_argument("--output", help="Rapport fusionne (par defaut: security_report_<date>.json)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    paths = args.reports or sorted(glob.glob("security_report_*_shard*.json"))
+    if not paths:
+        print("ERREUR: Aucun rapport de shard a fusionner")
+        exit(1)
+
+    reports = []
+    for path in paths:
+        with open(path) as f:
+            reports.append(json.load(f))
+    reports.sort(key=lambda report: report.get("shard", {}).get("index", 0))
+
+    counts = {report.get("shard", {}).get("count") for report in reports}
+    indexes = [report.get("shard", {}).get("index") for report in reports]
+    if len(counts) == 1 and None not in counts:
+        missing = sorted(set(range(1, counts.pop() + 1)) - set(indexes))
+        if missing:
+            print(f"ATTENTION: Shard(s) manquant(s): {', '.join(str(index) for index in missing)}")
+
+    run_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    merged = merge_reports(reports, paths, trace_file=f"security_trace_{run_stamp}.json")
+    output = args.output or f"security_report_{run_stamp}.json"
+    with open(output, "w") as f:
+        json.dump(merged, f, indent=2)
+    junit = write_junit(merged["results"], f"security_junit_{run_stamp}.xml")
+
+    summary = merged["summary"]
+    print(f"SUCCES: {len(reports)} rapport(s) fusionne(s) dans {output} (JUnit: {junit})")
+    print(f"Resultats: {summary['passed']} reussis, {summary['failed']} echoues, {summary['skipped']} non concluants sur {summary['total']} tests")
+    if merged["timings"]["trace_file"]:
+        print(f"Trace des phases: {merged['timings']['trace_file']}")
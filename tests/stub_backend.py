@@ -0,0 +1,287 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+import secrets
+import threading
+import time
+import uuid
+
+NOMS = ["Diop", "Ndiaye", "Fall", "Sow", "Ba", "Martin", "Bernard", "Dubois", "Thomas", "Robert"]
+PRENOMS = ["Awa", "Moussa", "Fatou", "Ibrahima", "Marie", "Jean", "Aminata", "Paul", "Khady", "Louis"]
+CONTACT_TYPES = ["EMAIL", "MOBILE", "FIXE"]
+
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 401: "Unauthorized",
+           404: "Not Found", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+def api_response(data=None, message="", success=True, errors=None, error_code=0):
+    """Enveloppe IApiResponse utilisee par le front (models/api-response.ts)"""
+    return {
+        "success": "true" if success else "false",
+        "message": message,
+        "data": data,
+        "errors": errors,
+        "errorCode": error_code,
+        "timestamp": int(time.time() * 1000),
+    }
+
+
+def generate_patient(rng, index):
+    """Patient synthetique au format IPatientWithContactResponse"""
+    nom = rng.choice(NOMS)
+    prenom = rng.choice(PRENOMS)
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "nom": nom,
+        "prenom": prenom,
+        "sexe": rng.choice(["HOMME", "FEMME"]),
+        "dateNaissance": f"{rng.randint(1940, 2020)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "taille": rng.randint(50, 200),
+        "poids": rng.randint(3, 120),
+        "contacts": [{
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "type": rng.choice(CONTACT_TYPES),
+            "contact": f"{prenom.lower()}.{nom.lower()}{index}@exemple.sn",
+        }],
+    }
+
+
+def summary(patient):
+    """Vue liste IPatientResponse"""
+    return {key: patient[key] for key in ("id", "nom", "prenom", "sexe", "dateNaissance")}
+
+
+class StubBackend:
+    """Backend de substitution asyncio: /api/auth/signin et /api/v1/patients"""
+
+    def __init__(self, host="0.0.0.0", port=0, latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 error_paths=None, patients=0, seed=1, users=None):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_paths = list(error_paths or [])
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.users = dict(users or {"admin": "password123"})
+        self.tokens = set()
+        self.patients = {}
+        self.stats = {}
+        self.seed_patients(patients)
+        self.server = None
+        self.loop = None
+        self.task = None
+        self.thread = None
+        self.ready = threading.Event()
+
+    def seed_patients(self, count):
+        """Remplacer les patients par un jeu synthetique deterministe"""
+        rng = random.Random(self.seed)
+        self.patients = {}
+        for index in range(count):
+            patient = generate_patient(rng, index)
+            self.patients[patient["id"]] = patient
+
+    # --- Routage ---
+
+    def route(self, method, path, headers, body):
+        if method == "GET" and path in ("/api/health", "/api/health/"):
+            return 200, {"status": "UP"}
+
+        if method == "POST" and path == "/api/auth/signin":
+            username = body.get("username") if isinstance(body, dict) else None
+            password = body.get("password") if isinstance(body, dict) else None
+            if username in self.users and self.users[username] == password:
+                token = secrets.token_hex(16)
+                self.tokens.add(token)
+                return 200, {"token": token, "username": username}
+            return 401, api_response(message="Identifiants invalides", success=False,
+                                     errors=["Bad credentials"], error_code=401)
+
+        if path.startswith("/api/v1/patients"):
+            auth = headers.get("authorization", "")
+            if not auth.startswith("Bearer ") or auth[7:] not in self.tokens:
+                return 401, api_response(message="Non authentifie", success=False,
+                                         errors=["Unauthorized"], error_code=401)
+            return self.route_patients(method, path, body)
+
+        return 404, api_response(message="Ressource introuvable", success=False, error_code=404)
+
+    def route_patients(self, method, path, body):
+        match = re.fullmatch(r"/api/v1/patients/?([^/]*)", path)
+        if not match:
+            return 404, api_response(message="Ressource introuvable", success=False, error_code=404)
+        patient_id = match.group(1)
+
+        if not patient_id:
+            if method == "GET":
+                return 200, api_response([summary(p) for p in self.patients.values()], "Liste des patients")
+            if method == "POST":
+                patient = self.build_patient(str(uuid.uuid4()), body)
+                self.patients[patient["id"]] = patient
+                return 201, api_response(patient, "Patient cree")
+            return 400, api_response(message="Methode non supportee", success=False, error_code=400)
+
+        if patient_id not in self.patients:
+            return 404, api_response(message="Patient introuvable", success=False, error_code=404)
+        if method == "GET":
+            return 200, api_response(self.patients[patient_id], "Patient")
+        if method == "PUT":
+            self.patients[patient_id] = self.build_patient(patient_id, body)
+            return 200, api_response(self.patients[patient_id], "Patient modifie")
+        if method == "DELETE":
+            del self.patients[patient_id]
+            return 200, api_response(None, "Patient supprime")
+        return 400, api_response(message="Methode non supportee", success=False, error_code=400)
+
+    def build_patient(self, patient_id, body):
+        body = body if isinstance(body, dict) else {}
+        return {
+            "id": patient_id,
+            "nom": body.get("nom", ""),
+            "prenom": body.get("prenom", ""),
+            "sexe": body.get("sexe", ""),
+            "dateNaissance": body.get("dateNaissance", ""),
+            "taille": body.get("taille"),
+            "poids": body.get("poids"),
+            "contacts": [
+                {"id": contact.get("id") or str(uuid.uuid4()), "type": contact.get("type", ""), "contact": contact.get("contact", "")}
+                for contact in body.get("contacts", []) if isinstance(contact, dict)
+            ],
+        }
+
+    def inject_error(self, path):
+        if self.error_rate <= 0:
+            return False
+        if self.error_paths and not any(path.startswith(prefix) for prefix in self.error_paths):
+            return False
+        return self.rng.random() < self.error_rate
+
+    # --- HTTP ---
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                raw_body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+                path = target.split("?", 1)[0]
+
+                key = f"{method} {re.sub(r'/patients/[^/]+$', '/patients/:id', path)}"
+                self.stats[key] = self.stats.get(key, 0) + 1
+
+                if method == "OPTIONS":
+                    status, payload = 204, None
+                else:
+                    delay = self.latency_ms + (self.rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+                    if delay:
+                        await asyncio.sleep(delay / 1000)
+                    if self.inject_error(path):
+                        status, payload = 500, api_response(message="Erreur injectee", success=False, error_code=500)
+                    else:
+                        try:
+                            body = json.loads(raw_body) if raw_body else None
+                        except ValueError:
+                            body = None
+                        status, payload = self.route(method, path, headers, body)
+
+                data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+                keep_alive = headers.get("connection", "").lower() != "close"
+                response = [
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(data)}",
+                    f"Access-Control-Allow-Origin: {headers.get('origin', '*')}",
+                    "Access-Control-Allow-Methods: GET, POST, PUT, DELETE, OPTIONS",
+                    "Access-Control-Allow-Headers: Authorization, Content-Type",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                writer.write(("\r\n".join(response) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.ready.set()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def start(self):
+        """Demarrer le serveur dans un thread et retourner l'URL de l'API"""
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self.task = self.loop.create_task(self.serve())
+            try:
+                self.loop.run_until_complete(self.task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self.loop.close()
+
+        self.thread = threading.Thread(target=run, name="stub-backend", daemon=True)
+        self.thread.start()
+        if not self.ready.wait(10):
+            raise RuntimeError("Backend de substitution non demarre")
+        print(f"SUCCES: Backend de substitution demarre sur le port {self.port} ({len(self.patients)} patients)")
+        return self.api_url()
+
+    def api_url(self, host=None):
+        """URL de l'API telle que la voit un client (host annonce si le serveur ecoute sur 0.0.0.0)"""
+        if host is None:
+            host = "127.0.0.1" if self.host == "0.0.0.0" else self.host
+        return f"http://{host}:{self.port}/api"
+
+    def stop(self):
+        if self.loop and self.task:
+            self.loop.call_soon_threadsafe(self.task.cancel)
+            self.thread.join(5)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Backend de substitution pour les tests")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-path", action="append", default=[], help="Prefixe de chemin concerne par les erreurs")
+    parser.add_argument("--patients", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    backend = StubBackend(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_paths=args.error_path,
+        patients=args.patients,
+        seed=args.seed,
+    )
+    print(f"Backend de substitution sur http://{args.host}:{args.port}/api")
+    try:
+        asyncio.run(backend.serve())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import unittest
+
+from budgets import BudgetStore
+
+
+def records(step, values, satisfied=True):
+    return [{"step": step, "waited": value, "budget": 30, "satisfied": satisfied} for value in values]
+
+
+class BudgetStoreTest(unittest.TestCase):
+    """Budgets d'attente appris a partir des attentes reussies"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "budgets.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_ceiling_until_enough_samples(self):
+        store = BudgetStore(self.path, min_samples=20)
+        store.update(records("page_prete", [0.1] * 19))
+        self.assertEqual(store.budget("page_prete", 30), 30)
+        self.assertFalse(store.summary({"page_prete": 30})["page_prete"]["learned"])
+
+    def test_learned_budget_is_p99_times_factor_within_bounds(self):
+        store = BudgetStore(self.path, factor=3.0, floor=2.0, min_samples=20)
+        store.update(records("lent", [4.0] * 20) + records("rapide", [0.05] * 20))
+        self.assertEqual(store.budget("lent", 30), 12.0)
+        self.assertEqual(store.budget("lent", 10), 10)
+        self.assertEqual(store.budget("rapide", 30), 2.0)
+
+    def test_only_satisfied_waits_are_learned(self):
+        store = BudgetStore(self.path, min_samples=1)
+        store.update(records("soumission_login", [30.0], satisfied=False) + records("soumission_login", [0.5]))
+        self.assertEqual(store.samples["soumission_login"], [0.5])
+
+    def test_window_is_persisted_and_reloaded(self):
+        store = BudgetStore(self.path, window=3)
+        store.update(records("champs_login", [1.0, 2.0, 3.0, 4.0, 5.0]))
+        self.assertEqual(BudgetStore(self.path).samples["champs_login"], [3.0, 4.0, 5.0])
+
+    def test_unreadable_file_starts_empty(self):
+        with open(self.path, "w") as f:
+            f.write("{pas du json")
+        self.assertEqual(BudgetStore(self.path).samples, {})
+        with open(self.path, "w") as f:
+            json.dump([1, 2], f)
+        self.assertEqual(BudgetStore(self.path).samples, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
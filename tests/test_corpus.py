@@ -0,0 +1,51 @@
+import json
+import os
+import tempfile
+import unittest
+
+from corpus import PayloadCorpus, chunked
+
+
+class PayloadCorpusTest(unittest.TestCase):
+    """Lecture en flux du corpus: dedoublonnage, tags et filtres"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.write("sql.jsonl", "\n".join(json.dumps(entry) for entry in [
+            {"username": "admin' --", "password": "x", "tags": ["comment"]},
+            {"username": "admin' --", "password": "x", "tags": ["doublon"]},
+            {"username": "admin' --", "password": "y"},
+        ]) + "\n\n")
+        self.write("sql_extra.csv", "username,password,tags\nadmin' --,x,csv\n' OR 1=1 --,x,tautology|comment\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        with open(os.path.join(self.directory.name, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_duplicates_are_dropped_across_files(self):
+        cases = list(PayloadCorpus(self.directory.name).cases("sql"))
+        self.assertEqual(
+            [(case["username"], case["password"]) for case in cases],
+            [("admin' --", "x"), ("admin' --", "y"), ("' OR 1=1 --", "x")]
+        )
+        # Le premier exemplaire garde ses tags
+        self.assertEqual(cases[0]["tags"], ["comment", "sql"])
+
+    def test_tag_filter(self):
+        cases = list(PayloadCorpus(self.directory.name, tags=["tautology"]).cases("sql"))
+        self.assertEqual([case["username"] for case in cases], ["' OR 1=1 --"])
+        self.assertEqual(cases[0]["tags"], ["comment", "sql", "tautology"])
+
+    def test_unknown_category_is_empty(self):
+        self.assertEqual(list(PayloadCorpus(self.directory.name).cases("xss")), [])
+
+    def test_chunked(self):
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunked([], 3)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import unittest
+
+from fingerprints import FuzzQueue, MAX_LENGTH, Mutator, OutcomeClusters, fingerprint, outcome
+
+
+def snapshot(error="", token=None, url="http://app/login", cookies=(), dom_hash="h1"):
+    return {
+        "signin_status": 401,
+        "url": url,
+        "token": token,
+        "local_storage": {},
+        "session_storage": {},
+        "cookies": [{"name": name} for name in cookies],
+        "dom": {"error_message": error, "hash": dom_hash},
+    }
+
+
+class OutcomeFingerprintTest(unittest.TestCase):
+    """Empreinte des resultats observables d'une tentative"""
+
+    def test_echoed_payload_does_not_split_outcomes(self):
+        first = outcome(snapshot("Utilisateur admin' -- inconnu"), "admin' --")
+        second = outcome(snapshot("Utilisateur ' OR 1=1 inconnu"), " ' OR 1=1 ")
+        self.assertEqual(fingerprint(first), fingerprint(second))
+
+    def test_observable_differences_change_fingerprint(self):
+        base = fingerprint(outcome(snapshot()))
+        self.assertNotEqual(base, fingerprint(outcome(snapshot(token="abc"))))
+        self.assertNotEqual(base, fingerprint(outcome(snapshot(url="http://app/patients"))))
+        self.assertNotEqual(base, fingerprint(outcome(snapshot(cookies=["session"]))))
+        self.assertNotEqual(base, fingerprint(outcome(snapshot(dom_hash="h2"))))
+
+    def test_fingerprint_ignores_query_string_and_key_order(self):
+        self.assertEqual(
+            fingerprint(outcome(snapshot(url="http://app/login?returnUrl=%2Fpatients"))),
+            fingerprint(outcome(snapshot()))
+        )
+        self.assertEqual(fingerprint({"a": 1, "b": 2}), fingerprint({"b": 2, "a": 1}))
+
+
+class OutcomeClustersTest(unittest.TestCase):
+    """Regroupement des cas par empreinte"""
+
+    def test_first_case_is_representative(self):
+        clusters = OutcomeClusters(examples=2)
+        self.assertTrue(clusters.observe("k", "Cas 1", "p1", {}))
+        self.assertFalse(clusters.observe("k", "Cas 2", "p2", {}))
+        self.assertFalse(clusters.observe("k", "Cas 3", "p3", {}))
+        self.assertEqual(clusters.representative("k"), "Cas 1")
+        self.assertEqual(clusters.count("k"), 3)
+        self.assertEqual(clusters.clusters["k"]["examples"], ["p1", "p2"])
+
+    def test_merge_adds_counts(self):
+        first, second = OutcomeClusters(), OutcomeClusters()
+        first.observe("k", "Cas 1", "p1", {})
+        second.observe("k", "Cas 9", "p9", {})
+        second.observe("autre", "Cas 10", "p10", {})
+        first.merge(second)
+        self.assertEqual(first.count("k"), 2)
+        self.assertEqual(first.representative("k"), "Cas 1")
+        self.assertEqual([cluster["fingerprint"] for cluster in first.summary()], ["k", "autre"])
+
+
+class FuzzQueueTest(unittest.TestCase):
+    """File du fuzzer: graines puis mutants, reproductible par graine"""
+
+    def test_seeds_first_then_mutants(self):
+        queue = FuzzQueue([{"username": "admin", "password": "x"}], OutcomeClusters(), seed=3)
+        self.assertEqual(queue.next_input(), ("admin", "x", None))
+        queue.report("admin", "x", "k", True, None)
+        username, password, parent = queue.next_input()
+        self.assertIs(parent, queue.entries[0])
+        self.assertNotEqual((username, password), ("admin", "x"))
+
+    def test_mutations_are_reproducible_and_bounded(self):
+        first = Mutator(random.Random(7))
+        second = Mutator(random.Random(7))
+        for _ in range(200):
+            text = first.mutate("admin" * 60)
+            self.assertEqual(text, second.mutate("admin" * 60))
+            self.assertLessEqual(len(text), MAX_LENGTH)
+
+
+if __name__ == "__main__":
+    unittest.main()
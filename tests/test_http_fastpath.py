@@ -0,0 +1,142 @@
+import asyncio
+import unittest
+
+from http_fastpath import AsyncHttpPool, HttpFastPath
+from stub_backend import StubBackend
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def request_all(api_url, requests, size=1):
+    """Envoyer des requetes en sequence sur un pool et retourner les reponses et le nombre de connexions"""
+    client = AsyncHttpPool(api_url, size=size, timeout=5)
+    try:
+        responses = [await client.request(*request) for request in requests]
+    finally:
+        await client.close()
+    return responses, client.opened
+
+
+class RawServer:
+    """Serveur HTTP minimal renvoyant une reponse brute fixe (formats non produits par le stub)"""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    async def handle(self, reader, writer):
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        writer.write(self.raw)
+        await writer.drain()
+        writer.close()
+
+    async def fetch(self):
+        server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            client = AsyncHttpPool(f"http://127.0.0.1:{port}/api", size=1, timeout=5)
+            try:
+                return await client.request("GET", "/raw"), client
+            finally:
+                await client.close()
+
+
+class FastPathAgainstStubTest(unittest.TestCase):
+    """Chemin HTTP rapide et client keep-alive contre le backend de substitution"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = StubBackend(host="127.0.0.1", patients=3)
+        cls.api_url = cls.stub.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+
+    def test_injection_payloads_are_blocked(self):
+        cases = [
+            {"category": "sql", "username": "admin' OR '1'='1", "password": "x"},
+            {"category": "sql", "username": "admin'--", "password": "x"},
+            {"category": "bypass", "username": " admin ", "password": "password123"},
+        ]
+        results = HttpFastPath(self.api_url, concurrency=2).run(cases)
+        self.assertEqual([result["passed"] for result in results], [True, True, True])
+        self.assertTrue(all("HTTP 401" in result["details"] for result in results))
+        self.assertTrue(results[0]["test"].startswith("Protection SQL"))
+        self.assertTrue(results[2]["test"].startswith("Protection bypass"))
+
+    def test_token_for_payload_is_a_vulnerability(self):
+        # Identifiants acceptes: le chemin rapide doit signaler le token obtenu
+        results = HttpFastPath(self.api_url).run([{"category": "sql", "username": "admin", "password": "password123"}])
+        self.assertFalse(results[0]["passed"])
+        self.assertIn("HTTP 200", results[0]["details"])
+
+    def test_keep_alive_reuses_connection(self):
+        responses, opened = run(request_all(self.api_url, [
+            ("POST", "/auth/signin", {"username": "admin", "password": "bad"}),
+            ("GET", "/health"),
+            ("GET", "/health"),
+        ]))
+        self.assertEqual([response.status for response in responses], [401, 200, 200])
+        self.assertEqual(responses[1].json(), {"status": "UP"})
+        self.assertEqual(opened, 1)
+
+    def test_patients_require_token(self):
+        responses, _ = run(request_all(self.api_url, [("GET", "/v1/patients")]))
+        self.assertEqual(responses[0].status, 401)
+
+    def test_cors_preflight(self):
+        responses, _ = run(request_all(self.api_url, [
+            ("OPTIONS", "/auth/signin", None, {"Origin": "http://app", "Access-Control-Request-Method": "POST"}),
+        ]))
+        self.assertEqual(responses[0].status, 204)
+        self.assertEqual(responses[0].body, b"")
+        self.assertEqual(responses[0].headers["access-control-allow-origin"], "http://app")
+        self.assertIn("Authorization", responses[0].headers["access-control-allow-headers"])
+
+
+class StubErrorInjectionTest(unittest.TestCase):
+
+    def test_errors_only_on_selected_paths(self):
+        stub = StubBackend(host="127.0.0.1", error_rate=1.0, error_paths=["/api/v1"])
+        api_url = stub.start()
+        try:
+            responses, _ = run(request_all(api_url, [
+                ("POST", "/auth/signin", {"username": "admin", "password": "password123"}),
+                ("GET", "/v1/patients"),
+            ]))
+        finally:
+            stub.stop()
+        self.assertEqual(responses[0].status, 200)
+        self.assertTrue(responses[0].json()["token"])
+        self.assertEqual(responses[1].status, 500)
+        self.assertEqual(responses[1].json()["message"], "Erreur injectee")
+
+
+class ResponseParsingTest(unittest.TestCase):
+
+    def test_chunked_body(self):
+        raw = (b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+               b"7;ext=1\r\n{\"a\": 1\r\n1\r\n}\r\n0\r\n\r\n")
+        response, client = run(RawServer(raw).fetch())
+        self.assertEqual(response.json(), {"a": 1})
+        self.assertEqual(client.idle, [])
+
+    def test_content_length_body(self):
+        raw = b"HTTP/1.1 401 Unauthorized\r\nContent-Length: 2\r\n\r\n{}trailing"
+        response, _ = run(RawServer(raw).fetch())
+        self.assertEqual(response.status, 401)
+        self.assertEqual(response.body, b"{}")
+
+    def test_body_until_close(self):
+        raw = b"HTTP/1.1 200 OK\r\n\r\n{\"b\": 2}"
+        response, client = run(RawServer(raw).fetch())
+        self.assertEqual(response.json(), {"b": 2})
+        self.assertEqual(response.headers["connection"], "close")
+        self.assertEqual(client.idle, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+
+from network_log import build_requests, find_network_issues, network_summary, waterfall
+
+APP_URL = "http://app:4201"
+API = "http://backend-api:8080/api"
+
+
+def sent(request_id, url, timestamp, method="GET", loader="L1", kind="XHR", redirect=None):
+    params = {
+        "requestId": request_id,
+        "loaderId": loader,
+        "type": kind,
+        "timestamp": timestamp,
+        "wallTime": 1700000000 + timestamp,
+        "request": {"url": url, "method": method},
+        "initiator": {"type": "script", "stack": {"callFrames": [{"functionName": "signin", "url": "http://app/main.js", "lineNumber": 41}]}},
+    }
+    if redirect:
+        params["redirectResponse"] = {"status": redirect}
+    return {"method": "Network.requestWillBeSent", "params": params}
+
+
+def received(request_id, status, request_time):
+    timing = {"requestTime": request_time, "dnsStart": -1, "dnsEnd": -1, "connectStart": 1.0, "connectEnd": 3.0,
+              "sendStart": 3.0, "sendEnd": 3.5, "receiveHeadersEnd": 20.0}
+    return {"method": "Network.responseReceived", "params": {"requestId": request_id, "response": {"status": status, "timing": timing}}}
+
+
+def finished(request_id, timestamp, size=100):
+    return {"method": "Network.loadingFinished", "params": {"requestId": request_id, "timestamp": timestamp, "encodedDataLength": size}}
+
+
+def failed(request_id, timestamp, error):
+    return {"method": "Network.loadingFailed", "params": {"requestId": request_id, "timestamp": timestamp, "errorText": error}}
+
+
+class BuildRequestsTest(unittest.TestCase):
+    """Requetes reconstituees depuis les evenements Network DevTools"""
+
+    def test_phases_and_totals(self):
+        requests = build_requests([
+            sent("1", f"{API}/auth/signin", 10.0, "POST"),
+            received("1", 401, 10.0),
+            finished("1", 10.05, 250),
+        ])
+        self.assertEqual(len(requests), 1)
+        request = requests[0]
+        self.assertEqual((request["status"], request["bytes"], request["total_ms"]), (401, 250, 50.0))
+        self.assertEqual(request["phases"], {"dns": 0.0, "connect": 2.0, "ssl": 0.0, "send": 0.5, "wait": 16.5, "receive": 30.0})
+        self.assertEqual(request["initiator"], "script signin main.js:42")
+
+    def test_redirect_keeps_both_hops(self):
+        requests = build_requests([
+            sent("1", f"{APP_URL}/patients", 1.0, kind="Document"),
+            sent("1", f"{APP_URL}/login", 1.1, kind="Document", redirect=302),
+            received("1", 200, 1.1),
+            finished("1", 1.2),
+        ])
+        self.assertEqual([(request["url"], request["status"]) for request in requests],
+                         [(f"{APP_URL}/patients", 302), (f"{APP_URL}/login", 200)])
+
+    def test_events_of_unknown_requests_are_ignored(self):
+        self.assertEqual(build_requests([finished("inconnu", 1.0)]), [])
+
+
+class NetworkIssuesTest(unittest.TestCase):
+    """Anomalies: doublons, /auth/signin lent ou mal route, echecs"""
+
+    def test_duplicates_in_same_document(self):
+        requests = build_requests([
+            sent("1", f"{API}/v1/patients", 1.0),
+            sent("2", f"{API}/v1/patients", 1.1),
+            sent("3", f"{API}/v1/patients", 1.2, method="OPTIONS"),
+            sent("4", f"{API}/v1/patients", 2.0, loader="L2"),
+        ])
+        findings = find_network_issues(requests, APP_URL)
+        self.assertEqual([finding["kind"] for finding in findings], ["duplicate"])
+        self.assertIn("x2", findings[0]["detail"])
+
+    def test_signin_slow_or_sent_to_app_origin(self):
+        requests = build_requests([
+            sent("1", f"{APP_URL}/auth/signin", 1.0, "POST"),
+            finished("1", 1.01),
+            sent("2", f"{API}/auth/signin", 2.0, "POST"),
+            finished("2", 3.5),
+        ])
+        kinds = [finding["kind"] for finding in find_network_issues(requests, APP_URL, slow_signin_ms=1000)]
+        self.assertEqual(kinds, ["signin_origin", "slow_signin"])
+
+    def test_aborted_requests_are_not_failures(self):
+        requests = build_requests([
+            sent("1", f"{API}/v1/patients", 1.0),
+            failed("1", 1.1, "net::ERR_ABORTED"),
+            sent("2", f"{API}/v1/patients/3", 1.2),
+            failed("2", 1.3, "net::ERR_CONNECTION_REFUSED"),
+        ])
+        findings = find_network_issues(requests, APP_URL)
+        self.assertEqual([finding["kind"] for finding in findings], ["failed"])
+
+
+class NetworkSummaryTest(unittest.TestCase):
+
+    def test_summary_and_boot_waterfall(self):
+        boot = build_requests([
+            sent("1", f"{APP_URL}/", 1.0, kind="Document"),
+            finished("1", 1.1, 1000),
+            sent("2", f"{API}/auth/signin", 1.2, "POST"),
+            finished("2", 1.4, 50),
+        ])
+        results = [
+            {"test": "Connexion valide", "network": {"requests": boot, "findings": [{"kind": "failed", "detail": "x"}]}},
+            {"test": "Sans reseau", "network": None},
+        ]
+        summary = network_summary(results)
+        self.assertEqual((summary["requests"], summary["bytes"]), (2, 1050))
+        self.assertEqual(summary["signin"]["count"], 1)
+        self.assertEqual(summary["boot"]["test"], "Connexion valide")
+        self.assertEqual([row["start_ms"] for row in summary["boot"]["waterfall"]], [0.0, 200.0])
+        self.assertEqual(summary["findings"][0]["tests"], ["Connexion valide"])
+        self.assertEqual(waterfall([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
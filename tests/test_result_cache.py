@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from result_cache import ResultCache, backend_identity
+
+
+class ResultCacheTest(unittest.TestCase):
+    """Cache des verdicts: cles, persistance et eviction LRU"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key_depends_on_build_logic_and_case(self):
+        key = ResultCache.key("build", "logic", ["check_sql_payload", ["admin' --", "x"]])
+        self.assertEqual(key, ResultCache.key("build", "logic", ["check_sql_payload", ["admin' --", "x"]]))
+        self.assertNotEqual(key, ResultCache.key("build2", "logic", ["check_sql_payload", ["admin' --", "x"]]))
+        self.assertNotEqual(key, ResultCache.key("build", "logic2", ["check_sql_payload", ["admin' --", "x"]]))
+        self.assertNotEqual(key, ResultCache.key("build", "logic", ["check_sql_payload", ["admin' #", "x"]]))
+
+    def test_saved_verdicts_are_reloaded(self):
+        cache = ResultCache(self.path)
+        self.assertIsNone(cache.get("k"))
+        cache.put("k", [{"test": "t", "passed": True, "details": ""}])
+        self.assertEqual(cache.save(), 1)
+
+        reloaded = ResultCache(self.path)
+        self.assertEqual(reloaded.get("k"), [{"test": "t", "passed": True, "details": ""}])
+        self.assertEqual((reloaded.hits, reloaded.misses), (1, 0))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        entry_size = len(json.dumps({"results": [{"test": "t"}], "stored": time.time(), "used": time.time()}))
+        cache = ResultCache(self.path, max_bytes=entry_size * 2 + 10)
+        for key in ("a", "b"):
+            cache.put(key, [{"test": "t"}])
+        cache.save()
+        # "a" relu depuis: "b" devient le moins recemment utilise
+        cache.entries["a"]["used"] = time.time() + 60
+
+        cache.put("c", [{"test": "t"}])
+        cache.save()
+        self.assertEqual(sorted(cache.entries), ["a", "c"])
+        self.assertEqual(cache.evicted, 1)
+
+    def test_save_merges_with_other_writers(self):
+        first, second = ResultCache(self.path), ResultCache(self.path)
+        first.put("a", [])
+        first.save()
+        second.put("b", [])
+        second.save()
+        self.assertEqual(sorted(ResultCache(self.path).entries), ["a", "b"])
+
+    def test_unreadable_file_starts_empty(self):
+        with open(self.path, "w") as f:
+            f.write("pas du json")
+        self.assertEqual(ResultCache(self.path).entries, {})
+
+
+class BackendIdentityTest(unittest.TestCase):
+
+    def test_environment_version_wins(self):
+        previous = os.environ.get("BACKEND_VERSION")
+        os.environ["BACKEND_VERSION"] = "1.4.2"
+        try:
+            self.assertEqual(backend_identity("http://127.0.0.1:1/api", timeout=0.1), "1.4.2")
+        finally:
+            if previous is None:
+                del os.environ["BACKEND_VERSION"]
+            else:
+                os.environ["BACKEND_VERSION"] = previous
+
+    def test_unknown_without_version_endpoint(self):
+        previous = os.environ.pop("BACKEND_VERSION", None)
+        try:
+            self.assertIsNone(backend_identity("http://127.0.0.1:1/api", timeout=0.1))
+        finally:
+            if previous is not None:
+                os.environ["BACKEND_VERSION"] = previous
+
+
+if __name__ == "__main__":
+    unittest.main()
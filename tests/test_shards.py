@@ -0,0 +1,79 @@
+import unittest
+
+from shards import case_key, in_shard, merge_reports, merge_steps, parse_shard, shard_cases, shard_of
+
+
+def cases(count):
+    return [(f"sql_{i+1:03d}", "check_sql_payload", (i, f"admin' OR {i}={i}", "x")) for i in range(count)]
+
+
+class ShardAssignmentTest(unittest.TestCase):
+    """Repartition stable des cas entre les shards"""
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        self.assertIsNone(parse_shard(""))
+        for text in ("0/4", "5/4", "a/b", "1/0"):
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+
+    def test_shard_of_is_stable_and_in_range(self):
+        for key in ("a", "b", "admin' --", "é"):
+            self.assertEqual(shard_of(key, 5), shard_of(key, 5))
+            self.assertTrue(1 <= shard_of(key, 5) <= 5)
+
+    def test_case_key_ignores_corpus_position(self):
+        self.assertEqual(
+            case_key("check_sql_payload", (0, "admin' --", "x")),
+            case_key("check_sql_payload", (7, "admin' --", "x"))
+        )
+
+    def test_shards_partition_all_cases(self):
+        all_cases = cases(60)
+        seen = []
+        for index in (1, 2, 3):
+            positions = {}
+            shard = list(shard_cases(all_cases, index, 3, positions))
+            self.assertEqual(set(positions), {case[0] for case in shard})
+            for case in shard:
+                self.assertEqual(all_cases[positions[case[0]]], case)
+            seen.extend(shard)
+        self.assertEqual(sorted(seen), sorted(all_cases))
+
+    def test_in_shard_places_corpus_case_in_exactly_one_shard(self):
+        case = {"category": "sql", "username": "admin' --", "password": "x"}
+        self.assertEqual(sum(in_shard(case, index, 4) for index in range(1, 5)), 1)
+
+
+class MergeReportsTest(unittest.TestCase):
+    """Fusion des rapports de shards au format de generate_simple_report"""
+
+    def report(self, index, results, positions):
+        return {
+            "shard": {"index": index, "count": 2, "positions": positions},
+            "results": results,
+            "waits": {"steps": {"page_prete": {"count": 2, "total": 1.0, "max": 0.7, "timeouts": 1}}},
+        }
+
+    def test_results_follow_global_case_order(self):
+        first = self.report(1, [
+            {"test": "c", "passed": True, "case": "sql_003"},
+            {"test": "rapide", "passed": False, "case": None},
+        ], {"sql_003": 2})
+        second = self.report(2, [
+            {"test": "a", "passed": True, "case": "sql_001"},
+            {"test": "b", "passed": False, "skipped": True, "case": "sql_002"},
+        ], {"sql_001": 0, "sql_002": 1})
+
+        merged = merge_reports([first, second], ["s1.json", "s2.json"])
+        self.assertEqual([result["test"] for result in merged["results"]], ["a", "b", "c", "rapide"])
+        self.assertEqual(merged["summary"], {"total": 4, "passed": 2, "failed": 1, "skipped": 1})
+        self.assertEqual([shard["file"] for shard in merged["shards"]], ["s1.json", "s2.json"])
+
+    def test_wait_steps_are_summed(self):
+        steps = merge_steps([self.report(1, [], {}), self.report(2, [], {})])
+        self.assertEqual(steps["page_prete"], {"count": 4, "total": 2.0, "max": 0.7, "timeouts": 2, "short_circuits": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
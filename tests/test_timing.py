@@ -0,0 +1,49 @@
+import unittest
+
+from timing import LatencyHistogram
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    """Histogramme de latence: percentiles a precision relative bornee"""
+
+    def test_percentiles_within_relative_error(self):
+        histogram = LatencyHistogram()
+        values = [i / 1000 for i in range(1, 1001)]
+        for value in values:
+            histogram.record(value)
+        for fraction, expected in ((0.50, 0.5), (0.99, 0.99), (0.999, 0.999)):
+            self.assertAlmostEqual(histogram.value_at(fraction), expected, delta=expected * 0.01)
+        self.assertEqual(histogram.count, 1000)
+        self.assertEqual(histogram.min, 0.001)
+        self.assertEqual(histogram.value_at(1.0), 1.0)
+
+    def test_percentile_never_exceeds_max(self):
+        histogram = LatencyHistogram()
+        histogram.record(0.123)
+        self.assertEqual(histogram.value_at(0.5), 0.123)
+
+    def test_empty_summary(self):
+        summary = LatencyHistogram().summary()
+        self.assertEqual(summary["count"], 0)
+        self.assertEqual(summary["p99"], 0.0)
+        self.assertEqual(summary["mean"], 0.0)
+
+    def test_merge_equals_single_histogram(self):
+        whole, first, second = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for i in range(1, 501):
+            value = i / 997
+            whole.record(value)
+            (first if i % 2 else second).record(value)
+        first.merge(second)
+        self.assertEqual(first.counts, whole.counts)
+        self.assertEqual(first.summary(), whole.summary())
+
+    def test_memory_is_bounded(self):
+        histogram = LatencyHistogram()
+        for i in range(100000):
+            histogram.record(i / 10000)
+        self.assertLess(len(histogram.counts), 2000)
+
+
+if __name__ == "__main__":
+    unittest.main()
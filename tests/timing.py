@@ -0,0 +1,163 @@
+import functools
+import json
+import math
+import time
+from contextlib import contextmanager
+
+
+def percentile(values, fraction):
+    """Percentile par rang le plus proche sur une liste de durees"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def timed(phase):
+    """Decorateur: mesurer une methode de AuthSecurityTests comme une phase"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.timer.phase(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class PhaseTimer:
+    """Durees monotones par phase (navigation, localisation, saisie, soumission, sonde...)"""
+
+    def __init__(self, worker_id=0):
+        self.worker_id = worker_id
+        self.spans = []
+        self.open_spans = []
+        # Temps passe dans les phases enfants de chaque phase en cours (@timed imbriques)
+        self.nested = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.monotonic()
+        self.nested.append(0.0)
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - start
+            children = self.nested.pop()
+            if self.nested:
+                self.nested[-1] += duration
+            span = {
+                "phase": name,
+                "case": None,
+                "start": start,
+                "duration": round(duration, 6),
+                # Duree propre (hors phases imbriquees): sommable sans compter deux fois le meme temps
+                "exclusive": round(max(0.0, duration - children), 6),
+                "worker": self.worker_id,
+            }
+            self.spans.append(span)
+            self.open_spans.append(span)
+
+    def close_case(self, case):
+        """Rattacher les phases mesurees depuis le dernier resultat a un cas et totaliser leur duree propre"""
+        totals = {}
+        for span in self.open_spans:
+            span["case"] = case
+            totals[span["phase"]] = round(totals.get(span["phase"], 0.0) + span["exclusive"], 6)
+        self.open_spans = []
+        return totals
+
+    def summary(self):
+        """p50/p95/max par phase (duree propre)"""
+        durations = {}
+        for span in self.spans:
+            durations.setdefault(span["phase"], []).append(span["exclusive"])
+        return {
+            phase: {
+                "count": len(values),
+                "total": round(sum(values), 3),
+                "p50": round(percentile(values, 0.50), 3),
+                "p95": round(percentile(values, 0.95), 3),
+                "max": round(max(values), 3),
+            }
+            for phase, values in sorted(durations.items())
+        }
+
+    def write_chrome_trace(self, path):
+        """Ecrire les phases au format Chrome Trace (chrome://tracing, Perfetto, speedscope)"""
+        events = []
+        origin = min((span["start"] for span in self.spans), default=0.0)
+        for span in self.spans:
+            events.append({
+                "name": span["phase"],
+                "cat": "phase",
+                "ph": "X",
+                "ts": int((span["start"] - origin) * 1_000_000),
+                "dur": int(span["duration"] * 1_000_000),
+                "pid": 1,
+                "tid": span["worker"],
+                "args": {"case": span["case"], "exclusive": int(span["exclusive"] * 1_000_000)},
+            })
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+class LatencyHistogram:
+    """Histogramme log-lineaire facon HDR: precision relative constante, memoire bornee"""
+
+    def __init__(self, significant_digits=2, unit=1e-6):
+        # Nombre de sous-intervalles par puissance de deux (2 chiffres significatifs: ~1% d'erreur)
+        self.sub_buckets = 2 ** math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.unit = unit
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.min = None
+
+    def bucket(self, value):
+        ticks = max(1, int(value / self.unit))
+        exponent = max(0, ticks.bit_length() - int(math.log2(self.sub_buckets)))
+        return exponent, ticks >> exponent
+
+    def record(self, value):
+        """Enregistrer une duree en secondes"""
+        key = self.bucket(value)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def merge(self, other):
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def value_at(self, fraction):
+        """Valeur (borne haute du sous-intervalle) au percentile demande"""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for exponent, sub in sorted(self.counts):
+            seen += self.counts[(exponent, sub)]
+            if seen >= target:
+                return min(self.max, ((sub + 1) << exponent) * self.unit)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "min": round(self.min or 0.0, 6),
+            "p50": round(self.value_at(0.50), 6),
+            "p99": round(self.value_at(0.99), 6),
+            "p999": round(self.value_at(0.999), 6),
+            "max": round(self.max, 6),
+        }
@@ -0,0 +1,250 @@
+import time
+from selenium.common.exceptions import (
+    TimeoutException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    JavascriptException,
+    WebDriverException,
+)
+
+# Script injecte dans la page: compte les requetes XHR/fetch en cours
+# et les appels termines vers /auth/signin
+NETWORK_TRACKER_JS = """
+if (!window.__secTracker) {
+    var tracker = {pending: 0, signinDone: 0, signinStatus: null};
+    window.__secTracker = tracker;
+    var isSignin = function (url) { return String(url || '').indexOf('/auth/signin') !== -1; };
+    var done = function (url, status) {
+        tracker.pending = Math.max(0, tracker.pending - 1);
+        if (isSignin(url)) { tracker.signinDone += 1; tracker.signinStatus = status; }
+    };
+    var open = XMLHttpRequest.prototype.open;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__secUrl = url;
+        return open.apply(this, arguments);
+    };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        var xhr = this;
+        tracker.pending += 1;
+        xhr.addEventListener('loadend', function () { done(xhr.__secUrl, xhr.status); });
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var nativeFetch = window.fetch;
+        window.fetch = function (input) {
+            var url = typeof input === 'string' ? input : (input && input.url);
+            tracker.pending += 1;
+            return nativeFetch.apply(this, arguments).then(function (response) {
+                done(url, response.status);
+                return response;
+            }, function (error) {
+                done(url, 0);
+                throw error;
+            });
+        };
+    }
+}
+"""
+
+# Etat courant de la page lu en un seul appel
+PAGE_STATE_JS = """
+var tracker = window.__secTracker || {pending: 0, signinDone: 0, signinStatus: null};
+var stable = null;
+if (window.getAllAngularTestabilities) {
+    var testabilities = window.getAllAngularTestabilities();
+    if (testabilities.length) {
+        stable = testabilities.every(function (t) { return t.isStable(); });
+    }
+}
+if (stable === null) {
+    var root = document.querySelector('app-root');
+    stable = document.readyState === 'complete' && !!root && root.children.length > 0;
+}
+var banner = document.querySelector('.error-message');
+return {
+    tracked: !!window.__secTracker,
+    stable: stable,
+    pending: tracker.pending,
+    signinDone: tracker.signinDone,
+    signinStatus: tracker.signinStatus,
+    url: window.location.href,
+    errorVisible: !!banner && banner.offsetParent !== null && banner.textContent.trim().length > 0,
+    token: localStorage.getItem('auth_token')
+};
+"""
+
+IGNORED_EXCEPTIONS = (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    JavascriptException,
+)
+
+
+class WaitEngine:
+    """Attentes pilotees par des conditions, avec un budget de temps par etape"""
+
+    def __init__(self, driver, default_timeout=30, poll_interval=0.1, budgets=None, page_scripts=(),
+                 max_timeouts=5, probe_every=10):
+        self.driver = driver
+        # Scripts idempotents injectes avec le suivi reseau, dans le meme appel
+        self.page_scripts = tuple(page_scripts)
+        self.default_timeout = default_timeout
+        self.poll_interval = poll_interval
+        self.budgets = dict(budgets or {})
+        self.records = []
+        # Coupe-circuit: apres N depassements consecutifs d'une etape, une seule verification
+        # sans attente (un essai complet tous les probe_every appels pour detecter le retour)
+        self.max_timeouts = max_timeouts
+        self.probe_every = probe_every
+        self.timeout_streaks = {}
+
+    def budget_for(self, step):
+        """Budget de temps (secondes) alloue a une etape"""
+        return self.budgets.get(step, self.default_timeout)
+
+    def circuit_open(self, step):
+        """Coupe-circuit actif pour cette etape (depassements consecutifs, hors essai periodique)"""
+        streak = self.timeout_streaks.get(step, 0)
+        return bool(self.max_timeouts) and streak >= self.max_timeouts and streak % self.probe_every != 0
+
+    def until(self, step, condition, timeout=None, raise_on_timeout=True):
+        """Attendre qu'une condition soit vraie et enregistrer la duree reelle d'attente
+
+        Une etape coupee par le coupe-circuit et non satisfaite leve toujours TimeoutException:
+        l'appelant doit la traiter comme un echec, pas comme une attente terminee.
+        """
+        budget = timeout if timeout is not None else self.budget_for(step)
+        streak = self.timeout_streaks.get(step, 0)
+        short_circuit = self.circuit_open(step)
+        if short_circuit:
+            budget = 0
+        start = time.monotonic()
+        result = None
+
+        while True:
+            try:
+                result = condition(self.driver)
+            except IGNORED_EXCEPTIONS:
+                result = None
+            if result:
+                break
+            if time.monotonic() - start >= budget:
+                break
+            time.sleep(self.poll_interval)
+
+        waited = time.monotonic() - start
+        self.timeout_streaks[step] = 0 if result else streak + 1
+        self.records.append({
+            "step": step,
+            "waited": round(waited, 3),
+            "budget": budget,
+            "satisfied": bool(result),
+            "short_circuit": short_circuit
+        })
+        if short_circuit:
+            print(f"ATTENTE: {step} - echec immediat ({streak} depassements consecutifs)")
+        else:
+            print(f"ATTENTE: {step} - {waited:.2f}s (budget {budget}s)")
+
+        if not result and short_circuit:
+            raise TimeoutException(f"Etape '{step}' abandonnee apres {streak} depassements consecutifs")
+        if not result and raise_on_timeout:
+            raise TimeoutException(f"Etape '{step}' non terminee apres {budget}s")
+        return result
+
+    def execute_async(self, step, script, *args):
+        """Script asynchrone borne par le budget de l'etape, enregistre et coupe comme une attente"""
+        streak = self.timeout_streaks.get(step, 0)
+        if self.circuit_open(step):
+            self.timeout_streaks[step] = streak + 1
+            self.records.append({"step": step, "waited": 0.0, "budget": 0, "satisfied": False, "short_circuit": True})
+            print(f"ATTENTE: {step} - echec immediat ({streak} depassements consecutifs)")
+            raise TimeoutException(f"Etape '{step}' abandonnee apres {streak} depassements consecutifs")
+
+        budget = self.budget_for(step)
+        self.driver.set_script_timeout(budget)
+        start = time.monotonic()
+        completed = False
+        timed_out = False
+        try:
+            result = self.driver.execute_async_script(script, *args)
+            completed = True
+            return result
+        except TimeoutException:
+            timed_out = True
+            raise
+        finally:
+            waited = time.monotonic() - start
+            self.timeout_streaks[step] = streak + 1 if timed_out else 0
+            self.records.append({
+                "step": step,
+                "waited": round(waited, 3),
+                "budget": budget,
+                "satisfied": completed,
+                "short_circuit": False
+            })
+            print(f"ATTENTE: {step} - {waited:.2f}s (budget {budget}s)")
+
+    def install_tracker(self):
+        """Injecter le suivi des requetes reseau (et les scripts associes) dans la page courante"""
+        try:
+            self.driver.execute_script("\n".join((NETWORK_TRACKER_JS,) + self.page_scripts))
+        except WebDriverException as e:
+            print(f"ATTENTION: Suivi reseau non installe: {str(e)}")
+
+    def page_state(self):
+        """Lire l'etat de la page (Angular, reseau, URL, banniere d'erreur)"""
+        return self.driver.execute_script(PAGE_STATE_JS)
+
+    def wait_for_page_ready(self, step, timeout=None):
+        """Attendre qu'Angular soit stable et qu'aucune requete ne soit en cours"""
+        self.install_tracker()
+
+        def ready(driver):
+            state = self.page_state()
+            return state if state["stable"] and state["pending"] == 0 else None
+
+        return self.until(step, ready, timeout, raise_on_timeout=False)
+
+    def begin_submit(self):
+        """Memoriser l'etat avant soumission du formulaire de login"""
+        self.install_tracker()
+        state = self.page_state()
+        return {"url": state["url"], "signin_done": state["signinDone"]}
+
+    def wait_for_submit_outcome(self, step, marker, timeout=None):
+        """Attendre la fin de /auth/signin puis un changement d'URL, une erreur ou un token"""
+
+        def settled(driver):
+            state = self.page_state()
+            if not state["tracked"]:
+                # Navigation complete: le suivi a ete perdu avec l'ancienne page
+                return state
+            if state["pending"] > 0:
+                return None
+            if state["url"] != marker["url"]:
+                return state
+            if state["signinDone"] > marker["signin_done"] and (state["errorVisible"] or state["token"]):
+                return state
+            return None
+
+        return self.until(step, settled, timeout, raise_on_timeout=False)
+
+    def wait_for_url(self, step, fragment, timeout=None):
+        """Attendre que l'URL contienne un fragment donne"""
+        return self.until(step, lambda driver: fragment in driver.current_url, timeout, raise_on_timeout=False)
+
+    def summary(self):
+        """Temps d'attente cumule et maximum par etape"""
+        steps = {}
+        for record in self.records:
+            entry = steps.setdefault(record["step"], {"count": 0, "total": 0.0, "max": 0.0, "timeouts": 0, "short_circuits": 0})
+            entry["count"] += 1
+            entry["total"] = round(entry["total"] + record["waited"], 3)
+            entry["max"] = max(entry["max"], record["waited"])
+            if not record["satisfied"]:
+                entry["timeouts"] += 1
+            if record.get("short_circuit"):
+                entry["short_circuits"] += 1
+        return steps